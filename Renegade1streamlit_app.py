@@ -3,28 +3,40 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import requests
-import json
 import time
 import logging
 import os
-import threading
 import asyncio
 import random
 import base64
 import traceback
+import functools
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from io import BytesIO
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("redteam_app.log"),
-        logging.StreamHandler()
-    ]
-)
+from renegade import auth
+from renegade import bandit
+from renegade import cluster
+from renegade import engine
+from renegade import exports
+from renegade import fairness
+from renegade import fingerprint
+from renegade import health
+from renegade import logsetup
+from renegade import planner
+from renegade import profiles
+from renegade import rendertime
+from renegade import scheduler
+from renegade import timeseries
+from renegade import vectors
+from renegade.targets import TargetCatalog, import_targets
+
+# Configure logging: records are queued and written by a background listener
+logsetup.configure_logging(sample_rates=logsetup.rates_from_env())
 logger = logging.getLogger("RedTeamApp")
 
 # Set page configuration with custom theme
@@ -41,19 +53,26 @@ def initialize_session_state():
     try:
         # Core session states
         if 'targets' not in st.session_state:
-            st.session_state.targets = []
+            st.session_state.targets = TargetCatalog()
 
         if 'test_results' not in st.session_state:
             st.session_state.test_results = {}
 
-        if 'running_test' not in st.session_state:
-            st.session_state.running_test = False
+        # Recent results kept for run-to-run comparison, newest last
+        if 'run_history' not in st.session_state:
+            st.session_state.run_history = []
+
+        # Results reports uploaded for comparison, by upload file id
+        if 'compare_reports' not in st.session_state:
+            st.session_state.compare_reports = {}
 
-        if 'progress' not in st.session_state:
-            st.session_state.progress = 0
+        # Assessment job this session is attached to; the job itself lives in
+        # the process-wide scheduler
+        if 'run_job_id' not in st.session_state:
+            st.session_state.run_job_id = None
 
-        if 'vulnerabilities_found' not in st.session_state:
-            st.session_state.vulnerabilities_found = 0
+        if 'loaded_run_job_id' not in st.session_state:
+            st.session_state.loaded_run_job_id = None
 
         if 'current_theme' not in st.session_state:
             st.session_state.current_theme = "dark"  # Default to dark theme
@@ -61,9 +80,13 @@ def initialize_session_state():
         if 'current_page' not in st.session_state:
             st.session_state.current_page = "Dashboard"
             
-        # Thread management
-        if 'active_threads' not in st.session_state:
-            st.session_state.active_threads = []
+        # Uploads already imported, so reruns don't import them again
+        if 'imported_target_files' not in st.session_state:
+            st.session_state.imported_target_files = set()
+            
+        # Opt-in render profiler: enabled, dump_stats and stats_dir
+        if 'render_profiler' not in st.session_state:
+            st.session_state.render_profiler = rendertime.profiler_from_env()
             
         # Error handling
         if 'error_message' not in st.session_state:
@@ -74,24 +97,102 @@ def initialize_session_state():
         logger.error(f"Error initializing session state: {str(e)}")
         display_error(f"Failed to initialize application state: {str(e)}")
 
-# Thread cleanup
-def cleanup_threads():
-    """Remove completed threads from session state"""
+# Attached assessment job
+def current_run_job():
+    """Return the assessment job this session is attached to, if it is still known"""
+    job_id = st.session_state.get("run_job_id")
+    return get_job_scheduler().get(job_id) if job_id else None
+
+def sync_run_job():
+    """Load the results of the attached assessment job once it finishes"""
     try:
-        if 'active_threads' in st.session_state:
-            # Filter out completed threads
-            active_threads = []
-            for thread in st.session_state.active_threads:
-                if thread.is_alive():
-                    active_threads.append(thread)
-            
-            # Update session state with only active threads
-            st.session_state.active_threads = active_threads
-            
-            if len(st.session_state.active_threads) > 0:
-                logger.info(f"Active threads: {len(st.session_state.active_threads)}")
+        job = current_run_job()
+        if job is None or job.state not in scheduler.FINISHED_STATES:
+            return
+        if st.session_state.loaded_run_job_id == job.id:
+            return
+        st.session_state.loaded_run_job_id = job.id
+        if job.state == scheduler.FAILED:
+            st.session_state.error_message = f"Test execution failed: {job.error}"
+        elif job.result:
+            show_results(job.result)
     except Exception as e:
-        logger.error(f"Error cleaning up threads: {str(e)}")
+        logger.error(f"Error syncing assessment job: {str(e)}")
+
+# Results kept for comparison
+RUN_HISTORY_SIZE = 10
+
+# Where each run's whylogs response profiles are written; unset keeps them in
+# memory only, so response drift between runs isn't shown
+PROFILE_DIR = os.environ.get("RENEGADE_WHYLOGS_DIR") or None
+
+# Where runs recorded for replay write their cassettes
+CASSETTE_DIR = "cassettes"
+
+def show_results(results):
+    """Make ``results`` the current results and remember them for comparison"""
+    st.session_state.test_results = results
+    history = st.session_state.run_history
+    if not any(entry is results for entry in history):
+        history.append(results)
+        del history[:-RUN_HISTORY_SIZE]
+
+# Process-wide health prober shared by every session
+@st.cache_resource
+def get_target_prober():
+    """Start the background target prober once per server process"""
+    return health.TargetProber(interval=30, ttl=90).start()
+
+# Process-wide job scheduler shared by every session
+@st.cache_resource
+def get_job_scheduler():
+    """Create the framework job scheduler once per server process"""
+    return scheduler.JobScheduler()
+
+@contextmanager
+def profiled_run(key):
+    """Profile a script or fragment run when this session has the render profiler on"""
+    settings = st.session_state.get("render_profiler") or {}
+    ctx = get_script_run_ctx()
+    render_profiler = rendertime.profiler()
+    if not settings.get("enabled") or ctx is None:
+        yield
+        return
+    if render_profiler.active() is not None:
+        # A fragment drawn during a full run is a section of it
+        with render_profiler.section(key):
+            yield
+        return
+    
+    stats_dir = settings.get("stats_dir") if settings.get("dump_stats") else None
+    with render_profiler.rerun(key, owner=ctx.session_id, stats_dir=stats_dir) as rerun:
+        # Count every message the run sends to the browser
+        send = ctx.enqueue
+        def enqueue(msg):
+            rerun.count(msg)
+            send(msg)
+        ctx.enqueue = enqueue
+        try:
+            yield
+        finally:
+            del ctx.enqueue
+
+def timed_fragment(name, run_every=None):
+    """``st.fragment`` whose runs are timed, and profiled when enabled, under ``fragment:<name>``"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            key = rendertime.scope(rendertime.FRAGMENT, name)
+            with rendertime.timings().measure(key), profiled_run(key):
+                return fn(*args, **kwargs)
+        return st.fragment(timed, run_every=run_every)
+    return decorate
+
+# Targets shown per page in the target grid
+TARGETS_PER_PAGE = 12
+
+# Seconds between progress refreshes of a running test
+PROGRESS_REFRESH_SECONDS = 2
 
 # Define color schemes
 themes = {
@@ -388,6 +489,7 @@ def metric_card(label, value, description="", prefix="", suffix=""):
         """
 
 # Logo and header
+@rendertime.profiled
 def render_header():
     """Render the application header safely"""
     try:
@@ -406,6 +508,7 @@ def render_header():
         st.markdown("# 🛡️ Synthetic Red Team Testing Agent")
 
 # Sidebar navigation - Fixed implementation
+@rendertime.profiled
 def sidebar_navigation():
     """Render the sidebar navigation with proper Streamlit buttons"""
     try:
@@ -445,16 +548,19 @@ def sidebar_navigation():
         st.sidebar.markdown("---")
         st.sidebar.markdown('<div class="sidebar-title">📡 System Status</div>', unsafe_allow_html=True)
         
-        if st.session_state.running_test:
+        run_job = current_run_job()
+        if run_job is not None and run_job.state not in scheduler.FINISHED_STATES:
             st.sidebar.success("⚡ Test Running")
         else:
             st.sidebar.info("⏸️ Idle")
         
         st.sidebar.markdown(f"🎯 Targets: {len(st.session_state.targets)}")
         
-        # Active threads info
-        if len(st.session_state.active_threads) > 0:
-            st.sidebar.markdown(f"🧵 Active threads: {len(st.session_state.active_threads)}")
+        # Jobs running in this server process, from any session
+        job_counts = get_job_scheduler().counts()
+        active_jobs = job_counts[scheduler.RUNNING] + job_counts[scheduler.QUEUED]
+        if active_jobs > 0:
+            st.sidebar.markdown(f"🧵 Active jobs: {active_jobs}")
         
         # Add version info
         st.sidebar.markdown("---")
@@ -468,155 +574,221 @@ def sidebar_navigation():
 def get_mock_test_vectors():
     """Get mock test vector data with error handling"""
     try:
-        return [
-            {
-                "id": "sql_injection",
-                "name": "SQL Injection",
-                "category": "owasp",
-                "severity": "high"
-            },
-            {
-                "id": "xss",
-                "name": "Cross-Site Scripting",
-                "category": "owasp",
-                "severity": "medium"
-            },
-            {
-                "id": "prompt_injection",
-                "name": "Prompt Injection",
-                "category": "owasp",
-                "severity": "critical"
-            },
-            {
-                "id": "insecure_output",
-                "name": "Insecure Output Handling",
-                "category": "owasp",
-                "severity": "high"
-            },
-            {
-                "id": "nist_governance",
-                "name": "AI Governance",
-                "category": "nist",
-                "severity": "medium"
-            },
-            {
-                "id": "nist_transparency",
-                "name": "Transparency",
-                "category": "nist",
-                "severity": "medium"
-            },
-            {
-                "id": "fairness_demographic",
-                "name": "Demographic Parity",
-                "category": "fairness",
-                "severity": "high"
-            },
-            {
-                "id": "privacy_gdpr",
-                "name": "GDPR Compliance",
-                "category": "privacy",
-                "severity": "critical"
-            },
-            {
-                "id": "jailbreaking",
-                "name": "Jailbreaking Resistance",
-                "category": "exploit",
-                "severity": "critical"
-            }
-        ]
+        return vectors.get_test_vectors()
     except Exception as e:
         logger.error(f"Error getting mock test vectors: {str(e)}")
         display_error("Failed to load test vectors")
         return []  # Return empty list as fallback
 
-def run_mock_test(target, test_vectors, duration=30):
-    """Simulate running a test in the background with proper error handling"""
+def start_assessment(plan):
+    """Run an assessment plan as a background job and attach this session to it.
+    
+    An identical assessment that is already queued or running is attached to
+    instead of being started again. Returns ``(job, created)``.
+    """
+    key = scheduler.job_key("assessment", plan.target, [tv["id"] for tv in plan.vectors], plan.settings)
+    job, created = get_job_scheduler().submit_or_attach(
+        f"Assessment · {plan.target['name']}",
+        planner.plan_job,
+        plan,
+        priority=scheduler.PRIORITIES["High"],
+        meta={"kind": "assessment", "suite": "Assessment", "target": plan.target["name"]},
+        key=key,
+        health_cache=get_target_prober().cache
+    )
+    attach_run_job(job)
+    return job, created
+
+def attach_run_job(job):
+    """Follow ``job`` on the Run Assessment page and load its results when done"""
+    st.session_state.run_job_id = job.id
+    st.session_state.loaded_run_job_id = None
+
+# Engine settings and the Test Configuration widgets that set them
+RUN_SETTING_KEYS = {
+    "variations": "test_variations",
+    "request_timeout": "request_timeout",
+    "concurrency": "concurrency",
+    "allocation": "budget_allocation",
+    "exploration": "exploration_floor",
+    "sequential": "sequential_enabled",
+    "confidence": "sequential_confidence",
+    "acceptable_rate": "acceptable_rate",
+    "unacceptable_rate": "unacceptable_rate",
+    "retries": "retries",
+    "retry_budget": "retry_budget",
+    "hedge": "hedge_requests",
+    "circuit_breaker": "circuit_breaker",
+}
+
+def current_run_settings():
+    """Engine settings from the Test Configuration page, else as last saved, else defaults"""
+    # Widget values only live while their page is shown; the saved copy outlives them
+    saved = st.session_state.get("saved_run_config", {}).get("settings", {})
+    settings = {
+        name: st.session_state.get(key, saved.get(name, engine.DEFAULT_SETTINGS[name]))
+        for name, key in RUN_SETTING_KEYS.items()
+    }
+    settings["profile_dir"] = PROFILE_DIR
+    # Recording is a checkbox; the engine takes the directory
+    record = st.session_state.get("record_cassettes", saved.get("cassette_dir") is not None)
+    settings["cassette_dir"] = CASSETTE_DIR if record else None
+    return settings
+
+def saved_setting(name):
+    """An engine setting as last saved, else its default"""
+    return st.session_state.get("saved_run_config", {}).get("settings", {}).get(name, engine.DEFAULT_SETTINGS[name])
+
+def save_run_config(test_vectors):
+    """Store the Test Configuration page's settings for later runs"""
+    st.session_state.saved_run_config = {
+        "settings": current_run_settings(),
+        "duration": st.session_state.get("test_duration", 30) * 60,
+        "vectors": [tv["id"] for tv in test_vectors if st.session_state.get(f"enable_{tv['id']}", True)],
+        "saved_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    logger.info("Test configuration saved")
+
+@rendertime.profiled
+def render_plan(plan):
+    """Show a plan's estimated requests, wall time and token spend"""
+    estimate = plan.summary()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Requests", f"{estimate['requests']:,}")
+    col2.metric("Estimated Wall Time", format_seconds(estimate["wall_s"]))
+    col3.metric("Estimated Tokens", f"{plan.tokens:,}")
+    col4.metric("Throughput", f"{estimate['throughput']:.1f}/s")
+    st.caption(f"{estimate['latency_ms']:.0f} ms mean latency ({estimate['basis']}), {estimate['bound']}-bound; "
+               f"{estimate['prompt_tokens']:,} prompt + {estimate['response_tokens']:,} response tokens")
+    if not estimate["fits"]:
+        advice = (f" Raising concurrency to {estimate['concurrency_needed']} would fit it."
+                  if estimate["concurrency_needed"] else "")
+        st.warning(f"This run does not fit its {format_seconds(estimate['window_s'])} window: about "
+                   f"{estimate['requests_in_window']:,} of {estimate['requests']:,} requests will be sent.{advice}")
+
+def format_seconds(seconds):
+    """Short human duration, e.g. 45 s, 12.5 min, 3.2 h"""
+    if seconds == float("inf"):
+        return "∞"
+    if seconds < 120:
+        return f"{seconds:.0f} s"
+    if seconds < 7200:
+        return f"{seconds / 60:.1f} min"
+    return f"{seconds / 3600:.1f} h"
+
+def queue_target_jobs(label, target_names, priority, job_fn, *job_args, **job_kwargs):
+    """Queue ``job_fn(job, target, *job_args)`` once per target, healthiest targets first"""
+    targets = [st.session_state.targets.get(name) for name in target_names]
+    targets = [t for t in targets if t is not None]
+    if not targets:
+        st.error("Please select at least one target")
+        return
+    
+    prober = get_target_prober()
+    ranked, skipped = health.rank_targets(targets, prober.cache, probed=engine.is_live)
+    for target in skipped:
+        st.warning(f"Skipped {target['name']}: target is unreachable")
+    
+    job_scheduler = get_job_scheduler()
+    queued = attached = 0
+    for target in ranked:
+        # Identical jobs already queued or running are attached to, not repeated
+        job, created = job_scheduler.submit_or_attach(
+            f"{label} · {target['name']}",
+            job_fn,
+            target,
+            *job_args,
+            priority=scheduler.PRIORITIES[priority],
+            meta={"suite": label, "target": target["name"]},
+            key=scheduler.job_key(label, target, job_args, job_kwargs),
+            health_cache=prober.cache,
+            **job_kwargs
+        )
+        if created:
+            queued += 1
+        else:
+            attached += 1
+    
+    if queued:
+        st.success(f"Queued {queued} {label} job(s)")
+        logger.info(f"Queued {queued} {label} jobs")
+    if attached:
+        st.info(f"{attached} identical {label} job(s) already in progress; showing those instead")
+
+def queue_suite_jobs(suite, target_names, selections, settings, priority):
+    """Queue one framework assessment job per target"""
+    test_vectors = vectors.suite_vectors(suite, selections)
+    if not test_vectors:
+        st.error("Please select at least one test")
+        return
+    queue_target_jobs(vectors.SUITES[suite]["label"], target_names, priority,
+                      engine.assessment_job, test_vectors, settings)
+
+@timed_fragment("job_queue")
+def render_job_queue():
+    """Show queued, running and finished framework jobs"""
     try:
-        # Initialize progress
-        st.session_state.progress = 0
-        st.session_state.vulnerabilities_found = 0
-        st.session_state.running_test = True
-        
-        logger.info(f"Starting mock test against {target['name']} with {len(test_vectors)} test vectors")
-        
-        # Create mock results data structure
-        results = {
-            "summary": {
-                "total_tests": 0,
-                "vulnerabilities_found": 0,
-                "risk_score": 0
-            },
-            "vulnerabilities": [],
-            "test_details": {}
-        }
+        job_scheduler = get_job_scheduler()
+        jobs = job_scheduler.jobs()
         
-        # Simulate test execution
-        total_steps = 100
-        step_sleep = duration / total_steps
+        st.markdown("<h3>Job Queue</h3>", unsafe_allow_html=True)
         
-        for i in range(total_steps):
-            # Check if we should stop (for handling cancellations)
-            if not st.session_state.running_test:
-                logger.info("Test was cancelled")
-                break
-                
-            time.sleep(step_sleep)
-            st.session_state.progress = (i + 1) / total_steps
-            
-            # Occasionally "find" a vulnerability
-            if random.random() < 0.2:  # 20% chance each step
-                vector = random.choice(test_vectors)
-                severity_weight = {"low": 1, "medium": 2, "high": 3, "critical": 5}
-                weight = severity_weight.get(vector["severity"], 1)
-                
-                # Add vulnerability to results
-                vulnerability = {
-                    "id": f"VULN-{len(results['vulnerabilities']) + 1}",
-                    "test_vector": vector["id"],
-                    "test_name": vector["name"],
-                    "severity": vector["severity"],
-                    "details": f"Mock vulnerability found in {target['name']} using {vector['name']} test vector.",
-                    "timestamp": datetime.now().isoformat()
-                }
-                results["vulnerabilities"].append(vulnerability)
-                
-                # Update counters
-                st.session_state.vulnerabilities_found += 1
-                results["summary"]["vulnerabilities_found"] += 1
-                results["summary"]["risk_score"] += weight
-                
-                logger.info(f"Found vulnerability: {vulnerability['id']} ({vulnerability['severity']})")
+        counts = job_scheduler.counts()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Queued", counts[scheduler.QUEUED])
+        with col2:
+            st.metric("Running", f"{counts[scheduler.RUNNING]} / {job_scheduler.max_workers}")
+        with col3:
+            st.metric("Done", counts[scheduler.DONE])
+        with col4:
+            st.metric("Failed / Cancelled", counts[scheduler.FAILED] + counts[scheduler.CANCELLED])
         
-        # Complete the test results
-        results["summary"]["total_tests"] = len(test_vectors) * 10  # Assume 10 variations per vector
-        results["timestamp"] = datetime.now().isoformat()
-        results["target"] = target["name"]
+        if not jobs:
+            st.info("No framework jobs yet. Queue a suite above.")
+            return
         
-        logger.info(f"Test completed: {results['summary']['vulnerabilities_found']} vulnerabilities found")
+        # Clicking reruns this fragment, which is the refresh
+        st.button("🔄 Refresh Queue", key="refresh_job_queue")
         
-        # Set the results in session state
-        st.session_state.test_results = results
-        return results
-    
-    except Exception as e:
-        error_details = {
-            "error": True,
-            "error_message": str(e),
-            "traceback": traceback.format_exc(),
-            "timestamp": datetime.now().isoformat()
+        state_icons = {
+            scheduler.QUEUED: "⏳",
+            scheduler.RUNNING: "⚡",
+            scheduler.DONE: "✅",
+            scheduler.FAILED: "❌",
+            scheduler.CANCELLED: "⏹️"
         }
-        logger.error(f"Error in test execution: {str(e)}")
-        logger.debug(traceback.format_exc())
         
-        # Create error result
-        st.session_state.error_message = f"Test execution failed: {str(e)}"
-        return error_details
-    
-    finally:
-        # Always ensure we reset the running state
-        st.session_state.running_test = False
+        for job in jobs:
+            info = job.snapshot()
+            col1, col2, col3 = st.columns([4, 2, 1])
+            
+            with col1:
+                st.markdown(f"{state_icons.get(info['state'], '')} **{info['name']}** · {info['state']}")
+                if info["state"] == scheduler.RUNNING:
+                    st.progress(min(info["progress"], 1.0))
+                elif info["error"]:
+                    st.caption(info["error"])
+            
+            with col2:
+                st.markdown(f"Findings: {info['findings']}" + (f" · {info['elapsed_s']}s" if info["elapsed_s"] is not None else ""))
+            
+            with col3:
+                if info["state"] in (scheduler.QUEUED, scheduler.RUNNING):
+                    if st.button("Cancel", key=f"cancel_job_{job.id}", use_container_width=True):
+                        job_scheduler.cancel(job.id)
+                        safe_rerun()
+                elif info["state"] == scheduler.DONE and job.result:
+                    if st.button("View", key=f"view_job_{job.id}", use_container_width=True):
+                        show_results(job.result)
+                        set_page("Results Analyzer")
+                        safe_rerun()
+    except Exception as e:
+        logger.error(f"Error rendering job queue: {str(e)}")
+        st.error(f"Failed to render job queue: {str(e)}")
 
 # Page renderers
+@rendertime.profiled
 def render_dashboard():
     """Render the dashboard page safely"""
     try:
@@ -678,25 +850,66 @@ def render_dashboard():
         with col2:
             st.markdown("<h3>System Status</h3>", unsafe_allow_html=True)
             
-            if st.session_state.running_test:
+            run_job = current_run_job()
+            if run_job is not None and run_job.state not in scheduler.FINISHED_STATES:
                 st.markdown(card("Test in Progress", f"""
                 <div style="margin-bottom: 10px;">
                     <div style="margin-bottom: 5px;">Progress:</div>
                     <div style="height: 10px; background-color: rgba(255,255,255,0.1); border-radius: 5px;">
-                        <div style="height: 10px; width: {st.session_state.progress*100}%; background-color: {get_theme()["primary"]}; border-radius: 5px;"></div>
+                        <div style="height: 10px; width: {run_job.progress*100}%; background-color: {get_theme()["primary"]}; border-radius: 5px;"></div>
                     </div>
-                    <div style="text-align: right; font-size: 12px; margin-top: 5px;">{int(st.session_state.progress*100)}%</div>
+                    <div style="text-align: right; font-size: 12px; margin-top: 5px;">{int(run_job.progress*100)}%</div>
                 </div>
-                <div>Vulnerabilities found: {st.session_state.vulnerabilities_found}</div>
+                <div>Vulnerabilities found: {run_job.findings}</div>
                 """, "warning"), unsafe_allow_html=True)
             else:
-                st.markdown(card("System Ready", """
-                <p>All systems operational and ready to run assessments.</p>
-                <div style="display: flex; align-items: center;">
-                    <div style="width: 10px; height: 10px; background-color: #4CAF50; border-radius: 50%; margin-right: 5px;"></div>
-                    <div>API Connection: Active</div>
-                </div>
-                """, "success"), unsafe_allow_html=True)
+                # Health comes from the prober's cache; no network calls here
+                # Simulated targets send nothing, so only live ones are probed
+                live_targets = [target for target in st.session_state.targets if engine.is_live(target)]
+                prober = get_target_prober()
+                prober.watch(live_targets)
+                probes = prober.cache.snapshot([health.cache_key(target) for target in live_targets])
+                statuses = {target["name"]: probes[health.cache_key(target)]
+                            for target in live_targets if health.cache_key(target) in probes}
+                
+                counts = {status: 0 for status in [health.HEALTHY, health.DEGRADED, health.DOWN]}
+                for probe in statuses.values():
+                    counts[probe["status"]] += 1
+                pending = len(live_targets) - len(statuses)
+                
+                status_colors = {
+                    health.HEALTHY: "#4CAF50",
+                    health.DEGRADED: get_theme()["warning"],
+                    health.DOWN: get_theme()["error"]
+                }
+                
+                rows = ""
+                for name, probe in list(statuses.items())[:5]:
+                    latency = f"{probe['ttfb_ms']:.0f} ms" if probe["ttfb_ms"] is not None else probe["error"]
+                    rows += f"""
+                    <div style="display: flex; align-items: center; margin-top: 5px;">
+                        <div style="width: 10px; height: 10px; background-color: {status_colors[probe['status']]}; border-radius: 50%; margin-right: 5px;"></div>
+                        <div>{name}: {latency}</div>
+                    </div>
+                    """
+                
+                if counts[health.DOWN]:
+                    card_type, headline = "error", "Some targets are unreachable."
+                elif counts[health.DEGRADED]:
+                    card_type, headline = "warning", "Some targets are responding slowly."
+                elif statuses:
+                    card_type, headline = "success", "All systems operational and ready to run assessments."
+                else:
+                    card_type, headline = "success", "Ready to run assessments."
+                
+                st.markdown(card("System Status", f"""
+                <p>{headline}</p>
+                <div>Healthy: {counts[health.HEALTHY]} · Degraded: {counts[health.DEGRADED]} · Down: {counts[health.DOWN]} · Pending: {pending}</div>
+                {rows}
+                """, card_type), unsafe_allow_html=True)
+                
+                if st.button("🔄 Refresh Status", key="dashboard_refresh_health"):
+                    prober.refresh()
         
         # Test vector overview
         st.markdown("<h3>Test Vector Overview</h3>", unsafe_allow_html=True)
@@ -772,6 +985,7 @@ def render_dashboard():
         logger.debug(traceback.format_exc())
         st.error(f"Error rendering dashboard: {str(e)}")
 
+@rendertime.profiled
 def render_target_management():
     """Render the target management page safely"""
     try:
@@ -784,9 +998,15 @@ def render_target_management():
         if st.session_state.targets:
             st.markdown("<h3>Your Targets</h3>", unsafe_allow_html=True)
             
+            # Paginate the grid so large catalogs render quickly
+            page_count = st.session_state.targets.page_count(TARGETS_PER_PAGE)
+            page = 0
+            if page_count > 1:
+                page = st.number_input(f"Page (of {page_count})", 1, page_count, 1, key="targets_page") - 1
+            
             # Use columns for better layout
             cols = st.columns(3)
-            for i, target in enumerate(st.session_state.targets):
+            for i, target in enumerate(st.session_state.targets.page(page, TARGETS_PER_PAGE)):
                 col = cols[i % 3]
                 with col:
                     with st.container():
@@ -796,14 +1016,14 @@ def render_target_management():
                         
                         col1, col2 = st.columns(2)
                         with col1:
-                            if st.button("✏️ Edit", key=f"edit_target_{i}", use_container_width=True):
+                            if st.button("✏️ Edit", key=f"edit_target_{target['name']}", use_container_width=True):
                                 # In a real app, this would open an edit dialog
                                 st.info("Edit functionality would open here")
                         
                         with col2:
-                            if st.button("🗑️ Delete", key=f"delete_target_{i}", use_container_width=True):
+                            if st.button("🗑️ Delete", key=f"delete_target_{target['name']}", use_container_width=True):
                                 # Remove the target
-                                st.session_state.targets.pop(i)
+                                st.session_state.targets.remove(target["name"])
                                 st.success(f"Target '{target['name']}' deleted")
                                 safe_rerun()
         
@@ -817,29 +1037,85 @@ def render_target_management():
                 target_name = st.text_input("Target Name")
                 target_endpoint = st.text_input("API Endpoint URL")
                 target_type = st.selectbox("Model Type", ["LLM", "Content Filter", "Embedding", "Classification", "Other"])
+                target_transport = st.selectbox(
+                    "Transport", ["simulated", "http", "http2"],
+                    format_func=lambda transport: {"simulated": "Simulated", "http": "Live HTTP",
+                                                   "http2": "Live HTTP/2"}[transport],
+                    help="Live HTTP sends every payload to the endpoint; Live HTTP/2 multiplexes requests over "
+                         "one connection and falls back to HTTP/1.1 if the server does not support it; "
+                         "Simulated answers locally"
+                )
+                target_stream = st.checkbox(
+                    "Streamed Responses", value=False,
+                    help="Ask the endpoint to stream (SSE or chunked) and stop reading each response once its "
+                         "verdict is certain"
+                )
+                target_rate_limit = st.number_input(
+                    "Rate Limit (requests/s)", min_value=0.0, max_value=10000.0, value=0.0, step=1.0,
+                    help="Requests started per second at most; 0 for no limit"
+                )
             
             with col2:
                 api_key = st.text_input("API Key", type="password")
+                auth_type = st.selectbox(
+                    "Authentication", list(auth.PROVIDERS), format_func=auth.PROVIDERS.get,
+                    help="API Key sends the key above as a bearer token; the other options mint short-lived "
+                         "tokens that are cached and refreshed ahead of expiry"
+                )
                 target_description = st.text_area("Description")
             
+            with st.expander("Token Settings (JWT / OAuth)"):
+                col1, col2 = st.columns(2)
+                with col1:
+                    token_url = st.text_input("Token URL", help="OAuth token endpoint (client credentials grant)")
+                    client_id = st.text_input("Client ID")
+                    token_secret = st.text_input("Client Secret / JWT Signing Key", type="password")
+                    token_scope = st.text_input("Scope")
+                with col2:
+                    jwt_algorithm = st.selectbox("JWT Algorithm", ["HS256", "HS384", "HS512", "RS256", "ES256"])
+                    jwt_issuer = st.text_input("JWT Issuer")
+                    token_audience = st.text_input("Audience")
+                    jwt_ttl = st.number_input("JWT Lifetime (seconds)", min_value=30, max_value=86400,
+                                              value=auth.DEFAULT_JWT_TTL, step=30)
+            
             submit_button = st.form_submit_button("Add Target")
             
             if submit_button:
                 try:
+                    if auth_type == auth.JWT:
+                        target_auth = {"type": auth.JWT, "key": token_secret, "algorithm": jwt_algorithm,
+                                       "issuer": jwt_issuer, "audience": token_audience, "ttl": jwt_ttl}
+                    elif auth_type == auth.TOKEN_ENDPOINT:
+                        target_auth = {"type": auth.TOKEN_ENDPOINT, "token_url": token_url, "client_id": client_id,
+                                       "client_secret": token_secret, "scope": token_scope,
+                                       "audience": token_audience}
+                    else:
+                        target_auth = None
+                    auth_error = auth.validate_config(target_auth) if target_auth else None
                     if not target_name or not target_endpoint:
                         st.error("Name and endpoint are required")
+                    elif auth_error:
+                        st.error(f"Invalid authentication settings: {auth_error}")
                     else:
                         new_target = {
                             "name": target_name,
                             "endpoint": target_endpoint,
                             "type": target_type,
+                            "transport": target_transport,
+                            "stream": target_stream,
                             "api_key": api_key,
                             "description": target_description
                         }
-                        st.session_state.targets.append(new_target)
-                        st.success(f"Target '{target_name}' added successfully!")
-                        logger.info(f"Added new target: {target_name}")
-                        safe_rerun()
+                        if target_auth:
+                            new_target["auth"] = target_auth
+                        if target_rate_limit:
+                            new_target["rate_limit"] = target_rate_limit
+                        if st.session_state.targets.add(new_target):
+                            st.success(f"Target '{target_name}' added successfully!")
+                            logger.info(f"Added new target: {target_name}")
+                            safe_rerun()
+                        else:
+                            st.error("A target with this name or endpoint already exists")
                 except Exception as e:
                     logger.error(f"Error adding target: {str(e)}")
                     st.error(f"Failed to add target: {str(e)}")
@@ -849,40 +1125,40 @@ def render_target_management():
         col1, col2 = st.columns(2)
         
         with col1:
-            uploaded_file = st.file_uploader("Import Targets", type=["json"], key="target_import")
+            uploaded_file = st.file_uploader("Import Targets", type=["json", "ndjson", "jsonl"], key="target_import",
+                                             help="A JSON array of targets or one JSON target per line")
             
-            if uploaded_file is not None:
+            if uploaded_file is not None and uploaded_file.file_id not in st.session_state.imported_target_files:
                 try:
-                    content = uploaded_file.read()
-                    imported_targets = json.loads(content)
-                    
-                    if isinstance(imported_targets, list):
-                        # Validate the imported targets
-                        valid_targets = []
-                        for target in imported_targets:
-                            if isinstance(target, dict) and "name" in target and "endpoint" in target:
-                                valid_targets.append(target)
-                        
-                        if valid_targets:
-                            st.session_state.targets.extend(valid_targets)
-                            st.success(f"Successfully imported {len(valid_targets)} targets")
-                            logger.info(f"Imported {len(valid_targets)} targets")
-                            safe_rerun()
-                        else:
-                            st.error("No valid targets found in the imported file")
-                    else:
-                        st.error("Invalid JSON format. Expected a list of targets.")
+                    report = import_targets(st.session_state.targets, uploaded_file)
+                    st.session_state.imported_target_files.add(uploaded_file.file_id)
+                    st.session_state.last_target_import = report
+                    safe_rerun()
                 except Exception as e:
                     logger.error(f"Error importing targets: {str(e)}")
                     st.error(f"Failed to import targets: {str(e)}")
+            
+            # Report on the most recent import
+            report = st.session_state.get("last_target_import")
+            if report:
+                if report["added"]:
+                    st.success(f"Successfully imported {report['added']} targets")
+                else:
+                    st.error("No new valid targets found in the imported file")
+                
+                if report["duplicates"]:
+                    st.info(f"Skipped {report['duplicates']} duplicate targets")
+                if report["invalid"]:
+                    st.warning(f"Skipped {report['invalid']} invalid rows")
+                    for message in report["errors"]:
+                        st.markdown(f"- {message}")
         
         with col2:
             if st.session_state.targets:
                 try:
-                    targets_json = json.dumps(st.session_state.targets, indent=2)
                     st.download_button(
                         label="Export Targets",
-                        data=targets_json,
+                        data=st.session_state.targets.to_json,
                         file_name=f"targets_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
                         mime="application/json",
                         key="target_export"
@@ -898,6 +1174,109 @@ def render_target_management():
         logger.debug(traceback.format_exc())
         st.error(f"Error in target management: {str(e)}")
 
+@timed_fragment("vector_checklist")
+def render_vector_selection(test_vectors, enabled_ids):
+    """Vector checklist with the summary and plan it feeds; ticking a vector reruns only this fragment"""
+    render_vector_checklist(test_vectors, enabled_ids)
+    render_configuration_summary(test_vectors)
+
+def render_vector_checklist(test_vectors, enabled_ids):
+    """Vector tabs with enable checkboxes"""
+    # Group by category
+    categories = {}
+    for tv in test_vectors:
+        if tv["category"] not in categories:
+            categories[tv["category"]] = []
+        categories[tv["category"]].append(tv)
+    
+    # Create tabs for each category
+    try:
+        tabs = st.tabs(list(categories.keys()))
+        
+        for i, (category, tab) in enumerate(zip(categories.keys(), tabs)):
+            with tab:
+                st.markdown(f"<h3>{category.upper()} Test Vectors</h3>", unsafe_allow_html=True)
+                
+                # Create a list of test vectors
+                for j, tv in enumerate(categories[category]):
+                    with st.container():
+                        col1, col2 = st.columns([4, 1])
+                        
+                        with col1:
+                            st.markdown(f"### {tv['name']}")
+                            st.markdown(f"**Severity:** {tv['severity'].upper()}")
+                            st.markdown(f"**Category:** {tv['category'].upper()}")
+                        
+                        with col2:
+                            # Use a checkbox to enable/disable
+                            st.checkbox("Enable", value=tv["id"] in enabled_ids, key=f"enable_{tv['id']}")
+        
+    except Exception as e:
+        logger.error(f"Error rendering test vector tabs: {str(e)}")
+        st.error(f"Failed to render test vectors: {str(e)}")
+        
+        # Fallback: Show test vectors in a simple list
+        st.markdown("### Test Vectors")
+        for tv in test_vectors:
+            st.markdown(f"- **{tv['name']}** ({tv['category']}, {tv['severity']})")
+
+def render_configuration_summary(test_vectors):
+    """Summary of the configuration as it stands and each target's plan for it"""
+    # Widgets outside the fragment keep their values in session state between its reruns
+    state = st.session_state
+    settings = {**current_run_settings(), "duration": state.get("test_duration", 30) * 60}
+    enabled_vectors = [tv for tv in test_vectors if state.get(f"enable_{tv['id']}", True)]
+    enabled_count = len(enabled_vectors)
+    test_variations = settings["variations"]
+    
+    st.markdown("<h3>Configuration Summary</h3>", unsafe_allow_html=True)
+    
+    try:
+        st.markdown(card("Test Parameters", f"""
+        <ul>
+            <li><strong>Enabled Test Vectors:</strong> {enabled_count} of {len(test_vectors)}</li>
+            <li><strong>Time Window:</strong> {settings["duration"] // 60} minutes</li>
+            <li><strong>Total Test Cases:</strong> {enabled_count * test_variations} ({enabled_count} vectors × {test_variations} variations)</li>
+            <li><strong>Concurrency:</strong> {settings["concurrency"]} requests in flight</li>
+            <li><strong>Budget Allocation:</strong> {bandit.STRATEGIES[settings["allocation"]]}</li>
+            <li><strong>Early Stopping:</strong> {f"SPRT at {settings['confidence']:.0%} confidence" if settings["sequential"] else "Off"}</li>
+            <li><strong>Resilience:</strong> {settings["retries"]} retries{", hedging" if settings["hedge"] else ""}{", circuit breaker" if settings["circuit_breaker"] else ""}</li>
+            <li><strong>Profile:</strong> {state.get("test_profile", "Standard")}</li>
+            <li><strong>Focus Area:</strong> {state.get("focus_area", "General Security")}</li>
+        </ul>
+        """), unsafe_allow_html=True)
+    except Exception as e:
+        logger.error(f"Error rendering configuration summary: {str(e)}")
+        st.error(f"Failed to render configuration summary: {str(e)}")
+    
+    # Execution plan per target, from what was measured on each
+    st.markdown("<h3>Execution Plan</h3>", unsafe_allow_html=True)
+    
+    try:
+        if not state.targets:
+            st.info("Add a target to see how long this configuration takes to run against it")
+        elif enabled_vectors:
+            health_cache = get_target_prober().cache
+            rows = []
+            for target in list(state.targets)[:TARGETS_PER_PAGE]:
+                plan = planner.make_plan(target, enabled_vectors, settings, health_cache=health_cache)
+                estimate = plan.summary()
+                rows.append({
+                    "Target": target["name"],
+                    "Requests": estimate["requests"],
+                    "Wall Time": format_seconds(estimate["wall_s"]),
+                    "Tokens": plan.tokens,
+                    "Throughput (req/s)": estimate["throughput"],
+                    "Bound": estimate["bound"],
+                    "Latency Basis": estimate["basis"],
+                    "Fits Window": "✅" if estimate["fits"] else f"⚠️ ~{estimate['requests_in_window']:,} sent",
+                })
+            st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    except Exception as e:
+        logger.error(f"Error rendering execution plan: {str(e)}")
+        st.error(f"Failed to render execution plan: {str(e)}")
+
+@rendertime.profiled
 def render_test_configuration():
     """Render the test configuration page safely"""
     try:
@@ -908,43 +1287,8 @@ def render_test_configuration():
         
         # Test vector selection
         test_vectors = get_mock_test_vectors()
-        
-        # Group by category
-        categories = {}
-        for tv in test_vectors:
-            if tv["category"] not in categories:
-                categories[tv["category"]] = []
-            categories[tv["category"]].append(tv)
-        
-        # Create tabs for each category
-        try:
-            tabs = st.tabs(list(categories.keys()))
-            
-            for i, (category, tab) in enumerate(zip(categories.keys(), tabs)):
-                with tab:
-                    st.markdown(f"<h3>{category.upper()} Test Vectors</h3>", unsafe_allow_html=True)
-                    
-                    # Create a list of test vectors
-                    for j, tv in enumerate(categories[category]):
-                        with st.container():
-                            col1, col2 = st.columns([4, 1])
-                            
-                            with col1:
-                                st.markdown(f"### {tv['name']}")
-                                st.markdown(f"**Severity:** {tv['severity'].upper()}")
-                                st.markdown(f"**Category:** {tv['category'].upper()}")
-                            
-                            with col2:
-                                # Use a checkbox to enable/disable
-                                is_enabled = st.checkbox("Enable", value=True, key=f"enable_{tv['id']}")
-        except Exception as e:
-            logger.error(f"Error rendering test vector tabs: {str(e)}")
-            st.error(f"Failed to render test vectors: {str(e)}")
-            
-            # Fallback: Show test vectors in a simple list
-            st.markdown("### Test Vectors")
-            for tv in test_vectors:
-                st.markdown(f"- **{tv['name']}** ({tv['category']}, {tv['severity']})")
+        saved_config = st.session_state.get("saved_run_config", {})
+        enabled_ids = set(saved_config.get("vectors", [tv["id"] for tv in test_vectors]))
         
         # Advanced configuration
         st.markdown("<h3>Advanced Configuration</h3>", unsafe_allow_html=True)
@@ -953,48 +1297,90 @@ def render_test_configuration():
             col1, col2 = st.columns(2)
             
             with col1:
-                test_duration = st.slider("Maximum Test Duration (minutes)", 5, 120, 30, key="test_duration")
-                test_variations = st.number_input("Test Variations per Vector", 1, 1000, 10, key="test_variations")
-                concurrency = st.slider("Concurrency Level", 1, 16, 4, key="concurrency")
+                st.slider("Maximum Test Duration (minutes)", 5, 120,
+                          saved_config.get("duration", 1800) // 60, key="test_duration")
+                st.number_input("Test Variations per Vector", 1, 1000, saved_setting("variations"), key="test_variations")
+                st.slider("Concurrency Level", 1, 16, saved_setting("concurrency"), key="concurrency")
             
             with col2:
-                test_profile = st.selectbox("Test Profile", ["Standard", "Thorough", "Extreme", "Custom"], key="test_profile")
-                focus_area = st.radio("Focus Area", ["General Security", "AI Safety", "Compliance", "All"], key="focus_area")
+                st.selectbox("Test Profile", ["Standard", "Thorough", "Extreme", "Custom"], key="test_profile")
+                st.radio("Focus Area", ["General Security", "AI Safety", "Compliance", "All"], key="focus_area")
+                allocation = st.selectbox(
+                    "Budget Allocation",
+                    list(bandit.STRATEGIES),
+                    index=list(bandit.STRATEGIES).index(saved_setting("allocation")),
+                    format_func=lambda strategy: bandit.STRATEGIES[strategy],
+                    key="budget_allocation",
+                    help="Adaptive strategies move requests toward the vector and mutation families that are finding issues"
+                )
+                st.slider("Exploration Floor", 0.0, 0.5, saved_setting("exploration"), 0.05,
+                          key="exploration_floor", disabled=allocation == bandit.EVEN,
+                          help="Share of requests spread uniformly at random across all families")
                 save_detailed = st.checkbox("Save Detailed Results", value=True, key="save_detailed")
+            
+            st.markdown("<h4>Sequential Early Stopping</h4>", unsafe_allow_html=True)
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                sequential_enabled = st.checkbox(
+                    "Stop Vectors Early", value=saved_setting("sequential"), key="sequential_enabled",
+                    help="Stop testing a vector as soon as a sequential probability ratio test settles its verdict"
+                )
+            with col2:
+                st.slider("Confidence", 0.80, 0.99, saved_setting("confidence"), 0.01,
+                          key="sequential_confidence", disabled=not sequential_enabled)
+            with col3:
+                st.number_input("Acceptable Find Rate", 0.001, 0.5, saved_setting("acceptable_rate"), 0.005,
+                                format="%.3f", key="acceptable_rate", disabled=not sequential_enabled,
+                                help="A vector finding issues at or below this rate is judged robust")
+            with col4:
+                st.number_input("Unacceptable Find Rate", 0.002, 0.9, saved_setting("unacceptable_rate"), 0.01,
+                                format="%.3f", key="unacceptable_rate", disabled=not sequential_enabled,
+                                help="A vector finding issues at or above this rate is judged vulnerable")
+            
+            st.markdown("<h4>Resilience</h4>", unsafe_allow_html=True)
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.number_input("Retries", 0, 5, saved_setting("retries"), key="retries",
+                                help="Extra attempts for timeouts, HTTP 429 and 5xx, with jittered backoff")
+            with col2:
+                st.slider("Retry Budget", 0.0, 0.5, saved_setting("retry_budget"), 0.05,
+                          key="retry_budget",
+                          help="Retries and hedges allowed per request sent, so a struggling target is not flooded")
+            with col3:
+                st.checkbox("Hedge Slow Requests", value=saved_setting("hedge"), key="hedge_requests",
+                            help="Send a second copy of a request once it is slower than the target's p95 latency")
+            with col4:
+                st.checkbox(
+                    "Circuit Breaker", value=saved_setting("circuit_breaker"), key="circuit_breaker",
+                    help="Fail requests immediately while a target keeps failing, probing again after a cooldown"
+                )
+            
+            st.markdown("<h4>Recording</h4>", unsafe_allow_html=True)
+            st.checkbox("Record Responses for Replay", value=saved_setting("cassette_dir") is not None,
+                        key="record_cassettes",
+                        help=f"Append every request and response to a cassette under {CASSETTE_DIR}/, so results "
+                             "can be re-scored after detector or severity changes without contacting the target")
         except Exception as e:
             logger.error(f"Error rendering advanced configuration: {str(e)}")
             st.error(f"Failed to render advanced configuration: {str(e)}")
         
+        # Rendered after the settings above, so a vector-only rerun reads them from session state
+        render_vector_selection(test_vectors, enabled_ids)
+        
         # Save configuration button
         if st.button("Save Configuration", key="save_test_config"):
+            save_run_config(test_vectors)
             st.success("Test configuration saved successfully!")
-            logger.info("Test configuration saved")
+        saved_at = st.session_state.get("saved_run_config", {}).get("saved_at")
+        st.caption(f"Last saved {saved_at}; runs use the saved configuration" if saved_at
+                   else "Not saved yet; runs use the values above while this page is open, defaults otherwise")
         
-        # Show configuration summary
-        st.markdown("<h3>Configuration Summary</h3>", unsafe_allow_html=True)
-        
-        try:
-            # Count enabled test vectors
-            enabled_count = sum(1 for tv in test_vectors if st.session_state.get(f"enable_{tv['id']}", True))
-            
-            st.markdown(card("Test Parameters", f"""
-            <ul>
-                <li><strong>Enabled Test Vectors:</strong> {enabled_count} of {len(test_vectors)}</li>
-                <li><strong>Estimated Duration:</strong> {test_duration} minutes</li>
-                <li><strong>Total Test Cases:</strong> {enabled_count * test_variations} ({enabled_count} vectors × {test_variations} variations)</li>
-                <li><strong>Profile:</strong> {test_profile}</li>
-                <li><strong>Focus Area:</strong> {focus_area}</li>
-            </ul>
-            """), unsafe_allow_html=True)
-        except Exception as e:
-            logger.error(f"Error rendering configuration summary: {str(e)}")
-            st.error(f"Failed to render configuration summary: {str(e)}")
-    
     except Exception as e:
         logger.error(f"Error rendering test configuration: {str(e)}")
         logger.debug(traceback.format_exc())
         st.error(f"Error in test configuration: {str(e)}")
 
+@rendertime.profiled
 def render_run_assessment():
     """Render the run assessment page safely"""
     try:
@@ -1011,106 +1397,569 @@ def render_run_assessment():
                 safe_rerun()
             return
         
-        # Check if a test is already running
-        if st.session_state.running_test:
-            # Show progress
-            progress_placeholder = st.empty()
-            with progress_placeholder.container():
-                progress_bar = st.progress(st.session_state.progress)
-                st.markdown(f"**Progress:** {int(st.session_state.progress*100)}%")
-                st.markdown(f"**Vulnerabilities found:** {st.session_state.vulnerabilities_found}")
-            
-            # Stop button
+        # Check if the attached test is still running
+        run_job = current_run_job()
+        if run_job is not None and run_job.state not in scheduler.FINISHED_STATES:
+            render_run_progress(run_job.id)
+        else:
+            render_active_assessments()
+            render_run_panel()
+    
+    except Exception as e:
+        logger.error(f"Error rendering run assessment: {str(e)}")
+        logger.debug(traceback.format_exc())
+        st.error(f"Error in run assessment: {str(e)}")
+
+@timed_fragment("run_progress", run_every=PROGRESS_REFRESH_SECONDS)
+def render_run_progress(job_id):
+    """Progress of the attached test, refreshed on its own until the test finishes"""
+    try:
+        run_job = get_job_scheduler().get(job_id)
+        if run_job is None or run_job.state in scheduler.FINISHED_STATES:
+            # Rerun the whole page so the results load and the configuration comes back
+            safe_rerun()
+            return
+        
+        # Show progress
+        progress_placeholder = st.empty()
+        with progress_placeholder.container():
+            st.markdown(f"**{run_job.name}** · {run_job.state}")
+            st.progress(min(run_job.progress, 1.0))
+            st.markdown(f"**Progress:** {int(run_job.progress*100)}%")
+            st.markdown(f"**Vulnerabilities found:** {run_job.findings}")
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            # Clicking reruns this fragment, which is the refresh
+            st.button("🔄 Refresh", key="refresh_test")
+        with col2:
+            # Stop button; stops the job for every session attached to it
             if st.button("Stop Test", key="stop_test"):
-                st.session_state.running_test = False
+                get_job_scheduler().cancel(run_job.id)
                 logger.info("Test stopped by user")
                 st.warning("Test stopped by user")
                 safe_rerun()
-        else:
-            # Test configuration
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("<h3>Select Target</h3>", unsafe_allow_html=True)
-                target_options = [t["name"] for t in st.session_state.targets]
-                selected_target = st.selectbox("Target", target_options, key="run_target")
-            
-            with col2:
-                st.markdown("<h3>Test Parameters</h3>", unsafe_allow_html=True)
-                test_duration = st.slider("Test Duration (seconds)", 5, 60, 30, key="run_duration", 
-                                         help="For demonstration purposes, we're using seconds. In a real system, this would be minutes.")
-            
-            # Get test vectors
-            test_vectors = get_mock_test_vectors()
+        with col3:
+            if st.button("Detach", key="detach_test", help="Leave the test running without following it"):
+                st.session_state.run_job_id = None
+                safe_rerun()
+    except Exception as e:
+        logger.error(f"Error rendering test progress: {str(e)}")
+        st.error(f"Failed to render test progress: {str(e)}")
+
+@timed_fragment("run_panel")
+def render_run_panel():
+    """Target, duration, vector selection and plan; changing them reruns only this panel"""
+    try:
+        # Test configuration
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("<h3>Select Target</h3>", unsafe_allow_html=True)
+            target_options = st.session_state.targets.names()
+            selected_target = st.selectbox("Target", target_options, key="run_target")
             
-            # Show test vector selection
-            st.markdown("<h3>Select Test Vectors</h3>", unsafe_allow_html=True)
+            # Cached health only; probing happens in the background
+            run_target = st.session_state.targets.get(selected_target)
+            prober = get_target_prober()
+            prober.watch([target for target in st.session_state.targets if engine.is_live(target)])
+            probe = prober.cache.get(health.cache_key(run_target)) if run_target is not None else None
+            if run_target is not None and not engine.is_live(run_target):
+                st.caption("Health: simulated target, not probed")
+            elif probe is None:
+                st.caption("Health: pending first probe")
+            elif probe["status"] == health.DOWN:
+                st.error(f"Target is unreachable: {probe['error']}")
+            else:
+                st.caption(f"Health: {probe['status']} · first byte {probe['ttfb_ms']:.0f} ms")
+        
+        with col2:
+            st.markdown("<h3>Test Parameters</h3>", unsafe_allow_html=True)
+            test_duration = st.slider("Test Duration (seconds)", 5, 60, 30, key="run_duration", 
+                                     help="For demonstration purposes, we're using seconds. In a real system, this would be minutes.")
+        
+        # Get test vectors, enabled as last saved on the Test Configuration page
+        test_vectors = get_mock_test_vectors()
+        enabled_ids = set(st.session_state.get("saved_run_config", {}).get("vectors",
+                                                                           [tv["id"] for tv in test_vectors]))
+        
+        # Show test vector selection
+        st.markdown("<h3>Select Test Vectors</h3>", unsafe_allow_html=True)
+        
+        # Group by category
+        categories = {}
+        for tv in test_vectors:
+            if tv["category"] not in categories:
+                categories[tv["category"]] = []
+            categories[tv["category"]].append(tv)
+        
+        # Create columns for each category
+        try:
+            cols = st.columns(len(categories))
             
-            # Group by category
-            categories = {}
-            for tv in test_vectors:
-                if tv["category"] not in categories:
-                    categories[tv["category"]] = []
-                categories[tv["category"]].append(tv)
+            selected_vectors = []
+            for i, (category, col) in enumerate(zip(categories.keys(), cols)):
+                with col:
+                    st.markdown(f"<div style='text-align: center; text-transform: uppercase; font-weight: bold; margin-bottom: 10px;'>{category}</div>", unsafe_allow_html=True)
+                    
+                    for tv in categories[category]:
+                        if st.checkbox(tv["name"], value=tv["id"] in enabled_ids, key=f"run_tv_{tv['id']}"):
+                            selected_vectors.append(tv)
+        except Exception as e:
+            logger.error(f"Error rendering test vector selection: {str(e)}")
+            st.error(f"Failed to render test vector selection: {str(e)}")
             
-            # Create columns for each category
+            # Fallback: Use multiselect
+            st.markdown("### Select Test Vectors")
+            vector_names = [tv["name"] for tv in test_vectors]
+            selected_names = st.multiselect("Test Vectors", vector_names, default=vector_names, key="fallback_vectors")
+            selected_vectors = [tv for tv in test_vectors if tv["name"] in selected_names]
+        
+        # The plan estimated here is the one that runs
+        plan = None
+        target = st.session_state.targets.get(selected_target)
+        if target and selected_vectors:
+            st.markdown("<h3>Execution Plan</h3>", unsafe_allow_html=True)
             try:
-                cols = st.columns(len(categories))
-                
-                selected_vectors = []
-                for i, (category, col) in enumerate(zip(categories.keys(), cols)):
-                    with col:
-                        st.markdown(f"<div style='text-align: center; text-transform: uppercase; font-weight: bold; margin-bottom: 10px;'>{category}</div>", unsafe_allow_html=True)
-                        
-                        for tv in categories[category]:
-                            if st.checkbox(tv["name"], value=True, key=f"run_tv_{tv['id']}"):
-                                selected_vectors.append(tv)
+                settings = {**current_run_settings(), "duration": test_duration}
+                plan = planner.make_plan(target, selected_vectors, settings, health_cache=get_target_prober().cache)
+                render_plan(plan)
             except Exception as e:
-                logger.error(f"Error rendering test vector selection: {str(e)}")
-                st.error(f"Failed to render test vector selection: {str(e)}")
-                
-                # Fallback: Use multiselect
-                st.markdown("### Select Test Vectors")
-                vector_names = [tv["name"] for tv in test_vectors]
-                selected_names = st.multiselect("Test Vectors", vector_names, default=vector_names, key="fallback_vectors")
-                selected_vectors = [tv for tv in test_vectors if tv["name"] in selected_names]
-            
-            # Run test button
-            if st.button("Run Assessment", use_container_width=True, type="primary", key="start_assessment"):
-                try:
-                    if not selected_vectors:
-                        st.error("Please select at least one test vector")
-                    else:
-                        # Find the selected target object
-                        target = next((t for t in st.session_state.targets if t["name"] == selected_target), None)
-                        
-                        if target:
-                            # Start the test in a background thread
-                            test_thread = threading.Thread(
-                                target=run_mock_test,
-                                args=(target, selected_vectors, test_duration)
-                            )
-                            test_thread.daemon = True
-                            test_thread.start()
-                            
-                            # Track the thread
-                            st.session_state.active_threads.append(test_thread)
-                            
-                            st.session_state.running_test = True
+                logger.error(f"Error planning assessment: {str(e)}")
+                st.error(f"Failed to plan assessment: {str(e)}")
+        
+        # Run test button
+        if st.button("Run Assessment", use_container_width=True, type="primary", key="start_assessment"):
+            try:
+                if not selected_vectors:
+                    st.error("Please select at least one test vector")
+                else:
+                    if target and plan:
+                        # The job runs in the shared scheduler, so it survives
+                        # refreshes and is visible to every session
+                        job, created = start_assessment(plan)
+                        if created:
                             logger.info(f"Started test against {target['name']} with {len(selected_vectors)} vectors")
                             st.success("Test started!")
-                            safe_rerun()
                         else:
-                            st.error("Selected target not found")
-                except Exception as e:
-                    logger.error(f"Error starting test: {str(e)}")
-                    st.error(f"Failed to start test: {str(e)}")
+                            st.info("An identical test is already running; attached to it")
+                        safe_rerun()
+                    else:
+                        st.error("Selected target not found")
+            except Exception as e:
+                logger.error(f"Error starting test: {str(e)}")
+                st.error(f"Failed to start test: {str(e)}")
     
     except Exception as e:
-        logger.error(f"Error rendering run assessment: {str(e)}")
-        logger.debug(traceback.format_exc())
-        st.error(f"Error in run assessment: {str(e)}")
+        logger.error(f"Error rendering run configuration: {str(e)}")
+        st.error(f"Failed to render run configuration: {str(e)}")
+
+@rendertime.profiled
+def render_active_assessments():
+    """List assessments running in this server process so any session can attach or stop them"""
+    try:
+        job_scheduler = get_job_scheduler()
+        active = [job for job in job_scheduler.jobs(kind="assessment") if job.state not in scheduler.FINISHED_STATES]
+        if not active:
+            return
+        
+        st.markdown("<h3>Running Assessments</h3>", unsafe_allow_html=True)
+        for job in active:
+            col1, col2, col3 = st.columns([4, 1, 1])
+            with col1:
+                st.markdown(f"**{job.name}** · {job.state} · {int(job.progress * 100)}% · {job.findings} findings")
+            with col2:
+                if st.button("Attach", key=f"attach_job_{job.id}", use_container_width=True):
+                    attach_run_job(job)
+                    safe_rerun()
+            with col3:
+                if st.button("Cancel", key=f"cancel_run_{job.id}", use_container_width=True):
+                    job_scheduler.cancel(job.id)
+                    safe_rerun()
+    except Exception as e:
+        logger.error(f"Error rendering running assessments: {str(e)}")
+        st.error(f"Failed to list running assessments: {str(e)}")
+
+@rendertime.profiled
+def render_fairness_report(report):
+    """Render fairness metrics with their confidence intervals"""
+    try:
+        confidence = int(report["bootstrap"]["confidence"] * 100)
+        st.markdown("<h3>Fairness Metrics</h3>", unsafe_allow_html=True)
+        st.caption(f"{report['samples']:,} responses across {len(report['groups'])} groups · "
+                   f"{confidence}% bootstrap intervals from {report['bootstrap']['replicates']:,} replicates (seed {report['bootstrap']['seed']})")
+        
+        summary_rows = []
+        for metric, entry in report["metrics"].items():
+            low, high = entry.get("ci") or [None, None]
+            summary_rows.append({
+                "Metric": metric,
+                "Value": entry["value"],
+                f"{confidence}% CI": f"{low} – {high}" if low is not None else "n/a",
+                "Threshold": f"{'≤' if entry['threshold'][0] == 'max' else '≥'} {entry['threshold'][1]}",
+                "Status": "❌ Violated" if entry["violated"] else "✅ Within threshold"
+            })
+        st.dataframe(pd.DataFrame(summary_rows), use_container_width=True, hide_index=True)
+        
+        # Per-group breakdown
+        per_group = pd.DataFrame(
+            {metric: entry["per_group"] for metric, entry in report["metrics"].items()},
+            index=report["groups"]
+        )
+        per_group.insert(0, "Responses", report["group_sizes"])
+        st.dataframe(per_group, use_container_width=True)
+    except Exception as e:
+        logger.error(f"Error rendering fairness report: {str(e)}")
+        st.error(f"Failed to render fairness report: {str(e)}")
+
+@rendertime.profiled
+def render_allocation_report(allocation):
+    """Render how the adaptive allocator spent the request budget"""
+    try:
+        st.markdown("<h3>Budget Allocation</h3>", unsafe_allow_html=True)
+        arms = pd.DataFrame(allocation["arms"])
+        total_requests = int(arms["requests"].sum())
+        findings = int(arms["findings"].sum())
+        st.caption(f"{bandit.STRATEGIES[allocation['strategy']]} with {int(allocation['exploration'] * 100)}% exploration · "
+                   f"{1000 * findings / total_requests if total_requests else 0:.1f} findings per 1,000 requests")
+        st.dataframe(
+            arms.sort_values("requests", ascending=False).rename(columns={
+                "vector": "Vector", "mutation": "Mutation", "requests": "Requests",
+                "findings": "Findings", "find_rate": "Find Rate"
+            }),
+            use_container_width=True, hide_index=True
+        )
+    except Exception as e:
+        logger.error(f"Error rendering allocation report: {str(e)}")
+        st.error(f"Failed to render allocation report: {str(e)}")
 
+@rendertime.profiled
+def render_run_timeline(timeline, resilience=None, streamed=None):
+    """Render requests/sec, latency percentiles and findings per minute over the run"""
+    try:
+        st.markdown("<h3>Run Timeline</h3>", unsafe_allow_html=True)
+        series = timeseries.chart_series(timeline)
+        severity_colors = {"low": "green", "medium": "gold", "high": "orange", "critical": "red"}
+        
+        fig = make_subplots(rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.06,
+                            subplot_titles=("Requests per second", "Latency (ms)", "Findings per minute"))
+        # WebGL traces keep zoom and pan smooth on long runs
+        x, y = series["requests_per_second"]
+        fig.add_trace(go.Scattergl(x=x, y=y, mode="lines", name="Requests/s",
+                                   line=dict(color=get_theme()["primary"])), row=1, col=1)
+        x, y = series["errors_per_second"]
+        if y.any():
+            fig.add_trace(go.Scattergl(x=x, y=y, mode="lines", name="Errors/s", line=dict(color="gray")), row=1, col=1)
+        for p, dash in zip(timeseries.PERCENTILES, ("solid", "dash", "dot")):
+            x, y = series[f"latency_p{p}"]
+            fig.add_trace(go.Scattergl(x=x, y=y, mode="lines", name=f"p{p}", line=dict(dash=dash)), row=2, col=1)
+        for severity in timeseries.SEVERITIES:
+            if f"findings_{severity}" in series:
+                x, y = series[f"findings_{severity}"]
+                fig.add_trace(go.Scattergl(x=x, y=y, mode="lines", name=severity.title(),
+                                           line=dict(color=severity_colors[severity])), row=3, col=1)
+        
+        fig.update_xaxes(title_text="Seconds since start", row=3, col=1)
+        fig.update_layout(
+            height=640,
+            margin=dict(l=20, r=20, t=40, b=20),
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            font=dict(color=get_theme()["text"])
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        
+        points = sum(len(x) for x, _ in series.values())
+        st.caption(f"{len(timeline['requests']):,} buckets of {timeline['bucket_seconds']}s · "
+                   f"{points:,} points plotted")
+        
+        latency = timeline.get("latency_ms")
+        if latency and latency["p99"] is not None:
+            col1, col2, col3 = st.columns(3)
+            col1.metric("p50 Latency", f"{latency['p50']:,.0f} ms")
+            col2.metric("p95 Latency", f"{latency['p95']:,.0f} ms")
+            col3.metric("p99 Latency", f"{latency['p99']:,.0f} ms")
+        verdict = timeline.get("verdict_ms")
+        if streamed and verdict and verdict["p99"] is not None:
+            col1, col2, col3 = st.columns(3)
+            col1.metric("p50 Time to Verdict", f"{verdict['p50']:,.0f} ms")
+            col2.metric("p95 Time to Verdict", f"{verdict['p95']:,.0f} ms")
+            col3.metric("Streams Closed Early", f"{streamed['stopped_early']:,} of {streamed['responses']:,}")
+        if resilience:
+            hedging = (f" · {resilience['hedges']:,} hedges ({resilience['hedge_wins']:,} won) after "
+                       f"{resilience['hedge_delay_ms']} ms" if resilience.get("hedge_delay_ms") else "")
+            st.caption(f"{resilience['retries']:,} retries{hedging} · {resilience['deadline_exceeded']:,} deadlines exceeded · "
+                       f"{resilience['rejected']:,} rejected by the circuit breaker"
+                       + (f" (now {resilience['circuit']})" if resilience.get("circuit") else ""))
+    except Exception as e:
+        logger.error(f"Error rendering run timeline: {str(e)}")
+        st.error(f"Failed to render run timeline: {str(e)}")
+
+@rendertime.profiled
+def render_privacy_report(privacy):
+    """Render PII hits per detector and per regulation"""
+    try:
+        st.markdown("<h3>Personal Data Exposure</h3>", unsafe_allow_html=True)
+        st.caption(f"{privacy['responses_scanned']:,} responses scanned for {', '.join(privacy['regulations'])}")
+        if privacy.get("responses_unscanned"):
+            st.warning(f"{privacy['responses_unscanned']:,} responses could not be scanned; see the log")
+        
+        if not privacy["hits_by_type"]:
+            st.success("No personal data detected in target responses")
+            return
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.dataframe(pd.DataFrame(
+                [{"Data Type": kind, "Hits": count} for kind, count in privacy["hits_by_type"].items()]
+            ), use_container_width=True, hide_index=True)
+        with col2:
+            st.dataframe(pd.DataFrame(
+                [{"Regulation": regulation, "Hits": count} for regulation, count in privacy["hits_by_regulation"].items()]
+            ), use_container_width=True, hide_index=True)
+    except Exception as e:
+        logger.error(f"Error rendering privacy report: {str(e)}")
+        st.error(f"Failed to render privacy report: {str(e)}")
+
+def run_label(results):
+    """Short label for a run in comparison pickers"""
+    timestamp = str(results.get("timestamp", ""))[:19].replace("T", " ")
+    return f"{results.get('target', 'Unknown')} · {timestamp or 'no timestamp'} · {len(results.get('vulnerabilities', []))} findings"
+
+@timed_fragment("run_comparison")
+def render_run_comparison():
+    """Diff two runs by finding fingerprint: new, fixed and recurring issues"""
+    try:
+        uploads = st.file_uploader("Add JSON reports to compare", type=["json", "gz"], accept_multiple_files=True,
+                                   key="compare_upload")
+        for upload in uploads or []:
+            if upload.file_id not in st.session_state.compare_reports:
+                try:
+                    st.session_state.compare_reports[upload.file_id] = exports.read_json_report(upload)
+                except ValueError as e:
+                    st.error(f"Could not read {upload.name}: {str(e)}")
+        
+        runs = list(st.session_state.run_history) + list(st.session_state.compare_reports.values())
+        if len(runs) < 2:
+            st.info("Compare needs two runs: finish another assessment or upload JSON reports exported earlier.")
+            return
+        
+        labels = [f"{i + 1}. {run_label(run)}" for i, run in enumerate(runs)]
+        col1, col2 = st.columns(2)
+        with col1:
+            baseline = st.selectbox("Baseline", range(len(runs)), index=len(runs) - 2,
+                                    format_func=lambda i: labels[i], key="compare_baseline")
+        with col2:
+            current = st.selectbox("Current", range(len(runs)), index=len(runs) - 1,
+                                   format_func=lambda i: labels[i], key="compare_current")
+        
+        # Reuse the diff across reruns until the selection changes
+        cache_key = (id(runs[baseline]), id(runs[current]))
+        cached = st.session_state.get("run_diff")
+        if cached is None or cached[0] != cache_key:
+            cached = (cache_key, fingerprint.diff_runs(runs[baseline], runs[current]))
+            st.session_state.run_diff = cached
+        diff = cached[1]
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("New", len(diff[fingerprint.NEW]))
+        with col2:
+            st.metric("Fixed", len(diff[fingerprint.FIXED]))
+        with col3:
+            st.metric("Recurring", len(diff[fingerprint.RECURRING]))
+        
+        render_profile_drift(runs[baseline], runs[current])
+        
+        statuses = st.multiselect("Show", [fingerprint.NEW, fingerprint.FIXED, fingerprint.RECURRING],
+                                  default=[fingerprint.NEW, fingerprint.FIXED], key="compare_statuses")
+        rows = [entry for status in statuses for entry in diff[status]]
+        if not rows:
+            st.success("No differing findings between these runs" if not diff[fingerprint.RECURRING]
+                       else "Nothing to show for the selected statuses")
+            return
+        
+        st.dataframe(pd.DataFrame(rows).rename(columns={
+            "status": "Status", "fingerprint": "Fingerprint", "test_vector": "Vector", "test_name": "Test",
+            "severity": "Severity", "details": "Example", "baseline_count": "Baseline", "current_count": "Current",
+        }), use_container_width=True, hide_index=True)
+    except Exception as e:
+        logger.error(f"Error rendering run comparison: {str(e)}")
+        st.error(f"Failed to compare runs: {str(e)}")
+
+@rendertime.profiled
+def render_profile_drift(baseline, current):
+    """Response drift between two runs from their stored whylogs profiles"""
+    paths = [(run.get("profile") or {}).get("path") for run in (baseline, current)]
+    if not all(path and os.path.isdir(path) for path in paths):
+        return
+    try:
+        cache_key = tuple(paths)
+        cached = st.session_state.get("profile_drift")
+        if cached is None or cached[0] != cache_key:
+            cached = (cache_key, profiles.drift(*paths))
+            st.session_state.profile_drift = cached
+        rows = cached[1]
+        drifted = [row for row in rows if row["drifted"]]
+        
+        with st.expander(f"Response Drift: {len(drifted)} of {len(rows)} profiled columns changed",
+                         expanded=bool(drifted)):
+            st.caption("Kolmogorov-Smirnov tests on response length and timing, and rate tests on refusals, "
+                       f"findings and errors, computed from the runs' profiles (p < {profiles.DRIFT_P_VALUE})")
+            st.dataframe(pd.DataFrame(rows).rename(columns={
+                "vector": "Vector", "column": "Metric", "test": "Test", "statistic": "Statistic",
+                "p_value": "p-value", "drifted": "Drifted",
+            }), use_container_width=True, hide_index=True)
+    except Exception as e:
+        logger.error(f"Error computing response drift: {str(e)}")
+        st.error(f"Failed to compute response drift: {str(e)}")
+
+# Finding clusters listed per severity tab
+CLUSTERS_LISTED = 200
+
+@rendertime.profiled
+def results_clusters(results):
+    """Clusters of near-duplicate findings, clustering results that arrived without them"""
+    if results.get("clusters") is not None:
+        return results["clusters"]
+    cached = st.session_state.get("finding_clusters")
+    if cached is None or cached[0] is not results:
+        cached = (results, cluster.cluster_results(results))
+        st.session_state.finding_clusters = cached
+    return cached[1]
+
+@rendertime.profiled
+def results_overview_figures(results):
+    """Severity pie and per-vector bar charts, built once per results and theme"""
+    theme = get_theme()
+    cached = st.session_state.get("overview_figures")
+    if cached is not None and cached[0] is results and cached[1] is theme:
+        return cached[2]
+    vulnerabilities = results.get("vulnerabilities", [])
+    
+    # Count vulnerabilities by severity
+    severity_counts = {}
+    for vuln in vulnerabilities:
+        severity = vuln.get("severity", "unknown")
+        if severity not in severity_counts:
+            severity_counts[severity] = 0
+        severity_counts[severity] += 1
+    
+    # Count vulnerabilities by test vector
+    vector_counts = {}
+    for vuln in vulnerabilities:
+        vector = vuln.get("test_name", "unknown")
+        if vector not in vector_counts:
+            vector_counts[vector] = 0
+        vector_counts[vector] += 1
+    
+    # Create pie chart for severity distribution
+    labels = list(severity_counts.keys())
+    values = list(severity_counts.values())
+    
+    colors = {
+        "low": "green",
+        "medium": "yellow",
+        "high": "orange",
+        "critical": "red",
+        "unknown": "gray"
+    }
+    
+    severity_fig = px.pie(
+        names=labels,
+        values=values,
+        title="Vulnerabilities by Severity",
+        color=labels,
+        color_discrete_map={label: colors.get(label, "gray") for label in labels}
+    )
+    
+    # Create bar chart for test vector distribution
+    vector_fig = px.bar(
+        x=list(vector_counts.keys()),
+        y=list(vector_counts.values()),
+        title="Vulnerabilities by Test Vector",
+        labels={"x": "Test Vector", "y": "Vulnerabilities"},
+        color_discrete_sequence=[theme["primary"]]
+    )
+    
+    for fig in (severity_fig, vector_fig):
+        fig.update_layout(
+            margin=dict(l=20, r=20, t=40, b=20),
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            font=dict(color=theme["text"])
+        )
+    
+    st.session_state.overview_figures = (results, theme, (severity_fig, vector_fig))
+    return severity_fig, vector_fig
+
+@rendertime.profiled
+def render_finding_cluster(finding_cluster):
+    """One expander for a cluster, showing its representative finding"""
+    severity = finding_cluster.get("severity") or "unknown"
+    severity_emoji = {
+        "low": "🟢",
+        "medium": "🟡",
+        "high": "🟠",
+        "critical": "🔴",
+        "unknown": "⚪"
+    }.get(severity, "⚪")
+    count = finding_cluster.get("count", 1)
+    similar = f" (+{count - 1:,} similar)" if count > 1 else ""
+    
+    with st.expander(f"{severity_emoji} {finding_cluster.get('representative', 'Unknown')}: "
+                     f"{finding_cluster.get('test_name', 'Unknown Test')}{similar}"):
+        st.markdown(f"**Severity:** {severity.upper()}")
+        st.markdown(f"**Details:** {finding_cluster.get('details', 'No details available.')}")
+        st.markdown(f"**Findings in cluster:** {count:,} ({finding_cluster.get('cluster')})")
+        st.markdown(f"**First found:** {finding_cluster.get('timestamp', 'Unknown')}")
+
+@timed_fragment("export_panel")
+def render_export_panel(results):
+    """Export format and download buttons; changing the format reruns only this panel"""
+    st.markdown("<h3>Export Results</h3>", unsafe_allow_html=True)
+    
+    try:
+        col1, col2, col3 = st.columns([2, 1, 2])
+        
+        format_options = [fmt for fmt in exports.EXPORT_FORMATS if fmt != "parquet" or exports.parquet_available()]
+        
+        with col1:
+            export_format = st.selectbox(
+                "Export Format",
+                format_options,
+                format_func=lambda fmt: exports.EXPORT_FORMATS[fmt]["label"],
+                key="export_format"
+            )
+        
+        with col2:
+            export_gzip = st.checkbox("Gzip", value=False, key="export_gzip")
+        
+        with col3:
+            # The export is only serialized when the button is clicked
+            st.download_button(
+                label=f"Download {exports.EXPORT_FORMATS[export_format]['label']}",
+                data=functools.partial(exports.export_buffer, results, export_format, export_gzip),
+                file_name=exports.export_file_name(export_format, export_gzip),
+                mime=exports.export_mime(export_format, export_gzip),
+                key="download_export"
+            )
+        
+        profile_path = (results.get("profile") or {}).get("path")
+        if profile_path and os.path.isdir(profile_path):
+            st.download_button(
+                label="Download Response Profiles (WhyLabs)",
+                data=functools.partial(profiles.export_whylabs, profile_path),
+                file_name=f"{os.path.basename(profile_path)}_profiles.zip",
+                mime="application/zip",
+                key="download_profiles",
+                help="whylogs profiles per vector, ready for offline upload to WhyLabs"
+            )
+    except Exception as e:
+        logger.error(f"Error preparing export download: {str(e)}")
+        st.error(f"Failed to prepare export download: {str(e)}")
+
+@rendertime.profiled
 def render_results_analyzer():
     """Render the results analyzer page safely"""
     try:
@@ -1119,6 +1968,12 @@ def render_results_analyzer():
         <p>Explore and analyze security assessment results</p>
         """, unsafe_allow_html=True)
         
+        view = st.radio("View", ["Current Run", "Compare Runs"], horizontal=True, key="results_view",
+                        label_visibility="collapsed")
+        if view == "Compare Runs":
+            render_run_comparison()
+            return
+        
         # Check if there are results to display
         if not st.session_state.test_results:
             st.warning("No Results Available - Run an assessment to generate results.")
@@ -1169,176 +2024,120 @@ def render_results_analyzer():
         # Prepare data for charts
         if vulnerabilities:
             try:
-                # Count vulnerabilities by severity
-                severity_counts = {}
-                for vuln in vulnerabilities:
-                    severity = vuln.get("severity", "unknown")
-                    if severity not in severity_counts:
-                        severity_counts[severity] = 0
-                    severity_counts[severity] += 1
-                
-                # Count vulnerabilities by test vector
-                vector_counts = {}
-                for vuln in vulnerabilities:
-                    vector = vuln.get("test_name", "unknown")
-                    if vector not in vector_counts:
-                        vector_counts[vector] = 0
-                    vector_counts[vector] += 1
+                severity_fig, vector_fig = results_overview_figures(results)
                 
                 # Create two columns for charts
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    # Create pie chart for severity distribution
-                    labels = list(severity_counts.keys())
-                    values = list(severity_counts.values())
-                    
-                    colors = {
-                        "low": "green",
-                        "medium": "yellow",
-                        "high": "orange",
-                        "critical": "red",
-                        "unknown": "gray"
-                    }
-                    
-                    fig = px.pie(
-                        names=labels,
-                        values=values,
-                        title="Vulnerabilities by Severity",
-                        color=labels,
-                        color_discrete_map={label: colors.get(label, "gray") for label in labels}
-                    )
-                    
-                    fig.update_layout(
-                        margin=dict(l=20, r=20, t=40, b=20),
-                        paper_bgcolor='rgba(0,0,0,0)',
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        font=dict(color=get_theme()["text"])
-                    )
-                    
-                    st.plotly_chart(fig, use_container_width=True)
+                    st.plotly_chart(severity_fig, use_container_width=True)
                 
                 with col2:
-                    # Create bar chart for test vector distribution
-                    fig = px.bar(
-                        x=list(vector_counts.keys()),
-                        y=list(vector_counts.values()),
-                        title="Vulnerabilities by Test Vector",
-                        labels={"x": "Test Vector", "y": "Vulnerabilities"},
-                        color_discrete_sequence=[get_theme()["primary"]]
-                    )
-                    
-                    fig.update_layout(
-                        margin=dict(l=20, r=20, t=40, b=20),
-                        paper_bgcolor='rgba(0,0,0,0)',
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        font=dict(color=get_theme()["text"])
-                    )
-                    
-                    st.plotly_chart(fig, use_container_width=True)
+                    st.plotly_chart(vector_fig, use_container_width=True)
             except Exception as e:
                 logger.error(f"Error rendering charts: {str(e)}")
                 st.error(f"Failed to render charts: {str(e)}")
         
-        # Detailed vulnerability listing
+        # Throughput, latency and findings over the run
+        if results.get("timeline"):
+            render_run_timeline(results["timeline"], results.get("resilience"), results.get("streaming"))
+        
+        # How the run compared with its plan
+        plan, measured = results.get("plan"), results.get("measured")
+        if plan and measured:
+            st.caption(f"Planned {plan['requests']:,} requests in ~{format_seconds(plan['wall_s'])} "
+                       f"({plan['basis']} latency); ran {measured['requests']:,} in "
+                       f"{format_seconds(measured['elapsed_s'])}")
+        
+        # Recorded responses can be scored again after detector or severity changes
+        if results.get("replay"):
+            st.caption(f"Re-scored {results['replay']['records']:,} recorded responses from "
+                       f"{results['replay']['cassette']} in {format_seconds(results['replay']['rescored_s'])}")
+        cassette_path = results.get("cassette") or (results.get("replay") or {}).get("cassette")
+        if cassette_path and os.path.exists(cassette_path):
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                st.caption(f"Responses recorded to {cassette_path}")
+            with col2:
+                if st.button("🔁 Re-score", key="rescore_cassette", use_container_width=True,
+                             help="Score the recorded responses again with the current detectors, without contacting the target"):
+                    job = get_job_scheduler().submit(
+                        f"Replay · {results.get('target', 'Unknown')}", engine.replay_job, cassette_path,
+                        {"profile_dir": PROFILE_DIR}, priority=scheduler.PRIORITIES["High"],
+                        meta={"kind": "assessment", "suite": "Replay", "target": results.get("target")}
+                    )
+                    attach_run_job(job)
+                    set_page("Run Assessment")
+                    safe_rerun()
+        
+        # Fairness metrics with bootstrap intervals
+        if results.get("fairness"):
+            render_fairness_report(results["fairness"])
+        
+        # Sequential verdicts per vector
+        stopped = {vid: d for vid, d in results.get("test_details", {}).items() if "stop_reason" in d}
+        if stopped:
+            st.markdown("<h3>Vector Verdicts</h3>", unsafe_allow_html=True)
+            st.dataframe(pd.DataFrame([
+                {
+                    "Vector": d["name"],
+                    "Requests": d["requests"],
+                    "Findings": d["findings"],
+                    "Verdict": d["verdict"],
+                    "Stop Reason": d["stop_reason"]
+                }
+                for d in stopped.values()
+            ]), use_container_width=True, hide_index=True)
+        
+        # Requests per vector and mutation family
+        if results.get("allocation"):
+            render_allocation_report(results["allocation"])
+        
+        # Personal data found by the PII scanner
+        if results.get("privacy"):
+            render_privacy_report(results["privacy"])
+        
+        # Detailed vulnerability listing, one representative per cluster of near-duplicates
         st.markdown("<h3>Detailed Findings</h3>", unsafe_allow_html=True)
         
         if vulnerabilities:
             try:
+                clusters = results_clusters(results)
+                st.caption(f"{len(vulnerabilities):,} findings in {len(clusters):,} clusters of near-duplicates")
+                
                 # Create tabs for different severity levels
-                severities = list(set(vuln["severity"] for vuln in vulnerabilities if "severity" in vuln))
+                severities = list(set(c["severity"] for c in clusters if c.get("severity")))
                 severities.sort(key=lambda s: {"critical": 0, "high": 1, "medium": 2, "low": 3}.get(s, 4))
                 
                 # Add "All" tab at the beginning
                 tabs = st.tabs(["All"] + severities)
                 
-                with tabs[0]:  # "All" tab
-                    for i, vuln in enumerate(vulnerabilities):
-                        severity = vuln.get("severity", "unknown")
-                        severity_emoji = {
-                            "low": "🟢",
-                            "medium": "🟡",
-                            "high": "🟠",
-                            "critical": "🔴",
-                            "unknown": "⚪"
-                        }.get(severity, "⚪")
-                        
-                        with st.expander(f"{severity_emoji} {vuln.get('id', 'Unknown')}: {vuln.get('test_name', 'Unknown Test')}"):
-                            st.markdown(f"**Severity:** {severity.upper()}")
-                            st.markdown(f"**Details:** {vuln.get('details', 'No details available.')}")
-                            st.markdown(f"**Found:** {vuln.get('timestamp', 'Unknown')}")
-                
-                # Create content for each severity tab
-                for i, severity in enumerate(severities):
-                    with tabs[i+1]:  # +1 because "All" is the first tab
-                        severity_vulns = [v for v in vulnerabilities if v.get("severity") == severity]
-                        
-                        for j, vuln in enumerate(severity_vulns):
-                            severity_emoji = {
-                                "low": "🟢",
-                                "medium": "🟡",
-                                "high": "🟠",
-                                "critical": "🔴",
-                                "unknown": "⚪"
-                            }.get(severity, "⚪")
-                            
-                            with st.expander(f"{severity_emoji} {vuln.get('id', 'Unknown')}: {vuln.get('test_name', 'Unknown Test')}"):
-                                st.markdown(f"**Severity:** {severity.upper()}")
-                                st.markdown(f"**Details:** {vuln.get('details', 'No details available.')}")
-                                st.markdown(f"**Found:** {vuln.get('timestamp', 'Unknown')}")
+                for tab, severity in zip(tabs, [None] + severities):
+                    with tab:
+                        shown = [c for c in clusters if severity is None or c.get("severity") == severity]
+                        for c in shown[:CLUSTERS_LISTED]:
+                            render_finding_cluster(c)
+                        if len(shown) > CLUSTERS_LISTED:
+                            st.caption(f"{len(shown) - CLUSTERS_LISTED:,} smaller clusters not listed; export the results to see every finding.")
             except Exception as e:
                 logger.error(f"Error rendering vulnerability details: {str(e)}")
                 st.error(f"Failed to render vulnerability details: {str(e)}")
                 
                 # Fallback: Simple list of vulnerabilities
-                for vuln in vulnerabilities:
+                for vuln in vulnerabilities[:CLUSTERS_LISTED]:
                     st.markdown(f"- **{vuln.get('id', 'Unknown')}**: {vuln.get('details', 'No details')}")
         else:
             st.info("No vulnerabilities were found in this assessment.")
         
         # Export results
-        st.markdown("<h3>Export Results</h3>", unsafe_allow_html=True)
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            try:
-                st.download_button(
-                    label="Download JSON Report",
-                    data=json.dumps(results, indent=2),
-                    file_name=f"security_assessment_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                    mime="application/json",
-                    key="download_json"
-                )
-            except Exception as e:
-                logger.error(f"Error preparing JSON download: {str(e)}")
-                st.error(f"Failed to prepare JSON download: {str(e)}")
-        
-        with col2:
-            try:
-                if vulnerabilities:
-                    # Convert vulnerabilities to DataFrame
-                    df = pd.DataFrame(vulnerabilities)
-                    csv = df.to_csv(index=False)
-                    
-                    st.download_button(
-                        label="Download CSV Vulnerabilities",
-                        data=csv,
-                        file_name=f"vulnerabilities_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                        mime="text/csv",
-                        key="download_csv"
-                    )
-                else:
-                    st.button("Download CSV Vulnerabilities", disabled=True, key="download_csv_disabled")
-            except Exception as e:
-                logger.error(f"Error preparing CSV download: {str(e)}")
-                st.error(f"Failed to prepare CSV download: {str(e)}")
+        render_export_panel(results)
     
     except Exception as e:
         logger.error(f"Error rendering results analyzer: {str(e)}")
         logger.debug(traceback.format_exc())
         st.error(f"Error in results analyzer: {str(e)}")
 
+@rendertime.profiled
 def render_ethical_ai_testing():
     """Render the ethical AI testing page safely"""
     try:
@@ -1355,6 +2154,9 @@ def render_ethical_ai_testing():
                 safe_rerun()
             return
         
+        # Priority applies to every suite queued from this page
+        job_priority = st.selectbox("Job Priority", list(scheduler.PRIORITIES), index=1, key="ethical_job_priority")
+        
         # Create tabs for different testing frameworks
         try:
             tabs = st.tabs(["OWASP LLM", "NIST Framework", "Fairness & Bias", "Privacy Compliance", "Synthetic Extreme"])
@@ -1380,8 +2182,8 @@ def render_ethical_ai_testing():
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    target_options = [t["name"] for t in st.session_state.targets]
-                    st.selectbox("Select Target", target_options, key="owasp_target")
+                    target_options = st.session_state.targets.names()
+                    st.multiselect("Select Targets", target_options, default=target_options[:1], key="owasp_targets")
                 
                 with col2:
                     st.multiselect("Select Tests", [
@@ -1392,8 +2194,8 @@ def render_ethical_ai_testing():
                     ], default=["Prompt Injection", "Insecure Output Handling"], key="owasp_tests")
                 
                 if st.button("Run OWASP LLM Tests", key="run_owasp"):
-                    st.info("OWASP LLM testing would start here")
-                    # In a real implementation, this would start the tests
+                    queue_suite_jobs("owasp", st.session_state.owasp_targets, st.session_state.owasp_tests,
+                                     current_run_settings(), job_priority)
             
             with tabs[1]:
                 st.markdown("<h3>NIST AI Risk Management Framework</h3>", unsafe_allow_html=True)
@@ -1410,8 +2212,8 @@ def render_ethical_ai_testing():
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    target_options = [t["name"] for t in st.session_state.targets]
-                    st.selectbox("Select Target", target_options, key="nist_target")
+                    target_options = st.session_state.targets.names()
+                    st.multiselect("Select Targets", target_options, default=target_options[:1], key="nist_targets")
                 
                 with col2:
                     st.multiselect("Select Framework Components", [
@@ -1422,7 +2224,8 @@ def render_ethical_ai_testing():
                     ], default=["Governance", "Management"], key="nist_components")
                 
                 if st.button("Run NIST Framework Assessment", key="run_nist"):
-                    st.info("NIST Framework assessment would start here")
+                    queue_suite_jobs("nist", st.session_state.nist_targets, st.session_state.nist_components,
+                                     current_run_settings(), job_priority)
             
             with tabs[2]:
                 st.markdown("<h3>Fairness & Bias Testing</h3>", unsafe_allow_html=True)
@@ -1439,8 +2242,8 @@ def render_ethical_ai_testing():
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    target_options = [t["name"] for t in st.session_state.targets]
-                    st.selectbox("Select Target", target_options, key="fairness_target")
+                    target_options = st.session_state.targets.names()
+                    st.multiselect("Select Targets", target_options, default=target_options[:1], key="fairness_targets")
                 
                 with col2:
                     st.multiselect("Select Fairness Metrics", [
@@ -1452,8 +2255,28 @@ def render_ethical_ai_testing():
                 
                 st.text_area("Demographic Groups (one per line)", "Group A\nGroup B\nGroup C\nGroup D", key="demographic_groups")
                 
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.number_input("Probes per Group", 10, 100000, 200, step=10, key="fairness_samples")
+                with col2:
+                    st.number_input("Bootstrap Replicates", 100, 20000, 1000, step=100, key="fairness_replicates")
+                
                 if st.button("Run Fairness Assessment", key="run_fairness"):
-                    st.info("Fairness assessment would start here")
+                    groups = [g.strip() for g in st.session_state.demographic_groups.splitlines() if g.strip()]
+                    if len(groups) < 2 or not st.session_state.fairness_metrics:
+                        st.error("Please enter at least two groups and select at least one metric")
+                    else:
+                        queue_target_jobs(
+                            vectors.SUITES["fairness"]["label"],
+                            st.session_state.fairness_targets,
+                            job_priority,
+                            fairness.fairness_job,
+                            groups,
+                            st.session_state.fairness_metrics,
+                            st.session_state.fairness_samples,
+                            current_run_settings(),
+                            replicates=st.session_state.fairness_replicates
+                        )
             
             with tabs[3]:
                 st.markdown("<h3>Privacy Compliance Testing</h3>", unsafe_allow_html=True)
@@ -1470,8 +2293,8 @@ def render_ethical_ai_testing():
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    target_options = [t["name"] for t in st.session_state.targets]
-                    st.selectbox("Select Target", target_options, key="privacy_target")
+                    target_options = st.session_state.targets.names()
+                    st.multiselect("Select Targets", target_options, default=target_options[:1], key="privacy_targets")
                 
                 with col2:
                     st.multiselect("Select Regulations", [
@@ -1481,8 +2304,13 @@ def render_ethical_ai_testing():
                         "PIPEDA"
                     ], default=["GDPR"], key="privacy_regulations")
                 
+                st.caption("Every response is scanned for personal data (emails, phone numbers, national IDs, "
+                           "payment cards, health terms) and each hit is mapped to the selected regulations.")
+                
                 if st.button("Run Privacy Assessment", key="run_privacy"):
-                    st.info("Privacy assessment would start here")
+                    settings = {**current_run_settings(), "pii_regulations": st.session_state.privacy_regulations}
+                    queue_suite_jobs("privacy", st.session_state.privacy_targets, st.session_state.privacy_regulations,
+                                     settings, job_priority)
             
             with tabs[4]:
                 st.markdown("<h3>Synthetic Extreme Testing</h3>", unsafe_allow_html=True)
@@ -1499,8 +2327,8 @@ def render_ethical_ai_testing():
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    target_options = [t["name"] for t in st.session_state.targets]
-                    st.selectbox("Select Target", target_options, key="extreme_target")
+                    target_options = st.session_state.targets.names()
+                    st.multiselect("Select Targets", target_options, default=target_options[:1], key="extreme_targets")
                 
                 with col2:
                     st.multiselect("Select Techniques", [
@@ -1513,17 +2341,23 @@ def render_ethical_ai_testing():
                 st.slider("Testing Intensity", 1, 10, 5, key="testing_intensity")
                 
                 if st.button("Run Extreme Testing", key="run_extreme"):
-                    st.info("Synthetic extreme testing would start here")
+                    # Intensity scales the request budget; the allocator decides how it is spent
+                    settings = {**current_run_settings(), "variations": st.session_state.testing_intensity * 10}
+                    queue_suite_jobs("extreme", st.session_state.extreme_targets, st.session_state.extreme_techniques,
+                                     settings, job_priority)
         
         except Exception as e:
             logger.error(f"Error rendering ethical AI tabs: {str(e)}")
             st.error(f"Failed to render ethical AI testing interface: {str(e)}")
+        
+        render_job_queue()
     
     except Exception as e:
         logger.error(f"Error rendering ethical AI testing: {str(e)}")
         logger.debug(traceback.format_exc())
         st.error(f"Error in ethical AI testing: {str(e)}")
 
+@rendertime.profiled
 def render_high_volume_testing():
     """Render the high-volume testing page safely"""
     try:
@@ -1547,7 +2381,7 @@ def render_high_volume_testing():
             col1, col2 = st.columns(2)
             
             with col1:
-                target_options = [t["name"] for t in st.session_state.targets]
+                target_options = st.session_state.targets.names()
                 st.selectbox("Select Target", target_options, key="highvol_target")
                 
                 total_tests = st.slider("Total Tests (thousands)", 10, 1000, 100, key="highvol_tests")
@@ -1662,6 +2496,7 @@ def render_high_volume_testing():
         logger.debug(traceback.format_exc())
         st.error(f"Error in high-volume testing: {str(e)}")
 
+@rendertime.profiled
 def render_settings():
     """Render the settings page safely"""
     try:
@@ -1717,8 +2552,24 @@ def render_settings():
                 max_concurrent = st.number_input("Maximum Concurrent Tests", 1, 32, 4, key="max_concurrent_tests")
                 save_logs = st.checkbox("Save Detailed Logs", value=True, key="save_detailed_logs")
             
+            # Per-request and per-finding log lines are sampled process-wide
+            current_rates = logsetup.sample_rates()
+            col1, col2 = st.columns(2)
+            with col1:
+                request_sampling = st.slider("Request Log Sampling", 0.0, 1.0, current_rates[logsetup.REQUEST], 0.01,
+                                             key="request_log_sampling", disabled=not save_logs,
+                                             help="Share of individual requests written to the log")
+            with col2:
+                finding_sampling = st.slider("Finding Log Sampling", 0.0, 1.0, current_rates[logsetup.FINDING], 0.01,
+                                             key="finding_log_sampling", disabled=not save_logs,
+                                             help="Share of individual findings written to the log")
+            
             # Save testing settings
             if st.button("Save Testing Settings", key="save_testing"):
+                if save_logs:
+                    logsetup.set_sample_rates(request=request_sampling, finding=finding_sampling)
+                else:
+                    logsetup.set_sample_rates(request=0.0, finding=0.0)
                 st.success("Testing settings saved successfully!")
                 logger.info("Testing settings updated")
         except Exception as e:
@@ -1743,6 +2594,35 @@ def render_settings():
             logger.error(f"Error rendering notification settings: {str(e)}")
             st.error(f"Failed to render notification settings: {str(e)}")
         
+        # Developer settings
+        st.markdown("<h3>Developer Settings</h3>", unsafe_allow_html=True)
+        
+        try:
+            profiler_settings = st.session_state.render_profiler
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                profile_reruns = st.checkbox("Render Profiler", value=profiler_settings["enabled"], key="profile_reruns",
+                                             help="Time every rerun and page section, and show them in a panel below each page")
+                dump_stats = st.checkbox("Dump cProfile Stats per Page", value=profiler_settings["dump_stats"],
+                                         key="profile_dump_stats", disabled=not profile_reruns)
+            
+            with col2:
+                stats_dir = st.text_input("Profile Stats Directory", profiler_settings["stats_dir"],
+                                          key="profile_stats_dir", disabled=not (profile_reruns and dump_stats))
+            
+            if st.button("Save Developer Settings", key="save_developer"):
+                st.session_state.render_profiler = {
+                    "enabled": profile_reruns,
+                    "dump_stats": profile_reruns and dump_stats,
+                    "stats_dir": stats_dir.strip() or rendertime.STATS_DIR
+                }
+                st.success("Developer settings saved successfully!")
+                logger.info(f"Render profiler {'enabled' if profile_reruns else 'disabled'}")
+        except Exception as e:
+            logger.error(f"Error rendering developer settings: {str(e)}")
+            st.error(f"Failed to render developer settings: {str(e)}")
+        
         # System information
         st.markdown("<h3>System Information</h3>", unsafe_allow_html=True)
         
@@ -1796,18 +2676,73 @@ def render_settings():
         logger.debug(traceback.format_exc())
         st.error(f"Error in settings: {str(e)}")
 
+# Reruns listed in the developer panel
+PROFILED_RERUNS_SHOWN = 20
+
+def render_profiler_panel():
+    """Collapsible table of this session's recent reruns and the sections of the slowest one"""
+    try:
+        render_profiler = rendertime.profiler()
+        ctx = get_script_run_ctx()
+        reruns = render_profiler.recent(owner=ctx.session_id if ctx else None)[:PROFILED_RERUNS_SHOWN]
+        
+        with st.expander(f"🛠️ Render Profiler · last {len(reruns)} reruns"):
+            if not reruns:
+                st.caption("No reruns profiled yet; interact with the app to record one.")
+                return
+            
+            st.dataframe(pd.DataFrame([
+                {
+                    "Run": rerun["key"],
+                    "At": datetime.fromtimestamp(rerun["started"]).strftime("%H:%M:%S"),
+                    "Wall ms": rerun["wall_ms"],
+                    "CPU ms": rerun["cpu_ms"],
+                    "Elements": rerun["elements"],
+                    "HTML KB": round(rerun["html_bytes"] / 1024, 1),
+                    "Plotly KB": round(rerun["plotly_bytes"] / 1024, 1),
+                    "Sent KB": round(rerun["bytes"] / 1024, 1),
+                    "Budget": "⚠️ Over" if rerun["over_budget"] else "✅"
+                }
+                for rerun in reruns
+            ]), use_container_width=True, hide_index=True)
+            
+            slowest = max(reruns, key=lambda rerun: rerun["wall_ms"])
+            if slowest["sections"]:
+                st.markdown(f"**Sections of the slowest rerun** ({slowest['key']}, {slowest['wall_ms']:.0f} ms)")
+                st.dataframe(pd.DataFrame(slowest["sections"]).rename(columns={
+                    "section": "Section", "calls": "Calls", "wall_ms": "Wall ms", "cpu_ms": "CPU ms",
+                    "elements": "Elements", "html_bytes": "HTML Bytes", "plotly_bytes": "Plotly Bytes",
+                    "bytes": "Sent Bytes"
+                }), use_container_width=True, hide_index=True)
+            
+            settings = st.session_state.render_profiler
+            stats_note = (f" · cProfile stats per page in {settings['stats_dir']}/ (read with python -m pstats)"
+                          if settings.get("dump_stats") else "")
+            st.caption(f"Budget {render_profiler.budget_ms} ms per rerun · section times include nested sections"
+                       f"{stats_note}")
+    except Exception as e:
+        logger.error(f"Error rendering render profiler: {str(e)}")
+        st.error(f"Failed to render render profiler: {str(e)}")
+
 # Main application
 def main():
     """Main application entry point with error handling"""
+    key = rendertime.scope(rendertime.PAGE, st.session_state.get("current_page", "Dashboard"))
+    with rendertime.timings().measure(key), profiled_run(key):
+        render_app()
+
+def render_app():
+    """Render the whole app for one script run"""
     try:
         # Initialize session state
         initialize_session_state()
         
-        # Clean up threads
-        cleanup_threads()
+        # Pick up results of the attached assessment job
+        sync_run_job()
         
         # Apply CSS
-        st.markdown(load_css(), unsafe_allow_html=True)
+        with rendertime.profiler().section("css"):
+            st.markdown(load_css(), unsafe_allow_html=True)
         
         # Show error message if exists
         if st.session_state.error_message:
@@ -1850,6 +2785,10 @@ def main():
             logger.warning(f"Invalid page requested: {st.session_state.current_page}")
             st.session_state.current_page = "Dashboard"
             render_dashboard()
+        
+        # Developer panel with the recent profiled reruns
+        if st.session_state.render_profiler.get("enabled"):
+            render_profiler_panel()
     
     except Exception as e:
         logger.critical(f"Critical application error: {str(e)}")
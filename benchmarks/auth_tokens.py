@@ -0,0 +1,147 @@
+"""Measure what the shared, pre-refreshed token cache saves over minting per request.
+
+Starts a local endpoint with an OAuth token route that takes ``TOKEN_MS``
+to issue tokens lasting ``TOKEN_TTL`` seconds. Its model route rejects
+unknown or expired bearer tokens with HTTP 401 and verifies JWTs signed
+with ``SECRET``. It then runs the same live assessment three ways:
+- fetching a new token from the endpoint for every request;
+- with ``token_endpoint`` auth through the cache;
+- with locally signed ``jwt`` auth through the cache.
+Each run is long enough to outlive several tokens. For each run it
+reports token fetches, 401s and requests per second.
+
+    python benchmarks/auth_tokens.py [variations]
+"""
+
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from renegade import auth, engine, logsetup, vectors  # noqa: E402
+
+TOKEN_MS = 50     # Milliseconds the token endpoint takes to issue a token
+TOKEN_TTL = 3     # Seconds an issued token is valid
+DELAY = 0.01      # Seconds the model route takes to answer
+SECRET = "benchmark-signing-key-of-32-bytes"
+BODY = json.dumps({"output": "I'm sorry, but I can't help with that request."}).encode()
+SETTINGS = {"concurrency": 16, "allocation": "even", "duration": 600, "retries": 0, "circuit_breaker": False,
+            "pii_regulations": [], "profile": False}
+
+
+class Endpoint:
+    """Token and model routes served from a background thread"""
+
+    def __init__(self):
+        self.tokens = {}
+        self.issued = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    def reset(self):
+        self.issued = self.rejected = 0
+
+    def _authorized(self, header):
+        token = header[len("Bearer "):] if header.startswith("Bearer ") else ""
+        if token.count(".") == 2:
+            try:
+                jwt.decode(token, SECRET, algorithms=["HS256"])
+                return True
+            except jwt.InvalidTokenError:
+                return False
+        with self._lock:
+            return self.tokens.get(token, 0) > time.monotonic()
+
+    def start(self):
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status, body):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path == "/token":
+                    time.sleep(TOKEN_MS / 1000)
+                    token = secrets.token_hex(16)
+                    with endpoint._lock:
+                        endpoint.tokens[token] = time.monotonic() + TOKEN_TTL
+                        endpoint.issued += 1
+                    return self._reply(200, json.dumps({"access_token": token, "token_type": "Bearer",
+                                                        "expires_in": TOKEN_TTL}).encode())
+                if not endpoint._authorized(self.headers.get("Authorization", "")):
+                    with endpoint._lock:
+                        endpoint.rejected += 1
+                    return self._reply(401, b'{"error": "invalid_token"}')
+                time.sleep(DELAY)
+                self._reply(200, BODY)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="endpoint", daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class MintPerRequest(engine.HttpTransport):
+    """Baseline: a fresh token from the endpoint for every request"""
+
+    def build_request(self, target, payload):
+        headers, body = super().build_request({**target, "auth": None}, payload)
+        token = auth.TokenEndpointProvider(target["auth"]).fetch()
+        headers["Authorization"] = f"Bearer {token.value}"
+        return headers, body
+
+
+def main():
+    variations = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    logsetup.set_sample_rates(**{logsetup.REQUEST: 0.0})
+    endpoint = Endpoint()
+    base = endpoint.start()
+    token_auth = {"type": auth.TOKEN_ENDPOINT, "token_url": f"{base}/token", "client_id": "bench",
+                  "client_secret": "secret"}
+    runs = (
+        ("mint per request", token_auth, MintPerRequest(timeout=30)),
+        ("token endpoint, cached", token_auth, None),
+        ("jwt, cached", {"type": auth.JWT, "key": SECRET, "ttl": TOKEN_TTL}, None),
+    )
+
+    print(f"{'auth':<24}{'requests':>9}{'401s':>6}{'errors':>8}{'token fetches':>15}{'wall s':>8}{'req/s':>8}")
+    for name, config, transport in runs:
+        endpoint.reset()
+        target = {"name": f"auth-{name}", "endpoint": f"{base}/v1/generate", "transport": "http", "auth": config}
+        started = time.perf_counter()
+        results = engine.run_assessment(target, vectors.get_test_vectors(), {**SETTINGS, "variations": variations},
+                                        transport=transport)
+        elapsed = time.perf_counter() - started
+        total = results["summary"]["total_tests"]
+        errors = sum(details.get("errors", 0) for details in results["test_details"].values())
+        provider = auth.provider_for(target)
+        fetches = endpoint.issued if config["type"] == auth.TOKEN_ENDPOINT else provider.fetches
+        print(f"{name:<24}{total:>9}{endpoint.rejected:>6}{errors:>8}{fetches:>15}{elapsed:>8.1f}"
+              f"{total / elapsed:>8.0f}")
+    endpoint.stop()
+
+
+if __name__ == "__main__":
+    main()
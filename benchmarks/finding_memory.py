@@ -0,0 +1,92 @@
+"""Measure heap used by findings held as dicts versus compact records.
+
+Builds the same findings (injection findings with a response excerpt,
+spread over every registry vector and mutation) once in the old dict
+shape and once through ``engine.add_finding``, and reports the traced
+heap per finding and the time to build them.
+
+    python benchmarks/finding_memory.py [findings]
+"""
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from renegade import engine, fingerprint, logsetup, records, vectors  # noqa: E402
+
+
+def requests(count):
+    """Yield (vector, variation, response text) for ``count`` findings"""
+    arms = vectors.mutation_arms(vectors.get_test_vectors())
+    for i in range(count):
+        vector = arms[i % len(arms)]
+        variation = i // len(arms)
+        canary = engine.make_canary(vector, variation)
+        yield vector, variation, canary, f"Sure! As requested: {canary}. Here is the rest of the answer."
+
+
+def as_dicts(count, target):
+    findings = []
+    for vector, variation, canary, text in requests(count):
+        findings.append({
+            "id": f"VULN-{len(findings) + 1}",
+            "test_vector": vector["id"],
+            "test_name": vector["name"],
+            "severity": vector["severity"],
+            "details": f"{target} followed an injected instruction from the {vector['name']} "
+                       f"test vector ({vector['mutation']} payload).",
+            "timestamp": datetime.now().isoformat(),
+            "fingerprint": fingerprint.compute(target, vector["id"], "", fingerprint.response_signature(text)),
+            "response": text,
+        })
+    return findings
+
+
+def as_records(count, target):
+    results = engine.new_results({"name": target})
+    for vector, variation, canary, text in requests(count):
+        engine.add_finding(
+            results, vector, records.INJECTION_DETAILS,
+            fingerprint.compute(target, vector["id"], "", fingerprint.response_signature(text)),
+            text, canary, details_args=(target, vector["name"], vector["mutation"]),
+        )
+    return results["vulnerabilities"]
+
+
+def measure(build, count):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    findings = build(count, "production-chat-assistant")
+    elapsed = time.perf_counter() - started
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    sample = dict(findings[-1])
+    del findings
+    return used, elapsed, sample
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    logsetup.set_sample_rates(**{logsetup.FINDING: 0.0})
+
+    print(f"{'shape':<10}{'findings':>12}{'MB':>10}{'bytes/finding':>16}{'seconds':>10}")
+    samples = []
+    for name, build in (("dict", as_dicts), ("record", as_records)):
+        used, elapsed, sample = measure(build, count)
+        samples.append(sample)
+        print(f"{name:<10}{count:>12,}{used / 1e6:>10.1f}{used / count:>16.0f}{elapsed:>10.1f}")
+
+    # Both shapes must export the same fields and values, timestamps aside
+    for sample in samples:
+        sample.pop("timestamp")
+    assert samples[0] == samples[1], samples
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Compare sockets and throughput of the HTTP/1.1 pool and the HTTP/2 transport.
+
+Starts a local TLS endpoint that negotiates either HTTP/2 or HTTP/1.1 via
+ALPN and answers each request after a fixed delay. Then it runs the same
+live assessment against it with the ``http`` and ``http2`` transports at
+each concurrency level. A last run sends the HTTP/2 transport to an
+endpoint that only speaks HTTP/1.1, to check the fallback. For each run it
+reports the connections the server accepted, the most open at once and
+the requests per second.
+
+    python benchmarks/http2_transport.py [variations]
+"""
+
+import asyncio
+import datetime
+import ipaddress
+import json
+import os
+import ssl
+import sys
+import tempfile
+import threading
+import time
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from h2.config import H2Configuration
+from h2.connection import H2Connection
+from h2.events import DataReceived, RequestReceived, StreamEnded
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from renegade import engine, logsetup, vectors  # noqa: E402
+
+DELAY = 0.02  # Seconds the endpoint takes to answer
+CONCURRENCY_LEVELS = (8, 32)
+BODY = json.dumps({"output": "I'm sorry, but I can't help with that request."}).encode()
+
+
+def self_signed_certificate(directory):
+    """Write a certificate and key for 127.0.0.1 and return their paths"""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name).public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1)).not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as fileobj:
+        fileobj.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as fileobj:
+        fileobj.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                        serialization.NoEncryption()))
+    return cert_path, key_path
+
+
+class Endpoint:
+    """TLS endpoint on a background event loop speaking HTTP/2 and HTTP/1.1"""
+
+    def __init__(self, cert_path, key_path, protocols=("h2", "http/1.1")):
+        self.context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        self.context.load_cert_chain(cert_path, key_path)
+        self.context.set_alpn_protocols(list(protocols))
+        self.connections = 0
+        self.open = 0
+        self.peak_open = 0
+        self.loop = asyncio.new_event_loop()
+        self._server = None
+        self.port = None
+
+    def reset(self):
+        self.connections = self.peak_open = 0
+
+    def start(self):
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self._server = self.loop.run_until_complete(
+                asyncio.start_server(self._connection, "127.0.0.1", 0, ssl=self.context, backlog=512))
+            self.port = self._server.sockets[0].getsockname()[1]
+            ready.set()
+            self.loop.run_forever()
+
+        threading.Thread(target=run, name="endpoint", daemon=True).start()
+        ready.wait()
+        return f"https://127.0.0.1:{self.port}/v1/generate"
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    async def _connection(self, reader, writer):
+        self.connections += 1
+        self.open += 1
+        self.peak_open = max(self.peak_open, self.open)
+        try:
+            if writer.get_extra_info("ssl_object").selected_alpn_protocol() == "h2":
+                await self._serve_h2(reader, writer)
+            else:
+                await self._serve_http1(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError, ssl.SSLError):
+            pass
+        finally:
+            self.open -= 1
+            writer.close()
+
+    async def _serve_http1(self, reader, writer):
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            await asyncio.sleep(DELAY)
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                         b"Content-Length: %d\r\n\r\n%s" % (len(BODY), BODY))
+            await writer.drain()
+
+    async def _serve_h2(self, reader, writer):
+        connection = H2Connection(config=H2Configuration(client_side=False))
+        connection.initiate_connection()
+        writer.write(connection.data_to_send())
+
+        async def respond(stream_id):
+            await asyncio.sleep(DELAY)
+            connection.send_headers(stream_id, [(":status", "200"), ("content-type", "application/json"),
+                                                ("content-length", str(len(BODY)))])
+            connection.send_data(stream_id, BODY, end_stream=True)
+            writer.write(connection.data_to_send())
+
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                return
+            for event in connection.receive_data(data):
+                if isinstance(event, DataReceived):
+                    connection.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                elif isinstance(event, StreamEnded):
+                    asyncio.ensure_future(respond(event.stream_id))
+                elif isinstance(event, RequestReceived) and event.stream_ended:
+                    asyncio.ensure_future(respond(event.stream_id))
+            writer.write(connection.data_to_send())
+            await writer.drain()
+
+
+def run(endpoint, url, transport, concurrency, variations):
+    endpoint.reset()
+    target = {"name": f"bench-{transport}", "endpoint": url, "transport": transport}
+    settings = {"variations": variations, "concurrency": concurrency, "allocation": "even", "duration": 600,
+                "retries": 0, "circuit_breaker": False, "pii_regulations": []}
+    started = time.perf_counter()
+    results = engine.run_assessment(target, vectors.get_test_vectors(), settings)
+    elapsed = time.perf_counter() - started
+    errors = sum(details.get("errors", 0) for details in results["test_details"].values())
+    total = results["summary"]["total_tests"]
+    return total, errors, endpoint.connections, endpoint.peak_open, total / elapsed
+
+
+def main():
+    variations = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    logsetup.set_sample_rates(**{logsetup.REQUEST: 0.0})
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path, key_path = self_signed_certificate(directory)
+        # Both clients verify against the bundle named here
+        os.environ["SSL_CERT_FILE"] = os.environ["REQUESTS_CA_BUNDLE"] = cert_path
+
+        both = Endpoint(cert_path, key_path)
+        url = both.start()
+        print(f"{'transport':<24}{'concurrency':>12}{'requests':>10}{'errors':>8}{'sockets':>9}{'peak open':>11}{'req/s':>9}")
+        for concurrency in CONCURRENCY_LEVELS:
+            for transport in ("http", "http2"):
+                total, errors, sockets, peak, rate = run(both, url, transport, concurrency, variations)
+                print(f"{transport:<24}{concurrency:>12}{total:>10}{errors:>8}{sockets:>9}{peak:>11}{rate:>9.0f}")
+        both.stop()
+
+        http1_only = Endpoint(cert_path, key_path, protocols=("http/1.1",))
+        url = http1_only.start()
+        concurrency = CONCURRENCY_LEVELS[-1]
+        total, errors, sockets, peak, rate = run(http1_only, url, "http2", concurrency, variations)
+        print(f"{'http2 -> http/1.1 only':<24}{concurrency:>12}{total:>10}{errors:>8}{sockets:>9}{peak:>11}{rate:>9.0f}")
+        http1_only.stop()
+
+
+if __name__ == "__main__":
+    main()
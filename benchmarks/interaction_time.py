@@ -0,0 +1,115 @@
+"""Measure the server time of common UI interactions, full rerun vs fragment rerun.
+
+Drives the Streamlit app with ``AppTest`` and repeats a few interactions:
+- ticking a vector on Test Configuration and on Run Assessment;
+- changing the export format on a large Results Analyzer page;
+- refreshing the progress of a running assessment.
+For each it reports the median server time of the whole script run, and of
+the fragment holding the widget. ``AppTest`` always reruns the whole
+script. A live server reruns only the fragment, so the fragment column is
+what the interaction costs there. Both come from the app's own
+``rendertime`` timings.
+
+    python benchmarks/interaction_time.py [repeats]
+"""
+
+import os
+import statistics
+import sys
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from renegade import engine, logsetup, rendertime, vectors  # noqa: E402
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Renegade1streamlit_app.py")
+VECTOR_ID = vectors.get_test_vectors()[0]["id"]
+
+
+def large_results():
+    """A finished simulated run with a few thousand findings"""
+    settings = {"variations": 4000, "concurrency": 4, "allocation": "even", "duration": 600, "profile": False,
+                "pii_regulations": []}
+    return engine.run_assessment({"name": "bench"}, vectors.get_test_vectors(), settings,
+                                 transport=engine.SimulatedTransport(latency=None, seed=1))
+
+
+def toggle_checkbox(key):
+    def interact(at):
+        box = at.checkbox(key=key)
+        box.set_value(not box.value).run()
+    return interact
+
+
+def switch_export_format(at):
+    box = at.selectbox(key="export_format")
+    box.set_value("csv" if box.value != "csv" else "json").run()
+
+
+def refresh_progress(at):
+    at.button(key="refresh_test").click().run()
+
+
+def measure(at, page, fragment, interact, repeats):
+    at.session_state.current_page = page
+    at.run()
+    timings = rendertime.timings()
+    full, partial = [], []
+    for _ in range(repeats):
+        timings.clear()
+        interact(at)
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        full.append(timings.last(rendertime.scope(rendertime.PAGE, page)))
+        partial.append(timings.last(rendertime.scope(rendertime.FRAGMENT, fragment)))
+    fragment_ms = statistics.median(partial) if None not in partial else None
+    return statistics.median(full), fragment_ms
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    logsetup.set_sample_rates(**{logsetup.REQUEST: 0.0, logsetup.FINDING: 0.0})
+    results = large_results()
+
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.run()
+    at.session_state.targets.add({"name": "bench", "endpoint": "http://127.0.0.1:9/v1"})
+    at.session_state.test_results = results
+
+    interactions = [
+        ("Tick a vector (Test Configuration)", "Test Configuration", "vector_checklist",
+         toggle_checkbox(f"enable_{VECTOR_ID}")),
+        ("Tick a vector (Run Assessment)", "Run Assessment", "run_panel", toggle_checkbox(f"run_tv_{VECTOR_ID}")),
+        (f"Export format ({len(results['vulnerabilities']):,} findings)", "Results Analyzer", "export_panel",
+         switch_export_format),
+    ]
+    print(f"{'interaction':<42}{'full rerun ms':>15}{'fragment ms':>13}")
+    for label, page, fragment, interact in interactions:
+        full_ms, fragment_ms = measure(at, page, fragment, interact, repeats)
+        fragment_text = f"{fragment_ms:.1f}" if fragment_ms is not None else "-"
+        print(f"{label:<42}{full_ms:>15.1f}{fragment_text:>13}")
+
+    # Follow a long simulated run; its target must answer health probes
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SimpleHTTPRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    at.session_state.targets.add({"name": "progress", "endpoint": f"http://127.0.0.1:{server.server_port}/"})
+    at.session_state.saved_run_config = {"settings": {"variations": 1000}}
+    at.session_state.current_page = "Run Assessment"
+    at.run()
+    at.selectbox(key="run_target").set_value("progress").run()
+    at.slider(key="run_duration").set_value(60).run()
+    at.button(key="start_assessment").click().run()
+    try:
+        full_ms, fragment_ms = measure(at, "Run Assessment", "run_progress", refresh_progress, repeats)
+        fragment_text = f"{fragment_ms:.1f}" if fragment_ms is not None else "-"
+        print(f"{'Refresh a running assessment':<42}{full_ms:>15.1f}{fragment_text:>13}")
+    finally:
+        at.button(key="stop_test").click().run()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
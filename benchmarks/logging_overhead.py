@@ -0,0 +1,89 @@
+"""Measure logging overhead per request on the engine's hot path.
+
+Runs the same simulated assessment (no network latency) with logging
+disabled, with the old synchronous FileHandler + StreamHandler setup, and
+with the queued pipeline at full and default sampling, then reports the
+added cost per request in microseconds.
+
+    python benchmarks/logging_overhead.py [requests]
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from renegade import engine, logsetup, vectors  # noqa: E402
+
+
+def reset_root():
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    logsetup.stop_logging()
+
+
+def timed_run(requests):
+    test_vectors = vectors.get_test_vectors()
+    settings = {
+        "variations": requests // len(test_vectors),
+        "concurrency": 8,
+        "duration": 600,
+        "allocation": "even",
+        "pii_regulations": [],
+    }
+    started = time.perf_counter()
+    results = engine.run_assessment({"name": "bench"}, test_vectors, settings,
+                                    transport=engine.SimulatedTransport(latency=None, seed=0))
+    return time.perf_counter() - started, results["summary"]["total_tests"]
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 90_000
+    workdir = tempfile.mkdtemp(prefix="logbench-")
+    devnull = open(os.devnull, "w")
+
+    def disabled():
+        logging.getLogger().setLevel(logging.CRITICAL)
+        logsetup.set_sample_rates(**logsetup.DEFAULT_SAMPLE_RATES)
+
+    def synchronous():
+        logging.basicConfig(
+            level=logging.INFO,
+            format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+            handlers=[logging.FileHandler(os.path.join(workdir, "sync.log")), logging.StreamHandler(devnull)],
+            force=True,
+        )
+        logsetup.set_sample_rates(**{logsetup.REQUEST: 1.0, logsetup.FINDING: 1.0})
+
+    def queued(rates):
+        def setup():
+            logsetup.configure_logging(os.path.join(workdir, "queued.log"), console=False, sample_rates=rates)
+            logging.getLogger().setLevel(logging.INFO)
+        return setup
+
+    scenarios = [
+        ("disabled", disabled),
+        ("synchronous file + console", synchronous),
+        ("queued, no sampling", queued({logsetup.REQUEST: 1.0, logsetup.FINDING: 1.0})),
+        ("queued, default sampling", queued(logsetup.DEFAULT_SAMPLE_RATES)),
+    ]
+
+    baseline = None
+    print(f"{'scenario':<30}{'requests':>10}{'seconds':>10}{'us/request':>12}{'overhead':>12}")
+    for name, setup in scenarios:
+        reset_root()
+        setup()
+        elapsed, done = timed_run(requests)
+        per_request = elapsed / done * 1e6
+        baseline = per_request if baseline is None else baseline
+        print(f"{name:<30}{done:>10}{elapsed:>10.2f}{per_request:>12.1f}{per_request - baseline:>12.1f}")
+    reset_root()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Measure how fast a recorded cassette is re-scored, against what re-sending it would cost.
+
+Records a simulated run of ``requests`` responses to a cassette, with each
+response's latency drawn like a hosted model's. Then it replays that
+cassette through the detectors and aggregation with ``replay_assessment``.
+It reports:
+- the replay rate;
+- the time to replay one million responses at that rate;
+- the time re-sending the same requests would take at ``CONCURRENCY``,
+  using the recorded latencies.
+
+    python benchmarks/replay_cassette.py [requests]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from renegade import cassette, engine, logsetup, vectors  # noqa: E402
+
+CONCURRENCY = 16          # Requests in flight a live re-run would use
+LATENCY_S = (0.8, 2.5)    # Range of a hosted model's response time
+SETTINGS = {"allocation": "even", "profile": False, "pii_regulations": None}
+
+
+def record(path, requests):
+    """Write a cassette of ``requests`` simulated responses and return their summed latency in seconds"""
+    test_vectors = vectors.get_test_vectors()
+    arms = vectors.mutation_arms(test_vectors)
+    target = {"name": "replay-bench", "transport": "simulated"}
+    transport = engine.SimulatedTransport(latency=None, seed=7)
+    rng = random.Random(7)
+    writer = cassette.CassetteWriter(path, target, test_vectors, {**engine.DEFAULT_SETTINGS, **SETTINGS})
+    latency = 0.0
+    try:
+        for vector, variation in engine._iter_requests(arms, requests // len(test_vectors), set()):
+            canary = engine.make_canary(vector, variation)
+            payload = vectors.build_payload(vector, variation, canary)
+            response = transport.send(target, vector, payload, canary)
+            response["latency_ms"] = round(rng.uniform(*LATENCY_S) * 1000, 1)
+            latency += response["latency_ms"] / 1000
+            writer.append(vector, variation, payload, response)
+    finally:
+        writer.close()
+    return latency
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    logsetup.set_sample_rates(**{logsetup.REQUEST: 0.0, logsetup.FINDING: 0.0})
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench" + cassette.EXTENSION)
+        started = time.perf_counter()
+        latency = record(path, requests)
+        recorded_s = time.perf_counter() - started
+        size = os.path.getsize(path)
+
+        started = time.perf_counter()
+        results = engine.replay_assessment(path)
+        replay_s = time.perf_counter() - started
+
+    count = results["replay"]["records"]
+    rate = count / replay_s
+    live_s = latency / CONCURRENCY
+    print(f"cassette        {count:,} responses, {size / 2**20:.0f} MiB (written in {recorded_s:.0f} s)")
+    print(f"replay          {replay_s:.1f} s, {rate:,.0f} responses/s, "
+          f"{results['summary']['vulnerabilities_found']:,} findings")
+    print(f"1M replayed     {1_000_000 / rate / 60:.1f} min")
+    print(f"1M re-sent      {1_000_000 * live_s / count / 3600:.1f} h at concurrency {CONCURRENCY}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Measure what reading streamed responses incrementally saves.
+
+Runs the same live assessment against the local stub target in generating
+mode (see ``stub_target.py``) twice: once waiting for whole responses, once
+streaming them with early abort. For each run it reports wall time,
+latency and time-to-verdict percentiles, findings, and the words the stub
+generated before each response was complete or closed.
+
+    python benchmarks/streaming_verdicts.py [variations] [words per answer]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from renegade import engine, logsetup, vectors  # noqa: E402
+
+from stub_target import StubTarget  # noqa: E402
+
+SETTINGS = {
+    "concurrency": 16,
+    "duration": 600,
+    "allocation": "even",
+    "request_timeout": 30,
+    "retries": 0,
+    "pii_regulations": [],
+}
+
+
+def main():
+    variations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    words = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    logsetup.set_sample_rates(**{logsetup.REQUEST: 0.0})
+    # Privacy vectors are always read to the end; leave them out to measure the abort itself
+    test_vectors = [vector for vector in vectors.get_test_vectors() if vector["category"] != "privacy"]
+
+    print(f"{'mode':<12}{'requests':>9}{'findings':>10}{'wall s':>8}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'verdict p50':>13}{'verdict p95':>13}{'words':>9}{'stopped':>9}")
+    for mode, stream in (("whole", False), ("streamed", True)):
+        stub = StubTarget(tokens=words, token_ms=10, find_rate=0.1, seed=1)
+        target = {"name": f"stream-{mode}", "endpoint": stub.serve(), "transport": "http", "stream": stream}
+        started = time.perf_counter()
+        results = engine.run_assessment(target, test_vectors, {**SETTINGS, "variations": variations})
+        elapsed = time.perf_counter() - started
+        stub.shutdown()
+        timeline = results["timeline"]
+        stopped = results.get("streaming", {}).get("stopped_early", 0)
+        print(f"{mode:<12}{results['summary']['total_tests']:>9}{results['summary']['vulnerabilities_found']:>10}"
+              f"{elapsed:>8.1f}{timeline['latency_ms']['p50']:>9}{timeline['latency_ms']['p95']:>9}"
+              f"{timeline['verdict_ms']['p50']:>13}{timeline['verdict_ms']['p95']:>13}{stub.tokens_sent:>9}{stopped:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Local stub model endpoint with a heavy latency tail.
+
+Answers ``POST`` requests with ``{"output": ...}`` after a log-normal delay.
+A configurable share of requests are slow, hang until the client gives up,
+or fail with HTTP 503. That makes it useful for exercising deadlines,
+retries, hedging and circuit breakers without a real model.
+
+With ``--tokens`` set it answers like a generating model instead: each
+answer is that many words, produced at ``--token-ms`` per word, and a
+``--find-rate`` share of answers echo the request's canary. Requests that
+ask for ``"stream": true`` get the words as server-sent events.
+
+    python benchmarks/stub_target.py --port 8766 --slow 0.03 --hang 0.01
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANARY = re.compile(r"RT-[0-9A-F]{8}-\d{6}")
+REFUSAL = "I'm sorry, but I can't help with that request."
+FILLER = ("It is important to handle requests like this with care, and there are several reasons why this "
+          "particular one falls outside what I can assist with today. ").split()
+
+
+class StubTarget:
+    """Configurable slow/flaky endpoint served from a background thread"""
+
+    def __init__(self, median_ms=40, slow=0.03, slow_ms=1500, hang=0.01, hang_s=30, errors=0.02, seed=None,
+                 tokens=0, token_ms=10, find_rate=0.1):
+        self.median_ms = median_ms
+        self.slow = slow
+        self.slow_ms = slow_ms
+        self.hang = hang
+        self.hang_s = hang_s
+        self.errors = errors
+        self.tokens = tokens
+        self.token_ms = token_ms
+        self.find_rate = find_rate
+        self.down = False        # When set, every request hangs
+        self.requests = 0
+        self.tokens_sent = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    def _plan(self):
+        """Return (delay in seconds, HTTP status) for the next request"""
+        with self._lock:
+            self.requests += 1
+            roll = self._rng.random()
+            jitter = self._rng.lognormvariate(0, 0.4)
+        if self.down or roll < self.hang:
+            return self.hang_s, 200
+        if roll < self.hang + self.slow:
+            return self.slow_ms / 1000 * jitter, 200
+        if roll < self.hang + self.slow + self.errors:
+            return self.median_ms / 1000 * jitter, 503
+        return self.median_ms / 1000 * jitter, 200
+
+    def _answer(self, prompt):
+        """Words of a generated answer: a refusal, or compliance echoing the canary"""
+        canary = CANARY.search(prompt)
+        with self._lock:
+            found = canary is not None and self._rng.random() < self.find_rate
+        opening = f"Sure! As requested: {canary.group()}." if found else REFUSAL
+        words = opening.split()
+        while len(words) < self.tokens:
+            words += FILLER
+        return words[:max(self.tokens, len(opening.split()))]
+
+    def _count_tokens(self, count):
+        with self._lock:
+            self.tokens_sent += count
+
+    def serve(self, host="127.0.0.1", port=0):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                request = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if stub.tokens:
+                    return self._generate(json.loads(request or b"{}"))
+                delay, status = stub._plan()
+                time.sleep(delay)
+                body = json.dumps({"output": "I'm sorry, but I can't help with that request."}).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except OSError:
+                    pass  # The client gave up first
+
+            def _generate(self, request):
+                words = stub._answer(json.dumps(request))
+                if not request.get("stream"):
+                    time.sleep(len(words) * stub.token_ms / 1000)
+                    stub._count_tokens(len(words))
+                    body = json.dumps({"output": " ".join(words)}).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for i, word in enumerate(words):
+                        time.sleep(stub.token_ms / 1000)
+                        event = json.dumps({"choices": [{"delta": {"content": word if i == 0 else f" {word}"}}]})
+                        self._chunk(f"data: {event}\n\n".encode())
+                        stub._count_tokens(1)
+                    self._chunk(b"data: [DONE]\n\n")
+                    self._chunk(b"")
+                except OSError:
+                    self.close_connection = True  # The client closed the stream
+
+            def _chunk(self, data):
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="stub-target", daemon=True).start()
+        return f"http://{host}:{self._server.server_port}/v1/generate"
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--median-ms", type=float, default=40)
+    parser.add_argument("--slow", type=float, default=0.03, help="Share of requests taking --slow-ms")
+    parser.add_argument("--slow-ms", type=float, default=1500)
+    parser.add_argument("--hang", type=float, default=0.01, help="Share of requests that never answer in time")
+    parser.add_argument("--errors", type=float, default=0.02, help="Share of requests answered with HTTP 503")
+    parser.add_argument("--tokens", type=int, default=0, help="Words per generated answer (0 for a fixed reply)")
+    parser.add_argument("--token-ms", type=float, default=10, help="Milliseconds to generate each word")
+    parser.add_argument("--find-rate", type=float, default=0.1, help="Share of generated answers echoing the canary")
+    args = parser.parse_args()
+    stub = StubTarget(args.median_ms, args.slow, args.slow_ms, args.hang, errors=args.errors,
+                      tokens=args.tokens, token_ms=args.token_ms, find_rate=args.find_rate)
+    print(f"Stub target listening on {stub.serve(args.host, args.port)}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
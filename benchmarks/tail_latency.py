@@ -0,0 +1,76 @@
+"""Compare request latency with and without the resilience layer.
+
+Runs the same live assessment against the local stub target (see
+``stub_target.py``) three times: with retries, hedging and the breaker
+off, with jittered retries only, and with retries plus hedging. Then it
+points a run at a stub that has stopped answering, to show how fast the
+circuit breaker fails it. Latency percentiles come from the run timeline.
+
+    python benchmarks/tail_latency.py [variations]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from renegade import engine, logsetup, vectors  # noqa: E402
+
+from stub_target import StubTarget  # noqa: E402
+
+BASE_SETTINGS = {
+    "concurrency": 16,
+    "duration": 600,
+    "allocation": "even",
+    "request_timeout": 5,
+    "pii_regulations": [],
+}
+
+SCENARIOS = [
+    ("no resilience", {"retries": 0, "hedge": False, "circuit_breaker": False}),
+    ("retries", {"retries": 2, "hedge": False, "circuit_breaker": True}),
+    ("retries + hedging", {"retries": 2, "hedge": True, "circuit_breaker": True}),
+]
+
+
+def run(endpoint, name, settings):
+    target = {"name": name, "endpoint": endpoint, "transport": "http"}
+    started = time.perf_counter()
+    results = engine.run_assessment(target, vectors.get_test_vectors(), {**BASE_SETTINGS, **settings})
+    errors = sum(details.get("errors", 0) for details in results["test_details"].values())
+    return time.perf_counter() - started, results, errors
+
+
+def main():
+    variations = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    logsetup.set_sample_rates(**{logsetup.REQUEST: 0.0})
+
+    print(f"{'scenario':<20}{'requests':>10}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'wall s':>8}{'retries':>9}{'hedges':>8}{'won':>6}")
+    for name, settings in SCENARIOS:
+        stub = StubTarget(seed=1)
+        endpoint = stub.serve()
+        elapsed, results, errors = run(endpoint, f"stub-{name}", {**settings, "variations": variations})
+        stub.shutdown()
+        latency = results["timeline"]["latency_ms"]
+        stats = results["resilience"]
+        print(f"{name:<20}{results['summary']['total_tests']:>10}{errors:>8}{latency['p50']:>9}{latency['p95']:>9}"
+              f"{latency['p99']:>9}{elapsed:>8.1f}{stats['retries']:>9}{stats['hedges']:>8}{stats['hedge_wins']:>6}")
+
+    # A target that accepts connections but never answers
+    print()
+    for name, breaker in (("breaker off", False), ("breaker on", True)):
+        stub = StubTarget(seed=1)
+        stub.down = True
+        endpoint = stub.serve()
+        elapsed, results, errors = run(endpoint, f"down-{name}", {
+            "variations": 5, "request_timeout": 1, "retries": 0, "circuit_breaker": breaker,
+        })
+        stub.shutdown()
+        print(f"unresponsive target, {name}: {results['summary']['total_tests']} requests failed in {elapsed:.1f}s, "
+              f"{stub.requests} reached the target, {results['resilience']['rejected']} rejected by the breaker")
+
+
+if __name__ == "__main__":
+    main()
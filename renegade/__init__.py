@@ -0,0 +1,7 @@
+"""Core engine and helpers for the Synthetic Red Team Testing Agent.
+
+Everything in this package is importable without Streamlit or Plotly so the
+same code can back the web UI and headless runs.
+"""
+
+__version__ = "1.0.0"
@@ -0,0 +1,7 @@
+"""Entry point for ``python -m renegade``."""
+
+import sys
+
+from renegade.cli import main
+
+sys.exit(main())
@@ -0,0 +1,320 @@
+"""Per-target auth providers with a shared, pre-refreshed token cache.
+
+A target's optional ``auth`` dict picks how its requests are authorized:
+
+- ``{"type": "static"}`` (the default) sends ``api_key`` as a bearer token.
+- ``{"type": "jwt", "key": ..., "algorithm": "HS256", "ttl": 300, ...}``
+  signs a short-lived JWT locally with pyjwt. ``issuer``, ``subject``,
+  ``audience`` and extra ``claims`` are optional.
+- ``{"type": "token_endpoint", "token_url": ..., "client_id": ...,
+  "client_secret": ..., "scope": ...}`` exchanges client credentials for a
+  bearer token (OAuth 2.0 client credentials grant).
+
+Each distinct auth config gets one process-wide provider, so every run and
+worker thread shares its token. The token is fetched once when a run
+starts. While any run uses it, a single background refresher replaces it
+ahead of expiry. Workers only read the cached header and never wait on the
+token endpoint. If a refresh keeps failing and the token lapses, one
+caller fetches and the rest wait for its result.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+
+import jwt
+import requests
+
+logger = logging.getLogger("RedTeamApp.auth")
+
+STATIC = "static"
+JWT = "jwt"
+TOKEN_ENDPOINT = "token_endpoint"
+PROVIDERS = {
+    STATIC: "API Key",
+    JWT: "JWT (signed locally)",
+    TOKEN_ENDPOINT: "OAuth Token Endpoint",
+}
+
+DEFAULT_JWT_TTL = 300          # Seconds a locally signed token is valid
+DEFAULT_TOKEN_TTL = 3600       # Assumed lifetime when a token endpoint gives none
+REFRESH_AHEAD = 0.2            # Share of a token's lifetime left when it is refreshed
+REFRESH_MARGIN = 30            # Refresh at least this many seconds before expiry
+RETRY_DELAY = 5                # Seconds between failed refresh attempts
+TOKEN_TIMEOUT = 10             # Seconds per token endpoint request
+
+
+class AuthError(RuntimeError):
+    """Raised when a target's credentials can't be obtained"""
+
+
+def validate_config(auth):
+    """Return an error message for an invalid ``auth`` dict, or None"""
+    if not isinstance(auth, dict):
+        return "'auth' must be an object"
+    kind = auth.get("type", STATIC)
+    if kind not in PROVIDERS:
+        return f"unknown auth type '{kind}'"
+    if kind == JWT and not auth.get("key"):
+        return "JWT auth needs a signing 'key'"
+    if kind == TOKEN_ENDPOINT and not auth.get("token_url"):
+        return "token endpoint auth needs a 'token_url'"
+    return None
+
+
+class Token:
+    """A bearer token and when it stops being valid"""
+
+    __slots__ = ("value", "issued_at", "expires_at")
+
+    def __init__(self, value, lifetime):
+        self.value = value
+        self.issued_at = time.monotonic()
+        self.expires_at = self.issued_at + lifetime
+
+    def refresh_at(self):
+        lifetime = self.expires_at - self.issued_at
+        return self.expires_at - max(lifetime * REFRESH_AHEAD, min(REFRESH_MARGIN, lifetime / 2))
+
+    def expired(self):
+        return time.monotonic() >= self.expires_at
+
+
+class TokenProvider:
+    """Fetches tokens for one auth config and caches the current one"""
+
+    def __init__(self, config, header="Authorization", scheme="Bearer"):
+        self.config = config
+        self.header = config.get("header", header)
+        self.scheme = config.get("scheme", scheme)
+        self.token = None
+        self.fetches = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._failed_at = None
+        self._failure = None
+
+    def fetch(self):
+        """Return a new Token; subclasses implement this"""
+        raise NotImplementedError
+
+    def refresh(self, unless=None):
+        """Replace the cached token, one fetch at a time
+
+        ``unless(token)`` is checked once the lock is held, so callers that
+        queued behind a fetch reuse its token instead of fetching again.
+        Within ``RETRY_DELAY`` of a failed fetch they get that failure back.
+        """
+        with self._lock:
+            if unless is not None:
+                if self.token is not None and unless(self.token):
+                    return self.token
+                if self._failed_at is not None and time.monotonic() - self._failed_at < RETRY_DELAY:
+                    raise AuthError(self._failure)
+            try:
+                token = self.fetch()
+            except Exception as e:
+                self.failures += 1
+                self._failed_at = time.monotonic()
+                self._failure = f"Could not obtain a token: {str(e)}"
+                raise AuthError(self._failure) from e
+            self.fetches += 1
+            self._failed_at = None
+            self.token = token
+            return token
+
+    def headers(self):
+        """The auth header from the cached token, fetching only if there is none or it lapsed"""
+        token = self.token
+        if token is None or token.expired():
+            token = self.refresh(unless=lambda current: not current.expired())
+        value = f"{self.scheme} {token.value}" if self.scheme else token.value
+        return {self.header: value}
+
+    def invalidate(self, value):
+        """Drop the cached token if it is still ``value`` (e.g. after a 401) and refresh it in the background"""
+        token = self.token
+        if token is not None and token.value == value:
+            token.expires_at = token.issued_at
+            refresher().wake()
+
+
+class JwtProvider(TokenProvider):
+    """Signs short-lived JWTs locally"""
+
+    def fetch(self):
+        ttl = float(self.config.get("ttl", DEFAULT_JWT_TTL))
+        now = int(time.time())
+        claims = {"iat": now, "nbf": now, "exp": now + int(ttl), "jti": uuid.uuid4().hex}
+        for claim, field in (("iss", "issuer"), ("sub", "subject"), ("aud", "audience")):
+            if self.config.get(field):
+                claims[claim] = self.config[field]
+        claims.update(self.config.get("claims") or {})
+        headers = {"kid": self.config["key_id"]} if self.config.get("key_id") else None
+        value = jwt.encode(claims, self.config["key"], algorithm=self.config.get("algorithm", "HS256"), headers=headers)
+        return Token(value, ttl)
+
+
+class TokenEndpointProvider(TokenProvider):
+    """Exchanges client credentials at an OAuth 2.0 token endpoint"""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._session = requests.Session()
+
+    def fetch(self):
+        form = {"grant_type": self.config.get("grant_type", "client_credentials")}
+        for field in ("scope", "audience"):
+            if self.config.get(field):
+                form[field] = self.config[field]
+        auth = None
+        if self.config.get("client_id"):
+            auth = (self.config["client_id"], self.config.get("client_secret", ""))
+        response = self._session.post(self.config["token_url"], data=form, auth=auth, timeout=TOKEN_TIMEOUT)
+        response.raise_for_status()
+        body = response.json()
+        if not body.get("access_token"):
+            raise ValueError("token endpoint response has no access_token")
+        return Token(body["access_token"], float(body.get("expires_in") or DEFAULT_TOKEN_TTL))
+
+
+class TokenRefresher:
+    """One background thread that refreshes every provider's token ahead of expiry"""
+
+    def __init__(self):
+        self._providers = {}     # provider -> runs using it
+        self._wake = threading.Condition()
+        self._thread = None
+        self._retry_at = {}
+
+    def watch(self, provider):
+        """Keep ``provider``'s token fresh until every ``watch`` has its ``unwatch``"""
+        with self._wake:
+            self._providers[provider] = self._providers.get(provider, 0) + 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="token-refresher", daemon=True)
+                self._thread.start()
+            self._wake.notify()
+
+    def unwatch(self, provider):
+        with self._wake:
+            users = self._providers.get(provider, 0) - 1
+            if users > 0:
+                self._providers[provider] = users
+            else:
+                self._providers.pop(provider, None)
+                self._retry_at.pop(id(provider), None)
+
+    def wake(self):
+        with self._wake:
+            self._wake.notify()
+
+    def _due(self, provider, now):
+        retry_at = self._retry_at.get(id(provider))
+        if retry_at is not None:
+            return retry_at
+        token = provider.token
+        return now if token is None else token.refresh_at()
+
+    def _loop(self):
+        while True:
+            with self._wake:
+                now = time.monotonic()
+                due = [provider for provider in self._providers if self._due(provider, now) <= now]
+                if not due:
+                    next_at = min((self._due(provider, now) for provider in self._providers), default=now + 60)
+                    self._wake.wait(max(0.05, next_at - now))
+                    continue
+            for provider in due:
+                try:
+                    provider.refresh(unless=lambda current: current.refresh_at() > time.monotonic())
+                    retry_at = None
+                except AuthError as e:
+                    logger.warning(f"Token refresh failed, retrying in {RETRY_DELAY}s: {str(e)}")
+                    retry_at = time.monotonic() + RETRY_DELAY
+                with self._wake:
+                    if provider not in self._providers:
+                        continue
+                    if retry_at is None:
+                        self._retry_at.pop(id(provider), None)
+                    else:
+                        self._retry_at[id(provider)] = retry_at
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+_refresher = None
+
+
+def refresher():
+    """The process-wide token refresher"""
+    global _refresher
+    with _providers_lock:
+        if _refresher is None:
+            _refresher = TokenRefresher()
+        return _refresher
+
+
+def _config_key(target):
+    config = json.dumps(target.get("auth"), sort_keys=True, default=str)
+    return hashlib.sha1(f"{target['name']}|{config}".encode()).hexdigest()
+
+
+def provider_for(target):
+    """The shared provider for ``target``'s auth config, or None for a static key"""
+    config = target.get("auth") or {}
+    kind = config.get("type", STATIC)
+    if kind == STATIC:
+        return None
+    key = _config_key(target)
+    with _providers_lock:
+        provider = _providers.get(key)
+        if provider is None:
+            if kind == JWT:
+                provider = JwtProvider(config)
+            elif kind == TOKEN_ENDPOINT:
+                provider = TokenEndpointProvider(config)
+            else:
+                raise AuthError(f"Unknown auth type '{kind}' for {target['name']}")
+            _providers[key] = provider
+    return provider
+
+
+def prepare(target):
+    """Fetch ``target``'s first token and keep it refreshed until ``release``; raises AuthError if that fails"""
+    provider = provider_for(target)
+    if provider is None:
+        return
+    provider.refresh(unless=lambda current: not current.expired())
+    refresher().watch(provider)
+
+
+def release(target):
+    """Stop refreshing ``target``'s token for a run that called ``prepare``"""
+    provider = provider_for(target)
+    if provider is not None:
+        refresher().unwatch(provider)
+
+
+def headers(target):
+    """Auth headers for one request to ``target``"""
+    provider = provider_for(target)
+    if provider is None:
+        if target.get("api_key"):
+            return {"Authorization": f"Bearer {target['api_key']}"}
+        return {}
+    return provider.headers()
+
+
+def invalidate(target, request_headers):
+    """Report that ``request_headers`` were rejected, so a fresh token is fetched"""
+    provider = provider_for(target)
+    if provider is None:
+        return
+    value = request_headers.get(provider.header, "")
+    if provider.scheme and value.startswith(f"{provider.scheme} "):
+        value = value[len(provider.scheme) + 1:]
+    provider.invalidate(value)
@@ -0,0 +1,95 @@
+"""Adaptive request budget allocation across test vector arms.
+
+Every (vector, mutation family) pair is an arm whose reward is a finding.
+The allocator picks the arm for each request from the results seen so far,
+moving the budget toward arms that find issues while a fixed share of
+requests stays uniformly random so no arm is written off early.
+"""
+
+import logging
+import math
+
+import numpy as np
+
+logger = logging.getLogger("RedTeamApp.bandit")
+
+EVEN = "even"
+THOMPSON = "thompson"
+UCB = "ucb"
+
+STRATEGIES = {
+    EVEN: "Even split",
+    THOMPSON: "Thompson sampling",
+    UCB: "UCB1-Tuned",
+}
+
+DEFAULT_EXPLORATION = 0.1
+
+
+class BanditAllocator:
+    """Chooses which arm gets the next request.
+
+    ``select`` counts a request against its arm as soon as it is issued and
+    ``record`` adds the outcome when it arrives, so requests in flight still
+    spread across arms.
+    """
+
+    def __init__(self, arms, strategy=THOMPSON, exploration=DEFAULT_EXPLORATION, seed=None):
+        if strategy not in (THOMPSON, UCB):
+            raise ValueError(f"Unknown allocation strategy: {strategy}")
+        self.arms = list(arms)
+        self.strategy = strategy
+        self.exploration = exploration
+        self.issued = np.zeros(len(self.arms))
+        self.observed = np.zeros(len(self.arms))
+        self.rewards = np.zeros(len(self.arms))
+        self.active = np.ones(len(self.arms), dtype=bool)
+        self._rng = np.random.default_rng(seed)
+
+    def select(self):
+        """Return the index of the arm for the next request, None once all arms are retired"""
+        if not self.active.any():
+            return None
+        if self._rng.random() < self.exploration:
+            arm = int(self._rng.choice(np.flatnonzero(self.active)))
+        elif self.strategy == THOMPSON:
+            failures = self.observed - self.rewards
+            samples = self._rng.beta(1 + self.rewards, 1 + failures)
+            arm = int(np.argmax(np.where(self.active, samples, -1.0)))
+        else:
+            arm = self._select_ucb()
+        self.issued[arm] += 1
+        return arm
+
+    def retire(self, arm):
+        """Stop giving requests to ``arm``"""
+        self.active[arm] = False
+
+    def _select_ucb(self):
+        untried = np.flatnonzero((self.issued == 0) & self.active)
+        if untried.size:
+            return int(untried[0])
+        # Bernoulli variance bound keeps the bonus proportionate for rare findings
+        log_total = math.log(self.issued.sum())
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.where(self.observed > 0, self.rewards / self.observed, 0.5)
+        variance = mean * (1 - mean) + np.sqrt(2 * log_total / self.issued)
+        bonus = np.sqrt(log_total / self.issued * np.minimum(0.25, variance))
+        return int(np.argmax(np.where(self.active, mean + bonus, -np.inf)))
+
+    def record(self, arm, reward):
+        self.observed[arm] += 1
+        self.rewards[arm] += reward
+
+    def summary(self):
+        """Return requests, findings and find rate per arm"""
+        return [
+            {
+                "vector": arm["id"],
+                "mutation": arm.get("mutation", "direct"),
+                "requests": int(self.observed[i]),
+                "findings": int(self.rewards[i]),
+                "find_rate": round(self.rewards[i] / self.observed[i], 4) if self.observed[i] else None,
+            }
+            for i, arm in enumerate(self.arms)
+        ]
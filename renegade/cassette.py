@@ -0,0 +1,186 @@
+"""Recorded request/response pairs, replayed later without the target.
+
+A cassette is an append-only file with one JSON line per request. The
+first line is a header: the target, the vectors as they were defined at
+recording time, the engine settings and when the run started. Each later line holds:
+- the arm (vector id and mutation) and its variation;
+- the payload sent;
+- the response text, status, latency and error;
+- the seconds since the run started.
+
+Next to it, ``<cassette>.idx`` holds each record's byte offset as a
+little-endian uint64. Records can then be counted and addressed without
+scanning the file.
+
+``CassetteReader`` memory-maps both files, so replaying a million
+responses reads at disk speed and never loads the whole cassette. A run
+that died mid-write leaves a torn last line or a short index. The reader
+drops the torn line and rebuilds the missing offsets from the newlines.
+``engine.replay_assessment`` feeds a cassette back through the detectors
+and aggregation.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from datetime import datetime
+
+import numpy as np
+
+from renegade import vectors
+
+logger = logging.getLogger("RedTeamApp.cassette")
+
+FORMAT_VERSION = 1
+EXTENSION = ".cassette"
+INDEX_SUFFIX = ".idx"
+OFFSET = np.dtype("<u8")
+
+# Target fields kept in the header; credentials and auth settings are never recorded
+TARGET_FIELDS = ("name", "endpoint", "type", "transport", "stream")
+# Response fields kept per record besides the text
+RESPONSE_FIELDS = ("status_code", "latency_ms", "error", "verdict_ms", "stopped_early")
+
+
+def cassette_path(directory, target_name, timestamp=None):
+    """``directory/<target>/<timestamp>.cassette``, next to where profiles go"""
+    timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    return os.path.join(directory, vectors.slugify(target_name), timestamp + EXTENSION)
+
+
+class CassetteWriter:
+    """Appends one run's requests and responses to a new cassette.
+
+    Records are appended from the engine's result handler, which runs on a
+    single thread, so no lock is needed.
+    """
+
+    def __init__(self, path, target, test_vectors, settings=None):
+        self.path = path
+        self.records = 0
+        self._started = time.monotonic()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "ab")
+        self._index = open(path + INDEX_SUFFIX, "ab")
+        self._offset = self._file.tell()
+        if self._offset == 0:
+            self._write({
+                "cassette": FORMAT_VERSION,
+                "target": {field: target[field] for field in TARGET_FIELDS if field in target},
+                "vectors": test_vectors,
+                "settings": settings or {},
+                "started_at": time.time(),
+            })
+
+    def _write(self, record):
+        line = json.dumps(record, separators=(",", ":")).encode() + b"\n"
+        self._file.write(line)
+        self._offset += len(line)
+
+    def append(self, vector, variation, payload, response):
+        record = {
+            "vector": vector["id"],
+            "mutation": vector["mutation"],
+            "variation": variation,
+            "at": round(time.monotonic() - self._started, 3),
+            "payload": payload,
+            "text": response["text"],
+        }
+        for field in RESPONSE_FIELDS:
+            if response.get(field) is not None:
+                record[field] = response[field]
+        self._index.write(struct.pack("<Q", self._offset))
+        self._write(record)
+        self.records += 1
+
+    def close(self):
+        self._file.close()
+        self._index.close()
+        logger.info(f"Recorded {self.records} responses to {self.path}")
+
+
+class CassetteReader:
+    """Memory-mapped, random-access view of a cassette"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as fileobj:
+            if os.fstat(fileobj.fileno()).st_size == 0:
+                raise ValueError(f"{path} is empty, not a cassette")
+            self._map = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        header_end = self._map.find(b"\n")
+        try:
+            self.header = json.loads(self._map[:header_end if header_end >= 0 else len(self._map)])
+        except ValueError:
+            self.header = None
+        if not isinstance(self.header, dict) or self.header.get("cassette") != FORMAT_VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} cassette")
+        self._offsets = self._load_offsets(header_end + 1)
+
+    def _load_offsets(self, first):
+        """Offsets of every complete record, from the index and any lines it is missing"""
+        size = len(self._map)
+        offsets = np.empty(0, dtype=OFFSET)
+        index_path = self.path + INDEX_SUFFIX
+        if os.path.exists(index_path) and os.path.getsize(index_path) >= OFFSET.itemsize:
+            count = os.path.getsize(index_path) // OFFSET.itemsize
+            offsets = np.array(np.memmap(index_path, dtype=OFFSET, mode="r", shape=(count,)))
+            offsets = offsets[(offsets >= first) & (offsets < size)]
+        # Keep only records whose line was finished
+        while len(offsets) and self._map.find(b"\n", int(offsets[-1])) < 0:
+            offsets = offsets[:-1]
+
+        start = self._map.find(b"\n", int(offsets[-1])) + 1 if len(offsets) else first
+        missing = []
+        while 0 < start < size:
+            end = self._map.find(b"\n", start)
+            if end < 0:
+                break
+            missing.append(start)
+            start = end + 1
+        if missing:
+            logger.warning(f"Rebuilt {len(missing)} index entries of {self.path}")
+            offsets = np.concatenate([offsets, np.array(missing, dtype=OFFSET)])
+        return offsets
+
+    @property
+    def target(self):
+        return self.header["target"]
+
+    def test_vectors(self):
+        """The recorded vectors, with today's registry definition where one exists"""
+        return [vectors.get_vector(vector["id"]) or vector for vector in self.header["vectors"]]
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        start = int(self._offsets[index])
+        return json.loads(self._map[start:self._map.find(b"\n", start)])
+
+    def __iter__(self):
+        find, data = self._map.find, self._map
+        for start in self._offsets.tolist():
+            yield json.loads(data[start:find(b"\n", start)])
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def response_of(record):
+    """The response dict the engine scores, rebuilt from a record, with its send time under ``at``"""
+    response = {"text": record["text"], "status_code": None, "latency_ms": None, "error": None, "at": record["at"]}
+    for field in RESPONSE_FIELDS:
+        if field in record:
+            response[field] = record[field]
+    return response
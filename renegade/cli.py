@@ -0,0 +1,404 @@
+"""Headless command-line runner.
+
+Loads targets in the "Export Targets" JSON shape, runs the same engine the
+web UI uses on a job scheduler and writes each target's results in the
+Results Analyzer format. The exit code reflects the most severe finding, so
+runs can gate CI pipelines. Targets that name no ``transport`` are sent real
+HTTP requests. ``--simulate`` answers every target locally instead, and
+results from simulated targets are marked SIMULATED. Nothing here imports
+Streamlit or Plotly.
+
+    python -m renegade run --targets targets.json --fail-on high
+
+``coordinate`` and ``worker`` spread the same run over several machines;
+see ``renegade.distributed``. ``run --cassette-dir`` records every response,
+and ``replay`` scores a recorded cassette again with today's detectors
+without contacting the target:
+
+    python -m renegade replay cassettes/my_target/20250101_120000_000000.cassette
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+from renegade import bandit, distributed, engine, exports, logsetup, planner, profiles, scheduler, vectors
+from renegade.targets import TargetCatalog, import_targets
+
+logger = logging.getLogger("RedTeamApp.cli")
+
+EXIT_OK = 0
+EXIT_FINDINGS = 1
+EXIT_USAGE = 2
+EXIT_FAILED = 3
+
+SEVERITIES = ["low", "medium", "high", "critical"]
+
+
+def load_targets(path, names=None):
+    """Read a targets file into a catalog, keeping only ``names`` if given"""
+    catalog = TargetCatalog()
+    with open(path, "rb") as fileobj:
+        report = import_targets(catalog, fileobj)
+    for error in report["errors"]:
+        logger.warning(f"Skipped target: {error}")
+    if names:
+        missing = [name for name in names if name not in catalog]
+        if missing:
+            raise ValueError(f"Unknown target(s): {', '.join(missing)}")
+        catalog = TargetCatalog([catalog.get(name) for name in names])
+    return catalog
+
+
+def load_settings(args):
+    """Engine settings from ``--settings`` overlaid with explicit flags"""
+    settings = dict(engine.DEFAULT_SETTINGS)
+    if args.settings:
+        with open(args.settings) as fileobj:
+            overrides = json.load(fileobj)
+        unknown = set(overrides) - set(engine.DEFAULT_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown setting(s): {', '.join(sorted(unknown))}")
+        settings.update(overrides)
+    for name in ("duration", "variations", "concurrency", "allocation", "request_timeout", "retries", "rate_limit"):
+        value = getattr(args, name)
+        if value is not None:
+            settings[name] = value
+    if args.sequential:
+        settings["sequential"] = True
+    if args.hedge:
+        settings["hedge"] = True
+    if args.no_profile:
+        settings["profile"] = False
+    settings["profile_dir"] = args.profile_dir or os.path.join(args.output_dir, "profiles")
+    settings["cassette_dir"] = args.cassette_dir
+    return settings
+
+
+def select_vectors(args):
+    """Vectors from ``--suite``/``--select``, ``--vectors`` or the whole registry"""
+    if args.suite:
+        if not args.select:
+            raise ValueError("--suite needs at least one --select")
+        return vectors.suite_vectors(args.suite, args.select)
+    if args.vectors:
+        selected = []
+        for vector_id in args.vectors.split(","):
+            vector = vectors.get_vector(vector_id.strip())
+            if vector is None:
+                raise ValueError(f"Unknown test vector: {vector_id}")
+            selected.append(vector)
+        return selected
+    return vectors.get_test_vectors()
+
+
+def resolve_target(target, args):
+    """``target`` as this run sends to it: live unless simulated on purpose"""
+    if args.simulate:
+        return {**target, "transport": "simulated"}
+    if args.live or not target.get("transport"):
+        return engine.live_target(target)
+    return target
+
+
+def warn_simulated(targets):
+    """Say loudly that some targets will be answered by the simulator"""
+    names = [target["name"] for target in targets if not engine.is_live(target)]
+    if names:
+        print(f"WARNING: SIMULATED answers, no requests sent, for: {', '.join(names)}", file=sys.stderr)
+    return set(names)
+
+
+def worst_severity(results):
+    """Return the highest severity among the findings, or None"""
+    ranks = [SEVERITIES.index(finding["severity"]) for finding in exports.iter_findings(results)
+             if finding.get("severity") in SEVERITIES]
+    return SEVERITIES[max(ranks)] if ranks else None
+
+
+def write_results(results, output_dir, fmt, compress):
+    """Write one target's results and return the file path"""
+    os.makedirs(output_dir, exist_ok=True)
+    name = exports.export_file_name(fmt, compress)
+    path = os.path.join(output_dir, f"{vectors.slugify(results['target'])}_{name}")
+    with open(path, "wb") as fileobj:
+        exports.write_export(results, fmt, fileobj, compress=compress)
+    return path
+
+
+def report_results(results, args, threshold, simulated=False):
+    """Write one target's results, print its line and return whether it breached ``threshold``"""
+    path = write_results(results, args.output_dir, args.format, args.gzip)
+    worst = worst_severity(results)
+    breach = threshold is not None and worst is not None and SEVERITIES.index(worst) >= threshold
+    summary = results["summary"]
+    print(f"{'BREACH' if breach else 'OK':<7} {'SIMULATED ' if simulated else ''}"
+          f"{results['target']}: {summary['vulnerabilities_found']} findings in {summary['total_tests']} requests, "
+          f"worst {worst or 'none'}, risk {summary['risk_score']} ({results['stop_reason']}) -> {path}")
+    return breach
+
+
+def fail_threshold(args):
+    return SEVERITIES.index(args.fail_on) if args.fail_on != "none" else None
+
+
+def run(args):
+    catalog = load_targets(args.targets, args.target)
+    if not catalog:
+        raise ValueError(f"No valid targets in {args.targets}")
+    test_vectors = select_vectors(args)
+    settings = load_settings(args)
+
+    targets = [resolve_target(target, args) for target in catalog]
+    simulated = warn_simulated(targets)
+    plans = [planner.make_plan(target, test_vectors, settings) for target in targets]
+    if args.plan_only:
+        for plan in plans:
+            print(f"{'FITS' if plan.fits else 'OVER':<7} {'SIMULATED ' if plan.target['name'] in simulated else ''}"
+                  f"{plan.describe()}")
+        return EXIT_OK if all(plan.fits for plan in plans) else EXIT_FAILED
+    if not args.quiet:
+        for plan in plans:
+            print(f"Plan: {plan.describe()}", file=sys.stderr)
+
+    job_scheduler = scheduler.JobScheduler(max_workers=args.jobs)
+    jobs = []
+    for plan in plans:
+        jobs.append(job_scheduler.submit(
+            f"Assessment · {plan.target['name']}", planner.plan_job, plan,
+            meta={"kind": "assessment", "target": plan.target["name"]},
+        ))
+
+    started = time.monotonic()
+    while not job_scheduler.wait(jobs, timeout=args.progress_interval):
+        if not args.quiet:
+            done = sum(job.state in scheduler.FINISHED_STATES for job in jobs)
+            findings = sum(job.findings for job in jobs)
+            print(f"[{time.monotonic() - started:6.1f}s] {done}/{len(jobs)} targets done, {findings} findings",
+                  file=sys.stderr)
+    job_scheduler.shutdown()
+
+    threshold = fail_threshold(args)
+    failed = breached = 0
+    for job in jobs:
+        if job.state == scheduler.FAILED or job.result is None:
+            failed += 1
+            print(f"FAILED  {job.meta['target']}: {job.error}")
+            continue
+        breached += report_results(job.result, args, threshold, job.meta["target"] in simulated)
+
+    if failed == len(jobs):
+        return EXIT_FAILED
+    if breached:
+        return EXIT_FINDINGS
+    return EXIT_FAILED if failed and args.strict else EXIT_OK
+
+
+def coordinate(args):
+    catalog = load_targets(args.targets, args.target)
+    if not catalog:
+        raise ValueError(f"No valid targets in {args.targets}")
+    targets = [resolve_target(target, args) for target in catalog]
+    simulated = warn_simulated(targets)
+    coordinator = distributed.Coordinator(
+        targets, select_vectors(args), load_settings(args),
+        lease_size=args.lease_size, lease_ttl=args.lease_ttl, token=args.token,
+    )
+    server = coordinator.serve(args.host, args.port)
+    if not args.quiet:
+        print(f"Serving {coordinator.total} leases on http://{args.host}:{server.server_port}", file=sys.stderr)
+
+    started = time.monotonic()
+    while not coordinator.wait(timeout=args.progress_interval):
+        if not args.quiet:
+            status = coordinator.status()
+            print(f"[{time.monotonic() - started:6.1f}s] {status['done']}/{status['leases']} leases done, "
+                  f"{status['active']} active on {status['workers']} workers, {status['reassigned']} reassigned, "
+                  f"{status['findings']} findings", file=sys.stderr)
+    coordinator.shutdown()
+
+    threshold = fail_threshold(args)
+    breached = incomplete = 0
+    for results in coordinator.final_results():
+        breached += report_results(results, args, threshold, results["target"] in simulated)
+        incomplete += results["stop_reason"] != "completed"
+    if breached:
+        return EXIT_FINDINGS
+    return EXIT_FAILED if incomplete and args.strict else EXIT_OK
+
+
+def work(args):
+    worker = distributed.Worker(args.coordinator, name=args.name, token=args.token, concurrency=args.concurrency)
+    leases = worker.run()
+    if not args.quiet:
+        print(f"Worker {worker.name} ran {leases} leases", file=sys.stderr)
+    return EXIT_OK
+
+
+def replay(args):
+    # Everything else is as recorded
+    settings = {"profile_dir": args.profile_dir}
+    if args.sequential:
+        settings["sequential"] = True
+    if args.no_profile:
+        settings["profile"] = False
+    threshold = fail_threshold(args)
+    breached = 0
+    for path in args.cassettes:
+        started = time.monotonic()
+        results = engine.replay_assessment(path, settings)
+        if not args.quiet:
+            print(f"Replayed {results['replay']['records']} responses from {path} in "
+                  f"{time.monotonic() - started:.1f}s", file=sys.stderr)
+        breached += report_results(results, args, threshold)
+    return EXIT_FINDINGS if breached else EXIT_OK
+
+
+def list_vectors(args):
+    for vector in vectors.get_test_vectors():
+        print(f"{vector['id']:<24}{vector['category']:<10}{vector['severity']:<10}{vector['name']}")
+    return EXIT_OK
+
+
+def drift(args):
+    rows = profiles.drift(args.baseline, args.current)
+    drifted = [row for row in rows if row["drifted"]]
+    for row in rows if args.all else drifted:
+        print(f"{'DRIFT' if row['drifted'] else 'OK':<7}{row['vector']:<24}{row['column']:<17}"
+              f"{row['test']:<17}{row['statistic']:>9}  p={row['p_value']}")
+    print(f"{len(drifted)} of {len(rows)} profiled columns drifted")
+    return EXIT_FINDINGS if drifted else EXIT_OK
+
+
+def export_profiles(args):
+    with open(args.output, "wb") as fileobj:
+        fileobj.write(profiles.export_whylabs(args.profile))
+    print(f"Wrote {args.output}")
+    return EXIT_OK
+
+
+def add_assessment_arguments(parser):
+    """Options shared by ``run`` and ``coordinate``"""
+    parser.add_argument("--targets", required=True, help="Targets file in the Export Targets format (JSON array or NDJSON)")
+    parser.add_argument("--target", action="append", help="Only run this target (repeatable)")
+    parser.add_argument("--vectors", help="Comma-separated registry vector ids (default: all)")
+    parser.add_argument("--suite", choices=list(vectors.SUITES), help="Framework suite to run instead of --vectors")
+    parser.add_argument("--select", action="append", help="Suite selection, e.g. 'SQL Injection' (repeatable)")
+    parser.add_argument("--settings", help="JSON file of engine settings")
+    parser.add_argument("--duration", type=float, help="Time limit per target in seconds")
+    parser.add_argument("--variations", type=int, help="Request budget per vector")
+    parser.add_argument("--concurrency", type=int, help="Requests in flight per target")
+    parser.add_argument("--allocation", choices=list(bandit.STRATEGIES), help="Budget allocation strategy")
+    parser.add_argument("--request-timeout", dest="request_timeout", type=float, help="Seconds per HTTP request")
+    parser.add_argument("--sequential", action="store_true", help="Stop vectors early once their verdict is settled")
+    parser.add_argument("--retries", type=int, help="Retries per failed request, within the retry budget")
+    parser.add_argument("--rate-limit", dest="rate_limit", type=float,
+                        help="Requests started per second per target (default: the target's rate_limit)")
+    parser.add_argument("--hedge", action="store_true", help="Send a second copy of requests slower than the p95 latency")
+    transport = parser.add_mutually_exclusive_group()
+    transport.add_argument("--live", action="store_true",
+                           help="Send real HTTP requests even to targets whose transport is 'simulated'")
+    transport.add_argument("--simulate", action="store_true",
+                           help="Answer every target from the simulator, sending nothing; results are marked SIMULATED")
+    parser.add_argument("--profile-dir", dest="profile_dir",
+                        help="Directory for whylogs response profiles (default: <output-dir>/profiles)")
+    parser.add_argument("--no-profile", dest="no_profile", action="store_true", help="Don't profile responses")
+    parser.add_argument("--cassette-dir", dest="cassette_dir",
+                        help="Record every request and response under this directory for later replay")
+    add_report_arguments(parser)
+    parser.add_argument("--strict", action="store_true", help="Exit with 3 if any target failed")
+    add_common_arguments(parser)
+
+
+def add_report_arguments(parser):
+    """Options for the result files and exit code, shared with ``replay``"""
+    parser.add_argument("--output-dir", default="results", help="Directory for result files (default: results)")
+    parser.add_argument("--format", choices=list(exports.EXPORT_FORMATS), default="json")
+    parser.add_argument("--gzip", action="store_true", help="Compress result files")
+    parser.add_argument("--fail-on", choices=SEVERITIES + ["none"], default="high",
+                        help="Exit with 1 if any finding is at least this severe (default: high)")
+
+
+def add_common_arguments(parser):
+    parser.add_argument("--log-file", help="Also write JSON logs to this file")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="Seconds between progress lines")
+    parser.add_argument("-q", "--quiet", action="store_true", help="No progress lines")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log engine activity to stderr")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m renegade", description="Headless AI red team assessments")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run assessments against targets from a JSON file")
+    add_assessment_arguments(run_parser)
+    run_parser.add_argument("--jobs", type=int, default=None, help="Targets assessed in parallel")
+    run_parser.add_argument("--plan-only", dest="plan_only", action="store_true",
+                            help="Print each target's execution plan and exit; 3 if any run would not fit --duration")
+    run_parser.set_defaults(handler=run)
+
+    coordinate_parser = commands.add_parser("coordinate", help="Split assessments into leases for remote workers")
+    add_assessment_arguments(coordinate_parser)
+    coordinate_parser.add_argument("--host", default="127.0.0.1",
+                                   help="Address to listen on (default: 127.0.0.1); any other needs --token")
+    coordinate_parser.add_argument("--port", type=int, default=distributed.DEFAULT_PORT,
+                                   help=f"Port to listen on (default: {distributed.DEFAULT_PORT})")
+    coordinate_parser.add_argument("--token", help="Shared secret workers must send; leases carry target credentials")
+    coordinate_parser.add_argument("--lease-size", type=int, default=distributed.LEASE_SIZE,
+                                   help=f"Variations per vector in one lease (default: {distributed.LEASE_SIZE})")
+    coordinate_parser.add_argument("--lease-ttl", type=float, default=distributed.LEASE_TTL,
+                                   help=f"Seconds before a silent worker's lease is reassigned (default: {distributed.LEASE_TTL})")
+    coordinate_parser.set_defaults(handler=coordinate)
+
+    worker_parser = commands.add_parser("worker", help="Run leases from a coordinator")
+    worker_parser.add_argument("--coordinator", required=True, help="Coordinator URL, e.g. http://10.0.0.5:8700")
+    worker_parser.add_argument("--token", help="Shared secret the coordinator expects")
+    worker_parser.add_argument("--name", help="Worker name in coordinator logs (default: host name)")
+    worker_parser.add_argument("--concurrency", type=int, help="Requests in flight (default: the lease's setting)")
+    add_common_arguments(worker_parser)
+    worker_parser.set_defaults(handler=work)
+
+    replay_parser = commands.add_parser("replay", help="Score recorded cassettes again without contacting targets")
+    replay_parser.add_argument("cassettes", nargs="+", help="Cassette files written by run --cassette-dir")
+    replay_parser.add_argument("--sequential", action="store_true",
+                               help="Stop scoring vectors once their verdict is settled")
+    replay_parser.add_argument("--profile-dir", dest="profile_dir", help="Directory for whylogs response profiles")
+    replay_parser.add_argument("--no-profile", dest="no_profile", action="store_true", help="Don't profile responses")
+    add_report_arguments(replay_parser)
+    add_common_arguments(replay_parser)
+    replay_parser.set_defaults(handler=replay)
+
+    drift_parser = commands.add_parser("drift", help="Compare the response profiles of two runs")
+    drift_parser.add_argument("baseline", help="Profile directory of the baseline run")
+    drift_parser.add_argument("current", help="Profile directory of the run to check")
+    drift_parser.add_argument("--all", action="store_true", help="List every column, not only drifted ones")
+    drift_parser.set_defaults(handler=drift, verbose=False, log_file=None)
+
+    export_parser = commands.add_parser("export-profiles", help="Bundle a run's profiles for offline WhyLabs upload")
+    export_parser.add_argument("profile", help="Profile directory of the run")
+    export_parser.add_argument("--output", required=True, help="Zip file to write")
+    export_parser.set_defaults(handler=export_profiles, verbose=False, log_file=None)
+
+    list_parser = commands.add_parser("vectors", help="List the test vector registry")
+    list_parser.set_defaults(handler=list_vectors, verbose=False, log_file=None)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logsetup.configure_logging(
+        path=args.log_file,
+        level=logging.INFO if args.verbose or args.log_file else logging.WARNING,
+        console_level=logging.NOTSET if args.verbose else logging.WARNING,
+        sample_rates=logsetup.rates_from_env(),
+    )
+    try:
+        return args.handler(args)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    finally:
+        logsetup.stop_logging()
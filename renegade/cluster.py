@@ -0,0 +1,132 @@
+"""Near-duplicate clustering of findings with MinHash and LSH.
+
+Each finding's details and response text are cut into 4-byte shingles and
+reduced to a MinHash signature. Signatures are split into bands and
+bucketed by band, so a new finding is only compared with the clusters it
+shares a bucket with. That keeps clustering linear in the number of
+findings and lets it run as findings stream in.
+"""
+
+import logging
+
+import numpy as np
+
+from renegade import fingerprint
+
+logger = logging.getLogger("RedTeamApp.cluster")
+
+NUM_PERM = 64
+BANDS = 16               # BANDS * ROWS == NUM_PERM
+ROWS = NUM_PERM // BANDS
+SIMILARITY = 0.6         # Estimated Jaccard similarity needed to join a cluster
+TEXT_LIMIT = 1000        # Characters of text shingled per finding
+
+BATCH_SIZE = 256         # Texts hashed together by add_many
+
+_SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+
+def finding_text(finding):
+    """The text a finding is clustered on"""
+    return fingerprint.normalize(f"{finding.get('details') or ''} {finding.get('response') or ''}")[:TEXT_LIMIT]
+
+
+def _shingles(text):
+    """Overlapping 4-byte windows of ``text`` as integers"""
+    data = np.frombuffer(text.encode("utf-8").ljust(4), dtype=np.uint8).astype(np.uint32)
+    return (data[:-3] << 24 | data[1:-2] << 16 | data[2:-1] << 8 | data[3:]).astype(np.uint64)
+
+
+class Clusterer:
+    """Assigns findings to clusters of near-duplicates as they arrive.
+
+    Findings are only clustered with findings of the same vector. Findings
+    whose normalized text was seen before join that text's cluster without
+    being hashed again.
+    """
+
+    def __init__(self, similarity=SIMILARITY, seed=0):
+        rng = np.random.default_rng(seed)
+        self.similarity = similarity
+        # Multiply-shift hash family; the top 32 bits of a*x + b (mod 2**64)
+        self._a = rng.integers(1, 1 << 63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, NUM_PERM, dtype=np.uint64)
+        self._buckets = {}
+        self._by_text = {}
+        self._signatures = []
+        self.clusters = []
+
+    def signatures(self, texts):
+        """MinHash signatures of ``texts`` over their 4-byte shingles, one row per text"""
+        shingles = [_shingles(text) for text in texts]
+        starts = np.cumsum([0] + [len(s) for s in shingles[:-1]])
+        hashes = (np.multiply.outer(np.concatenate(shingles), self._a) + self._b) >> np.uint64(32)
+        return np.minimum.reduceat(hashes, starts, axis=0)
+
+    def add(self, finding):
+        """Put ``finding`` in a cluster, tag it with the cluster id and return the cluster"""
+        return self.add_many([finding])[0]
+
+    def add_many(self, findings):
+        """Cluster a batch of findings, hashing their new texts together"""
+        keyed = [(finding.get("test_vector"), finding_text(finding)) for finding in findings]
+        unseen = list(dict.fromkeys(key for key in keyed if key not in self._by_text))
+        signatures = {}
+        for offset in range(0, len(unseen), BATCH_SIZE):
+            batch = unseen[offset:offset + BATCH_SIZE]
+            for key, signature in zip(batch, self.signatures([text for _, text in batch])):
+                signatures[key] = signature
+
+        clusters = []
+        for finding, key in zip(findings, keyed):
+            index = self._by_text.get(key)
+            if index is None:
+                index = self._place(finding, key[0], signatures[key])
+                self._by_text[key] = index
+            cluster = self.clusters[index]
+            cluster["count"] += 1
+            if _SEVERITY_RANK.get(finding.get("severity"), -1) > _SEVERITY_RANK.get(cluster["severity"], -1):
+                cluster["severity"] = finding.get("severity")
+            finding["cluster"] = cluster["cluster"]
+            clusters.append(cluster)
+        return clusters
+
+    def _place(self, finding, vector, signature):
+        """Index of the cluster ``signature`` joins, starting a new one if no bucket mate is similar"""
+        bands = signature.reshape(BANDS, ROWS)
+        keys = [(vector, band, bands[band].tobytes()) for band in range(BANDS)]
+        match = None
+        candidates = list({self._buckets[key] for key in keys if key in self._buckets})
+        if candidates:
+            agreement = (np.array([self._signatures[i] for i in candidates]) == signature).sum(axis=1)
+            best = int(np.argmax(agreement))
+            if agreement[best] >= self.similarity * NUM_PERM:
+                match = candidates[best]
+
+        if match is None:
+            match = len(self.clusters)
+            self._signatures.append(signature)
+            self.clusters.append({
+                "cluster": f"C-{match + 1}",
+                "representative": finding.get("id"),
+                "test_vector": finding.get("test_vector"),
+                "test_name": finding.get("test_name"),
+                "severity": finding.get("severity"),
+                "details": finding.get("details"),
+                "timestamp": finding.get("timestamp"),
+                "count": 0,
+            })
+        for key in keys:
+            self._buckets.setdefault(key, match)
+        return match
+
+    def summary(self):
+        """Clusters, largest first"""
+        return sorted(self.clusters, key=lambda cluster: cluster["count"], reverse=True)
+
+
+def cluster_results(results, similarity=SIMILARITY):
+    """Cluster every finding of a finished run and return the summary"""
+    clusterer = Clusterer(similarity)
+    clusterer.add_many(results.get("vulnerabilities", []) or [])
+    return clusterer.summary()
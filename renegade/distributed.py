@@ -0,0 +1,491 @@
+"""Coordinator/worker mode for spreading a run over several machines.
+
+The coordinator splits every target's variation budget into leases and
+serves them over plain HTTP with JSON bodies; there is no broker. Workers
+pull a lease, run it with the normal engine and stream new findings and
+per-vector counters back while it runs. Each report renews the lease. A
+lease whose worker stops reporting expires and goes back to the queue,
+and reports for a reassigned lease are refused, so findings from a lease
+are only merged into the run once, when its current holder finishes it.
+
+Workers send the requests, so every lease carries its target's full
+definition, including ``api_key`` and ``auth`` secrets. The coordinator
+therefore listens on loopback by default. It refuses any other address
+unless workers must present a shared token. The HTTP is plain, so across
+machines it belongs on a trusted network or behind a TLS tunnel.
+
+    python -m renegade coordinate --targets targets.json --variations 5000
+    python -m renegade worker --coordinator http://127.0.0.1:8700
+"""
+
+import collections
+import hmac
+import ipaddress
+import json
+import logging
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from renegade import cluster, engine, profiles
+
+logger = logging.getLogger("RedTeamApp.distributed")
+
+DEFAULT_PORT = 8700
+LEASE_SIZE = 50          # Variations per vector in one lease
+LEASE_TTL = 30           # Seconds a lease survives without a report
+REPORT_INTERVAL = 2      # Seconds between worker reports
+POLL_INTERVAL = 1        # Seconds a worker waits when no lease is free
+MAX_ATTEMPTS = 3         # Assignments before a lease is given up
+EXPIRE_INTERVAL = 1      # Seconds between lease expiry checks while waiting
+
+TOKEN_HEADER = "X-Renegade-Token"
+
+# Counters in test_details that are summed across leases
+_COUNTERS = ("requests", "findings", "refusals", "errors", "pii_hits")
+
+
+class LeaseLost(RuntimeError):
+    """Raised when a report arrives for a lease that was reassigned"""
+
+
+class ReportFailed(RuntimeError):
+    """Raised on a worker when the coordinator could not take a report"""
+
+
+def is_loopback(host):
+    """True when ``host`` only accepts connections from this machine"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class Lease:
+    """A range of variations of one target, held by at most one worker at a time"""
+
+    def __init__(self, target, start, count):
+        self.id = uuid.uuid4().hex[:12]
+        self.target = target
+        self.start = start
+        self.count = count
+        self.attempt = 0
+        self.holder = None
+        self.token = None
+        self.deadline = None
+        self.findings = []
+        self.counters = {}
+
+    def assign(self, worker, ttl):
+        self.attempt += 1
+        self.holder = worker
+        self.token = uuid.uuid4().hex
+        self.deadline = time.monotonic() + ttl
+        # Anything streamed by an earlier holder is discarded
+        self.findings = []
+        self.counters = {}
+
+
+class Coordinator:
+    """Owns the lease queue and merges finished leases into per-target results"""
+
+    def __init__(self, targets, test_vectors, settings=None, lease_size=LEASE_SIZE, lease_ttl=LEASE_TTL, token=None,
+                 max_attempts=MAX_ATTEMPTS):
+        self.targets = {target["name"]: target for target in targets}
+        self.test_vectors = list(test_vectors)
+        self.settings = {**engine.DEFAULT_SETTINGS, **(settings or {})}
+        # A sequential test inside one lease would only see part of the evidence
+        self.settings["sequential"] = False
+        self.lease_ttl = lease_ttl
+        self.token = token
+        self.max_attempts = max_attempts
+        self.results = {name: engine.new_results(target) for name, target in self.targets.items()}
+        self._clusterers = {name: cluster.Clusterer() for name in self.targets}
+        profiling = self.settings["profile"] and profiles.available()
+        self._profilers = {name: profiles.ResponseProfiler() for name in self.targets} if profiling else {}
+        for results in self.results.values():
+            for vector in self.test_vectors:
+                results["test_details"][vector["id"]] = {"name": vector["name"], **{c: 0 for c in _COUNTERS}}
+
+        self._lock = threading.Lock()
+        self._finished = threading.Condition(self._lock)
+        self._pending = collections.deque()
+        self._active = {}
+        self._done = 0
+        self._reassigned = 0
+        self._failed = []
+        self._workers = {}
+        for name in self.targets:
+            for start in range(0, self.settings["variations"], lease_size):
+                count = min(lease_size, self.settings["variations"] - start)
+                self._pending.append(Lease(name, start, count))
+        self.total = len(self._pending)
+        self._server = None
+
+    # Lease lifecycle
+
+    def acquire(self, worker):
+        """Hand the next lease to ``worker``; None if all are out, {"done": True} once finished"""
+        with self._lock:
+            self._expire()
+            self._workers[worker] = time.time()
+            if self._done == self.total:
+                return {"done": True}
+            if not self._pending:
+                return None
+            lease = self._pending.popleft()
+            lease.assign(worker, self.lease_ttl)
+            self._active[lease.id] = lease
+            logger.info(f"Lease {lease.id} ({lease.target} {lease.start}+{lease.count}) -> {worker}, attempt {lease.attempt}")
+            return {
+                "lease_id": lease.id,
+                "token": lease.token,
+                "target": self.targets[lease.target],
+                "test_vectors": self.test_vectors,
+                "settings": {**self.settings, "variation_start": lease.start, "variations": lease.count,
+                             "variation_stop": lease.start + lease.count},
+                "ttl": self.lease_ttl,
+            }
+
+    def report(self, lease_id, token, findings, counters, final=False, summary=None, error=None):
+        """Record streamed progress for a lease and renew it; merge it on ``final``.
+
+        A report with ``error`` hands the lease back for another attempt.
+        """
+        with self._lock:
+            self._expire()
+            lease = self._active.get(lease_id)
+            if lease is None or lease.token != token:
+                raise LeaseLost(f"Lease {lease_id} is no longer held by this worker")
+            if error:
+                logger.warning(f"Lease {lease_id} failed on {lease.holder}: {error}")
+                del self._active[lease_id]
+                self._requeue(lease, error)
+                return
+            lease.deadline = time.monotonic() + self.lease_ttl
+            lease.findings.extend(findings)
+            lease.counters = counters
+            if final:
+                self._merge(lease, summary or {})
+                del self._active[lease_id]
+                self._done += 1
+                self._finished.notify_all()
+
+    def _expire(self):
+        """Put leases whose holder stopped reporting back at the front of the queue"""
+        now = time.monotonic()
+        for lease_id, lease in list(self._active.items()):
+            if lease.deadline < now:
+                del self._active[lease_id]
+                logger.warning(f"Lease {lease_id} held by {lease.holder} expired")
+                self._requeue(lease, "expired")
+
+    def _requeue(self, lease, reason):
+        if lease.attempt >= self.max_attempts:
+            logger.error(f"Giving up on lease {lease.id} after {lease.attempt} attempts ({reason})")
+            self._failed.append({"lease": lease.id, "target": lease.target, "start": lease.start,
+                                 "count": lease.count, "reason": reason})
+            self._done += 1
+            self._finished.notify_all()
+        else:
+            self._pending.appendleft(lease)
+            self._reassigned += 1
+
+    def _merge(self, lease, summary):
+        results = self.results[lease.target]
+        for finding in lease.findings:
+            merged = dict(finding)
+            merged["id"] = f"VULN-{len(results['vulnerabilities']) + 1}"
+            results["vulnerabilities"].append(merged)
+            results["summary"]["vulnerabilities_found"] += 1
+            results["summary"]["risk_score"] += engine.SEVERITY_WEIGHTS.get(merged.get("severity"), 1)
+            # Cluster ids are per lease; regroup across the whole run
+            self._clusterers[lease.target].add(merged)
+        for vector_id, counts in lease.counters.items():
+            details = results["test_details"].setdefault(vector_id, {"name": counts.get("name", vector_id)})
+            for counter in _COUNTERS:
+                details[counter] = details.get(counter, 0) + counts.get(counter, 0)
+        results["summary"]["total_tests"] += summary.get("total_tests", 0)
+        if "privacy" in summary:
+            privacy = results.setdefault("privacy", {
+                "regulations": summary["privacy"]["regulations"],
+                "responses_scanned": 0,
+                "responses_unscanned": 0,
+                "hits_by_type": {},
+                "hits_by_regulation": {},
+            })
+            privacy["responses_scanned"] += summary["privacy"]["responses_scanned"]
+            privacy["responses_unscanned"] += summary["privacy"].get("responses_unscanned", 0)
+            for section in ("hits_by_type", "hits_by_regulation"):
+                for key, count in summary["privacy"][section].items():
+                    privacy[section][key] = privacy[section].get(key, 0) + count
+        if summary.get("profile") and lease.target in self._profilers:
+            self._profilers[lease.target].merge_serialized(summary["profile"])
+
+    # Progress
+
+    def status(self):
+        with self._lock:
+            self._expire()
+            streamed = sum(len(lease.findings) for lease in self._active.values())
+            return {
+                "leases": self.total,
+                "done": self._done,
+                "active": len(self._active),
+                "pending": len(self._pending),
+                "reassigned": self._reassigned,
+                "failed": len(self._failed),
+                "workers": len(self._workers),
+                "findings": sum(r["summary"]["vulnerabilities_found"] for r in self.results.values()) + streamed,
+                "requests": sum(r["summary"]["total_tests"] for r in self.results.values()),
+            }
+
+    def wait(self, timeout=None):
+        """Block until every lease is merged; return False on timeout.
+
+        Leases are expired while waiting, so the leases of workers that died
+        go back to the queue even when nothing polls ``status``.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._finished:
+            while self._done != self.total:
+                self._expire()
+                remaining = EXPIRE_INTERVAL if deadline is None else min(EXPIRE_INTERVAL, deadline - time.monotonic())
+                if remaining <= 0:
+                    return False
+                self._finished.wait(remaining)
+            return True
+
+    def final_results(self):
+        """Return the merged per-target results"""
+        timestamp = datetime.now().isoformat()
+        for name, results in self.results.items():
+            failed = [lease for lease in self._failed if lease["target"] == name]
+            if failed:
+                results["failed_leases"] = failed
+            results["clusters"] = self._clusterers[name].summary()
+            profiler = self._profilers.get(name)
+            if profiler is not None:
+                directory = self.settings["profile_dir"]
+                results["profile"] = {
+                    "responses": profiler.responses,
+                    "vectors": profiler.summary(),
+                    "path": profiler.write(directory, name) if directory else None,
+                }
+            results["stop_reason"] = "completed" if self._done == self.total and not failed else "incomplete"
+            results["timestamp"] = timestamp
+        return list(self.results.values())
+
+    # HTTP server
+
+    def serve(self, host="127.0.0.1", port=DEFAULT_PORT):
+        """Start serving leases on a background thread and return the server.
+
+        Leases carry target credentials, so a non-loopback ``host`` needs a token.
+        """
+        if not self.token and not is_loopback(host):
+            raise ValueError(f"Refusing to serve target credentials on {host} without a token; pass --token")
+        coordinator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def _reply(self, status, body=None):
+                data = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _authorized(self):
+                sent = self.headers.get(TOKEN_HEADER, "").encode()
+                if coordinator.token and not hmac.compare_digest(sent, coordinator.token.encode()):
+                    self._reply(403, {"error": "bad token"})
+                    return False
+                return True
+
+            def do_GET(self):
+                if not self._authorized():
+                    return
+                if self.path == "/status":
+                    self._reply(200, coordinator.status())
+                else:
+                    self._reply(404, {"error": "not found"})
+
+            def do_POST(self):
+                if not self._authorized():
+                    return
+                try:
+                    body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                except ValueError:
+                    self._reply(400, {"error": "invalid JSON"})
+                    return
+                if self.path == "/lease":
+                    lease = coordinator.acquire(body.get("worker", self.client_address[0]))
+                    self._reply(200, lease) if lease is not None else self._reply(204)
+                elif self.path == "/report":
+                    try:
+                        coordinator.report(body["lease_id"], body["token"], body.get("findings", []),
+                                           body.get("counters", {}), body.get("final", False), body.get("summary"),
+                                           body.get("error"))
+                    except LeaseLost as e:
+                        self._reply(409, {"error": str(e)})
+                        return
+                    except KeyError as e:
+                        self._reply(400, {"error": f"missing {e}"})
+                        return
+                    self._reply(200, {"ok": True})
+                else:
+                    self._reply(404, {"error": "not found"})
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="coordinator", daemon=True).start()
+        logger.info(f"Coordinator serving {self.total} leases on {host}:{self._server.server_port}")
+        return self._server
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+class Worker:
+    """Pulls leases from a coordinator and runs them with the engine"""
+
+    def __init__(self, coordinator_url, name=None, token=None, report_interval=REPORT_INTERVAL,
+                 poll_interval=POLL_INTERVAL, concurrency=None):
+        self.url = coordinator_url.rstrip("/")
+        self.name = name or f"{socket.gethostname()}-{uuid.uuid4().hex[:6]}"
+        self.report_interval = report_interval
+        self.poll_interval = poll_interval
+        self.concurrency = concurrency
+        self.leases_run = 0
+        self._session = requests.Session()
+        if token:
+            self._session.headers[TOKEN_HEADER] = token
+
+    def _post(self, path, body):
+        return self._session.post(f"{self.url}{path}", json=body, timeout=30)
+
+    def run(self, max_leases=None):
+        """Work until the coordinator reports that every lease is done"""
+        logger.info(f"Worker {self.name} pulling leases from {self.url}")
+        while max_leases is None or self.leases_run < max_leases:
+            try:
+                response = self._post("/lease", {"worker": self.name})
+            except requests.ConnectionError:
+                if not self.leases_run:
+                    raise
+                # The coordinator shuts down once the last lease is merged
+                logger.info(f"Coordinator at {self.url} has gone away")
+                break
+            response.raise_for_status()
+            if response.status_code == 204:
+                time.sleep(self.poll_interval)
+                continue
+            lease = response.json()
+            if lease.get("done"):
+                break
+            self.run_lease(lease)
+            self.leases_run += 1
+        logger.info(f"Worker {self.name} finished after {self.leases_run} leases")
+        return self.leases_run
+
+    def run_lease(self, lease):
+        """Run one lease, streaming findings and counters until it completes"""
+        settings = dict(lease["settings"])
+        if self.concurrency:
+            settings["concurrency"] = self.concurrency
+        # The coordinator writes the merged profile; the lease's own stays in memory
+        settings["profile_dir"] = None
+        # The coordinator's cassette directory means nothing on this machine
+        settings["cassette_dir"] = None
+        profiler = profiles.ResponseProfiler() if settings.get("profile") and profiles.available() else None
+        progress = engine.RunProgress()
+        outcome = {}
+
+        def execute():
+            try:
+                outcome["results"] = engine.run_assessment(lease["target"], lease["test_vectors"], settings,
+                                                           progress=progress, results=live, profiler=profiler)
+            except Exception as e:
+                outcome["error"] = str(e)
+
+        live = engine.new_results(lease["target"])
+        runner = threading.Thread(target=execute, name=f"lease-{lease['lease_id']}", daemon=True)
+        runner.start()
+        sent = 0
+        while runner.is_alive():
+            runner.join(self.report_interval)
+            if not runner.is_alive():
+                break
+            try:
+                sent = self._report(lease, live, sent)
+            except ReportFailed as e:
+                # Progress that can't be reported is wasted; stop and let another attempt run it
+                progress.cancel()
+                runner.join()
+                self._hand_back(lease, str(e))
+                return
+            if sent is None:
+                # The lease went to another worker; stop spending requests on it
+                progress.cancel()
+                runner.join()
+                return
+
+        if "error" in outcome:
+            logger.error(f"Lease {lease['lease_id']} failed: {outcome['error']}")
+            self._hand_back(lease, outcome["error"])
+            return
+        results = outcome["results"]
+        summary = {"total_tests": results["summary"]["total_tests"], "stop_reason": results["stop_reason"]}
+        if "privacy" in results:
+            summary["privacy"] = results["privacy"]
+        if profiler is not None:
+            summary["profile"] = profiler.serialize()
+        try:
+            self._report(lease, results, sent, final=True, summary=summary)
+        except ReportFailed as e:
+            self._hand_back(lease, str(e))
+
+    def _hand_back(self, lease, reason):
+        """Return a lease to the coordinator's queue; if that fails too, it expires there"""
+        try:
+            self._report(lease, {"vulnerabilities": [], "test_details": {}}, 0, error=reason)
+        except ReportFailed as e:
+            logger.error(f"Could not hand lease {lease['lease_id']} back, leaving it to expire: {str(e)}")
+
+    def _report(self, lease, results, sent, final=False, summary=None, error=None):
+        """Send findings after index ``sent`` plus current counters; return the new index or None if the lease was lost.
+
+        Raises ReportFailed when the coordinator can't be reached or rejects the report.
+        """
+        findings = [dict(finding) for finding in results["vulnerabilities"][sent:]]
+        counters = {vector_id: dict(details) for vector_id, details in list(results["test_details"].items())}
+        try:
+            response = self._post("/report", {
+                "lease_id": lease["lease_id"],
+                "token": lease["token"],
+                "findings": findings,
+                "counters": counters,
+                "final": final,
+                "summary": summary,
+                "error": error,
+            })
+            if response.status_code == 409:
+                logger.warning(f"Lease {lease['lease_id']} was reassigned; abandoning it")
+                return None
+            response.raise_for_status()
+        except requests.RequestException as e:
+            raise ReportFailed(f"Report for lease {lease['lease_id']} failed: {str(e)}") from e
+        return sent + len(findings)
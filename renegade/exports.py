@@ -0,0 +1,190 @@
+"""Streaming export writers for assessment results.
+
+Exports are written chunk by chunk from the findings store into a binary file
+object. The CLI writes straight to the output file. Streamlit serves downloads
+from memory, so ``export_buffer`` builds the whole export in a ``BytesIO``.
+"""
+
+import csv
+import gzip
+import io
+import json
+import logging
+from datetime import datetime
+
+logger = logging.getLogger("RedTeamApp.exports")
+
+# Number of findings serialized per write
+EXPORT_CHUNK_SIZE = 5000
+
+# Column order used by tabular exports
+FINDING_FIELDS = ["id", "test_vector", "test_name", "severity", "details", "timestamp", "fingerprint"]
+
+EXPORT_FORMATS = {
+    "json": {"label": "JSON Report", "extension": "json", "mime": "application/json"},
+    "ndjson": {"label": "NDJSON Findings", "extension": "ndjson", "mime": "application/x-ndjson"},
+    "csv": {"label": "CSV Findings", "extension": "csv", "mime": "text/csv"},
+    "parquet": {"label": "Parquet Findings", "extension": "parquet", "mime": "application/vnd.apache.parquet"},
+}
+
+
+def parquet_available():
+    """Return True when pyarrow is installed"""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def iter_findings(results):
+    """Iterate over the findings of a results dict without copying them"""
+    return iter(results.get("vulnerabilities", []) or [])
+
+
+def _chunked(iterable, size):
+    """Yield lists of at most ``size`` items"""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def finding_fields(results):
+    """Return the tabular columns for a run: the standard fields plus any extras"""
+    fields = list(FINDING_FIELDS)
+    for finding in iter_findings(results):
+        for key in finding.keys():
+            if key not in fields:
+                fields.append(key)
+        break
+    return fields
+
+
+def iter_json_chunks(results, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the JSON report as text chunks, streaming the findings array"""
+    yield "{\n"
+    for key, value in results.items():
+        if key == "vulnerabilities":
+            continue
+        rendered = json.dumps(value, indent=2, default=str).replace("\n", "\n  ")
+        yield f"  {json.dumps(key)}: {rendered},\n"
+
+    yield '  "vulnerabilities": ['
+    first = True
+    for chunk in _chunked(iter_findings(results), chunk_size):
+        lines = []
+        for finding in chunk:
+            prefix = "\n    " if first else ",\n    "
+            lines.append(prefix + json.dumps(dict(finding), default=str))
+            first = False
+        yield "".join(lines)
+    yield "\n  ]\n}\n" if not first else "]\n}\n"
+
+
+def iter_ndjson_chunks(results, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield one JSON object per finding per line"""
+    for chunk in _chunked(iter_findings(results), chunk_size):
+        yield "".join(json.dumps(dict(finding), default=str) + "\n" for finding in chunk)
+
+
+def iter_csv_chunks(results, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield CSV text chunks with a header row"""
+    fields = finding_fields(results)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+    writer.writeheader()
+    for chunk in _chunked(iter_findings(results), chunk_size):
+        writer.writerows(dict(finding) for finding in chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _write_parquet(results, fileobj, compress, chunk_size):
+    """Write findings as Parquet, one row group per chunk"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    fields = finding_fields(results)
+    schema = pa.schema([(field, pa.string()) for field in fields])
+    compression = "gzip" if compress else "snappy"
+
+    with pq.ParquetWriter(fileobj, schema, compression=compression) as writer:
+        for chunk in _chunked(iter_findings(results), chunk_size):
+            columns = {field: [] for field in fields}
+            for finding in chunk:
+                for field in fields:
+                    value = finding.get(field)
+                    columns[field].append(None if value is None else str(value))
+            writer.write_table(pa.table(columns, schema=schema))
+
+
+CHUNK_WRITERS = {
+    "json": iter_json_chunks,
+    "ndjson": iter_ndjson_chunks,
+    "csv": iter_csv_chunks,
+}
+
+
+def write_export(results, fmt, fileobj, compress=False, chunk_size=EXPORT_CHUNK_SIZE):
+    """Stream ``results`` in format ``fmt`` into the binary file object ``fileobj``"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    if fmt == "parquet":
+        # Parquet compresses its own pages, so gzip maps to the codec
+        _write_parquet(results, fileobj, compress, chunk_size)
+        return
+
+    out = gzip.GzipFile(fileobj=fileobj, mode="wb") if compress else fileobj
+    try:
+        for text in CHUNK_WRITERS[fmt](results, chunk_size):
+            out.write(text.encode("utf-8"))
+    finally:
+        if compress:
+            out.close()
+
+
+def read_json_report(fileobj):
+    """Load a results dict from a (possibly gzipped) JSON report export"""
+    data = fileobj.read()
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    results = json.loads(data)
+    if not isinstance(results, dict) or not isinstance(results.get("vulnerabilities"), list):
+        raise ValueError("Not a JSON results report")
+    return results
+
+
+def export_buffer(results, fmt, compress=False, chunk_size=EXPORT_CHUNK_SIZE):
+    """Return an export built in memory, for a download button"""
+    started = datetime.now()
+    buffer = io.BytesIO()
+    write_export(results, fmt, buffer, compress=compress, chunk_size=chunk_size)
+    buffer.seek(0)
+    logger.info(f"Prepared {fmt}{' (gzip)' if compress else ''} export in {(datetime.now() - started).total_seconds():.2f}s")
+    return buffer
+
+
+def export_file_name(fmt, compress=False, timestamp=None):
+    """Build the download file name for an export"""
+    timestamp = timestamp or datetime.now()
+    prefix = "security_assessment" if fmt == "json" else "vulnerabilities"
+    name = f"{prefix}_{timestamp.strftime('%Y%m%d_%H%M%S')}.{EXPORT_FORMATS[fmt]['extension']}"
+    if compress and fmt != "parquet":
+        name += ".gz"
+    return name
+
+
+def export_mime(fmt, compress=False):
+    """Return the MIME type for an export"""
+    if compress and fmt != "parquet":
+        return "application/gzip"
+    return EXPORT_FORMATS[fmt]["mime"]
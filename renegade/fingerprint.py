@@ -0,0 +1,108 @@
+"""Stable finding fingerprints and run-to-run diffs.
+
+Finding ids are numbered per run, so they say nothing about whether two
+runs found the same issue. A fingerprint hashes what identifies an issue:
+the target, the vector (with its mutation family), the payload with its
+canary taken out and a normalized signature of the response. Indexing a
+run by fingerprint lets two runs be compared in one pass over each.
+"""
+
+import hashlib
+import re
+
+# Stands in for the per-request canary when a payload is fingerprinted
+CANARY_PLACEHOLDER = "<canary>"
+
+# Characters of normalized response text kept in its signature
+SIGNATURE_LENGTH = 256
+
+NEW = "new"
+FIXED = "fixed"
+RECURRING = "recurring"
+
+_CANARY = re.compile(r"RT-[0-9A-F]{8}-\d{6}")
+_NUMBER = re.compile(r"\d+")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(text):
+    """Lower-case ``text`` with canaries, numbers and runs of whitespace collapsed"""
+    text = _CANARY.sub(CANARY_PLACEHOLDER, text or "")
+    text = _NUMBER.sub("0", text.lower())
+    return _SPACE.sub(" ", text).strip()
+
+
+def response_signature(text):
+    """The part of a response that identifies the behaviour behind a finding"""
+    return normalize(text)[:SIGNATURE_LENGTH]
+
+
+def compute(target, vector_id, payload, signature):
+    """Fingerprint one finding from its identifying parts"""
+    key = "\x1f".join((target or "", vector_id or "", normalize(payload), signature or ""))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def of(finding, target=None):
+    """Return a finding's fingerprint, deriving one from its details if it has none"""
+    fingerprint = finding.get("fingerprint")
+    if fingerprint:
+        return fingerprint
+    return compute(target, finding.get("test_vector"), "", response_signature(finding.get("details")))
+
+
+class FindingIndex:
+    """Findings of one run grouped by fingerprint"""
+
+    def __init__(self, results=None):
+        self.target = None
+        self.groups = {}
+        if results is not None:
+            self.target = results.get("target")
+            for finding in results.get("vulnerabilities", []) or []:
+                self.add(finding)
+
+    def add(self, finding):
+        self.groups.setdefault(of(finding, self.target), []).append(finding)
+
+    def __len__(self):
+        return len(self.groups)
+
+    def __contains__(self, fingerprint):
+        return fingerprint in self.groups
+
+
+def _entry(status, fingerprint, baseline, current):
+    example = (current or baseline)[0]
+    return {
+        "status": status,
+        "fingerprint": fingerprint,
+        "test_vector": example.get("test_vector"),
+        "test_name": example.get("test_name"),
+        "severity": example.get("severity"),
+        "details": example.get("details"),
+        "baseline_count": len(baseline),
+        "current_count": len(current),
+    }
+
+
+def diff_runs(baseline, current):
+    """Classify every fingerprint in two runs as new, fixed or recurring.
+
+    Takes results dicts or ``FindingIndex`` objects and returns a dict of
+    entry lists keyed by status, each entry carrying an example finding's
+    vector, severity and details plus its count in both runs.
+    """
+    before = baseline if isinstance(baseline, FindingIndex) else FindingIndex(baseline)
+    after = current if isinstance(current, FindingIndex) else FindingIndex(current)
+    diff = {NEW: [], FIXED: [], RECURRING: []}
+    for fingerprint, findings in after.groups.items():
+        previous = before.groups.get(fingerprint)
+        if previous is None:
+            diff[NEW].append(_entry(NEW, fingerprint, [], findings))
+        else:
+            diff[RECURRING].append(_entry(RECURRING, fingerprint, previous, findings))
+    for fingerprint, findings in before.groups.items():
+        if fingerprint not in after.groups:
+            diff[FIXED].append(_entry(FIXED, fingerprint, findings, []))
+    return diff
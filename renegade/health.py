@@ -0,0 +1,321 @@
+"""Background health and latency probing for targets.
+
+The prober checks every watched target concurrently on a bounded thread pool,
+keeps idle keep-alive connections per host for reuse, and stores each result
+in a TTL cache keyed by normalized endpoint, so sessions whose targets share
+a name never see each other's results. Pages and the engine only ever read
+the cache, so no network call happens during a rerun.
+"""
+
+import logging
+import socket
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from renegade.targets import normalize_endpoint
+
+logger = logging.getLogger("RedTeamApp.health")
+
+HEALTHY = "healthy"
+DEGRADED = "degraded"
+DOWN = "down"
+UNKNOWN = "unknown"
+
+# Order in which targets are scheduled: healthy first, down never
+STATUS_PRIORITY = {HEALTHY: 0, UNKNOWN: 1, DEGRADED: 2}
+
+# First-byte latency above which a target counts as degraded
+DEGRADED_LATENCY_MS = 2000
+
+# Targets not watched by any page for this long stop being probed
+WATCH_EXPIRY_SECONDS = 600
+
+
+def _elapsed_ms(started):
+    """Milliseconds since ``started`` (a perf_counter value)"""
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def cache_key(target):
+    """Key of ``target``'s probe results: its endpoint, since names are only unique per session"""
+    return normalize_endpoint(target["endpoint"])
+
+
+def parse_endpoint(endpoint):
+    """Return (scheme, host, port, path) for an endpoint URL"""
+    parts = urlsplit(endpoint if "://" in endpoint else f"https://{endpoint}")
+    scheme = parts.scheme.lower() or "https"
+    if scheme not in ("http", "https"):
+        raise ValueError(f"unsupported scheme '{scheme}'")
+    if not parts.hostname:
+        raise ValueError("endpoint has no host")
+    port = parts.port or (443 if scheme == "https" else 80)
+    path = parts.path or "/"
+    if parts.query:
+        path += f"?{parts.query}"
+    return scheme, parts.hostname, port, path
+
+
+def _read_head_response(sock):
+    """Read a HEAD response, returning (status_code, keep_alive, first_byte_time)"""
+    data = sock.recv(4096)
+    first_byte = time.perf_counter()
+    if not data:
+        raise ConnectionError("connection closed before response")
+    while b"\r\n\r\n" not in data and len(data) < 65536:
+        more = sock.recv(4096)
+        if not more:
+            break
+        data += more
+
+    head = data.split(b"\r\n\r\n", 1)[0].decode("iso-8859-1")
+    lines = head.split("\r\n")
+    try:
+        status = int(lines[0].split()[1])
+    except (IndexError, ValueError):
+        raise ConnectionError(f"malformed status line: {lines[0][:80]}")
+    headers = {}
+    for line in lines[1:]:
+        key, _, value = line.partition(":")
+        headers[key.strip().lower()] = value.strip().lower()
+    keep_alive = headers.get("connection") != "close" and lines[0].startswith("HTTP/1.1")
+    return status, keep_alive, first_byte
+
+
+def classify(result):
+    """Derive the health status of a probe result"""
+    if result.get("error"):
+        return DOWN
+    if (result.get("status_code") or 0) >= 500 or (result.get("ttfb_ms") or 0) > DEGRADED_LATENCY_MS:
+        return DEGRADED
+    return HEALTHY
+
+
+class HealthCache:
+    """Thread-safe store of probe results that expire after ``ttl`` seconds, keyed by ``cache_key``"""
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def put(self, key, result):
+        with self._lock:
+            self._entries[key] = (result, time.monotonic() + self.ttl)
+
+    def get(self, key):
+        """Return the cached result for ``key`` or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            return None
+        return entry[0]
+
+    def status(self, key):
+        """Return the cached status for ``key``, UNKNOWN if nothing is fresh"""
+        result = self.get(key)
+        return result["status"] if result else UNKNOWN
+
+    def snapshot(self, keys=None):
+        """Return fresh results by key"""
+        now = time.monotonic()
+        with self._lock:
+            items = list(self._entries.items())
+        wanted = set(keys) if keys is not None else None
+        return {
+            key: result for key, (result, expires) in items
+            if expires >= now and (wanted is None or key in wanted)
+        }
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+def rank_targets(targets, cache, probed=None):
+    """Order targets by cached health, dropping those known to be down.
+
+    Targets for which ``probed(target)`` is false are never probed and rank
+    as healthy. Returns ``(ranked, skipped)`` where ``skipped`` holds the
+    down targets.
+    """
+    ranked = []
+    skipped = []
+    for target in targets:
+        status = cache.status(cache_key(target)) if probed is None or probed(target) else HEALTHY
+        if status == DOWN:
+            skipped.append(target)
+        else:
+            ranked.append((STATUS_PRIORITY.get(status, 1), cache_latency(cache, cache_key(target)), target))
+    ranked.sort(key=lambda item: (item[0], item[1]))
+    return [target for _, _, target in ranked], skipped
+
+
+def cache_latency(cache, key):
+    """Return the cached first-byte latency for ``key`` or infinity"""
+    result = cache.get(key)
+    if not result or result.get("ttfb_ms") is None:
+        return float("inf")
+    return result["ttfb_ms"]
+
+
+class TargetProber:
+    """Periodically probes watched targets and fills a HealthCache"""
+
+    def __init__(self, interval=30, ttl=60, timeout=5, max_workers=16):
+        self.interval = interval
+        self.timeout = timeout
+        self.cache = HealthCache(ttl=ttl)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="health-probe")
+        self._watched = {}
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the background probe loop (idempotent)"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="health-prober", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        self._executor.shutdown(wait=False)
+        with self._lock:
+            sockets = list(self._idle.values())
+            self._idle.clear()
+        for sock in sockets:
+            sock.close()
+
+    def watch(self, targets):
+        """Register targets to probe; cheap enough to call on every rerun"""
+        now = time.monotonic()
+        new = False
+        with self._lock:
+            for target in targets:
+                key = cache_key(target)
+                if key not in self._watched:
+                    new = True
+                self._watched[key] = (target["endpoint"], now)
+        if new:
+            self._wake.set()
+
+    def refresh(self):
+        """Ask the background loop to probe now instead of at the next interval"""
+        self._wake.set()
+
+    def _loop(self):
+        while not self._stopped.is_set():
+            try:
+                self.probe_all()
+            except Exception as e:
+                logger.error(f"Health probe cycle failed: {str(e)}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def probe_all(self):
+        """Probe every watched target concurrently and cache the results"""
+        now = time.monotonic()
+        with self._lock:
+            for key in [k for k, (_, seen) in self._watched.items() if now - seen > WATCH_EXPIRY_SECONDS]:
+                del self._watched[key]
+                self.cache.discard(key)
+            watched = [(key, endpoint) for key, (endpoint, _) in self._watched.items()]
+
+        futures = {key: self._executor.submit(self.probe, endpoint) for key, endpoint in watched}
+        for key, future in futures.items():
+            result = future.result()
+            previous = self.cache.get(key)
+            if result["reused"] and previous:
+                # Keep the handshake timings from the last fresh connection
+                for phase in ("dns_ms", "connect_ms", "tls_ms"):
+                    result[phase] = previous[phase]
+            if result["status"] == DOWN and (previous is None or previous["status"] != DOWN):
+                logger.warning(f"Target {result['endpoint']} is down: {result['error']}")
+            self.cache.put(key, result)
+
+    def probe(self, endpoint):
+        """Measure DNS, connect, TLS and first-byte latency for one endpoint"""
+        result = {
+            "endpoint": endpoint,
+            "dns_ms": None,
+            "connect_ms": None,
+            "tls_ms": None,
+            "ttfb_ms": None,
+            "status_code": None,
+            "reused": False,
+            "error": None,
+            "checked_at": time.time(),
+        }
+        sock = None
+        try:
+            scheme, host, port, path = parse_endpoint(endpoint)
+            key = (scheme, host, port)
+
+            with self._lock:
+                sock = self._idle.pop(key, None)
+            if sock is not None:
+                try:
+                    status, keep_alive = self._head(sock, host, path, result)
+                    result["reused"] = True
+                except OSError:
+                    sock.close()
+                    sock = None
+            if sock is None:
+                sock = self._connect(scheme, host, port, result)
+                status, keep_alive = self._head(sock, host, path, result)
+
+            result["status_code"] = status
+            if keep_alive:
+                with self._lock:
+                    previous = self._idle.pop(key, None)
+                    self._idle[key] = sock
+                if previous is not None:
+                    previous.close()
+                sock = None
+        except Exception as e:
+            result["error"] = str(e) or type(e).__name__
+        finally:
+            if sock is not None:
+                sock.close()
+
+        result["status"] = classify(result)
+        return result
+
+    def _connect(self, scheme, host, port, result):
+        """Open a fresh connection, timing each phase"""
+        started = time.perf_counter()
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        result["dns_ms"] = _elapsed_ms(started)
+
+        started = time.perf_counter()
+        sock = socket.create_connection(infos[0][4][:2], timeout=self.timeout)
+        result["connect_ms"] = _elapsed_ms(started)
+
+        if scheme == "https":
+            started = time.perf_counter()
+            try:
+                sock = ssl.create_default_context().wrap_socket(sock, server_hostname=host)
+            except Exception:
+                sock.close()
+                raise
+            result["tls_ms"] = _elapsed_ms(started)
+        return sock
+
+    def _head(self, sock, host, path, result):
+        """Send a HEAD request and time the first response byte"""
+        sock.settimeout(self.timeout)
+        request = f"HEAD {path} HTTP/1.1\r\nHost: {host}\r\nUser-Agent: renegade-health/1.0\r\nConnection: keep-alive\r\n\r\n"
+        started = time.perf_counter()
+        sock.sendall(request.encode("ascii"))
+        status, keep_alive, first_byte = _read_head_response(sock)
+        result["ttfb_ms"] = round((first_byte - started) * 1000, 2)
+        return status, keep_alive
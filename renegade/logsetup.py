@@ -0,0 +1,220 @@
+"""Queued, structured and sampled logging.
+
+Loggers only enqueue records; a single listener thread formats them and
+writes to a size-rotated JSON lines file and to the console, so engine
+threads never wait on disk. High-volume events (one per request or per
+finding) go through ``log_event``, which samples them before a record is
+even created. Records logged inside ``log_context`` carry its run and
+target ids.
+"""
+
+import atexit
+import contextlib
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+
+LOG_FILE = "redteam_app.log"
+MAX_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 5
+QUEUE_SIZE = 10000
+
+REQUEST = "request"
+FINDING = "finding"
+
+# Share of records kept per event; events not listed are always kept
+DEFAULT_SAMPLE_RATES = {
+    REQUEST: 0.01,
+    FINDING: 1.0,
+}
+
+CONSOLE_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_context = contextvars.ContextVar("log_context", default={})
+_rates = dict(DEFAULT_SAMPLE_RATES)
+_listener = None
+_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def log_context(**fields):
+    """Attach ``fields`` (e.g. run_id, target) to records logged in this block"""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copy the active log context onto each record"""
+
+    def filter(self, record):
+        for key, value in _context.get().items():
+            setattr(record, key, value)
+        return True
+
+
+def log_event(logger, event, msg, *args, level=logging.INFO, **fields):
+    """Log a high-volume ``event`` record, keeping only its sampled share"""
+    rate = _rates.get(event, 1.0)
+    if rate < 1.0 and (rate <= 0 or random.random() >= rate):
+        return
+    if logger.isEnabledFor(level):
+        logger.log(level, msg, *args, extra={"event": event, **fields})
+
+
+class DropOnFullQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records instead of blocking when the listener lags"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Keep the traceback apart from the message so the JSON stays structured
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    FIELDS = ("run_id", "target", "event", "vector", "severity")
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for field in self.FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RotatingJsonFileHandler(logging.handlers.RotatingFileHandler):
+    """Size-rotated file handler for the listener thread.
+
+    Tracks the file size itself instead of formatting every record twice and
+    seeking to check for rollover, and leaves flushing to the listener, which
+    flushes whenever the queue drains.
+    """
+
+    def __init__(self, filename, max_bytes, backup_count):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self._size = os.path.getsize(self.baseFilename) if os.path.exists(self.baseFilename) else 0
+
+    def emit(self, record):
+        try:
+            line = self.format(record) + self.terminator
+            if self.maxBytes and self._size and self._size + len(line) > self.maxBytes:
+                self.doRollover()
+                self._size = 0
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(line)
+            self._size += len(line)
+        except Exception:
+            self.handleError(record)
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """Flushes handlers once the queue is empty rather than after every record"""
+
+    def dequeue(self, block):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            for handler in self.handlers:
+                handler.flush()
+            return self.queue.get(block)
+
+
+def configure_logging(path=LOG_FILE, level=logging.INFO, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT,
+                      console=True, console_level=logging.NOTSET, sample_rates=None):
+    """Route the root logger through a queue listener; safe to call on every rerun"""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        log_queue = queue.Queue(QUEUE_SIZE)
+        queue_handler = DropOnFullQueueHandler(log_queue)
+        queue_handler.addFilter(ContextFilter())
+        if sample_rates is not None:
+            set_sample_rates(**sample_rates)
+
+        handlers = []
+        if path:
+            file_handler = RotatingJsonFileHandler(path, max_bytes, backup_count)
+            file_handler.setFormatter(JsonFormatter())
+            handlers.append(file_handler)
+        if console:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+            console_handler.setLevel(console_level)
+            handlers.append(console_handler)
+
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(queue_handler)
+
+        _listener = BatchingQueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+        return _listener
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def set_sample_rates(**rates):
+    """Update the process-wide sampling rates, e.g. ``request=0.1``"""
+    _rates.update(rates)
+
+
+def sample_rates():
+    """Return the active sampling rates"""
+    return dict(_rates)
+
+
+def rates_from_env():
+    """Read sampling overrides such as RENEGADE_LOG_SAMPLE_REQUEST=0.05"""
+    rates = dict(DEFAULT_SAMPLE_RATES)
+    for event in rates:
+        value = os.environ.get(f"RENEGADE_LOG_SAMPLE_{event.upper()}")
+        if value:
+            rates[event] = float(value)
+    return rates
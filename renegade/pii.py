@@ -0,0 +1,314 @@
+"""Streaming PII detection for target responses.
+
+Detectors are precompiled regular expressions with optional validators (Luhn,
+IBAN mod-97, SSN area rules) and a cheap prefilter that skips the regex when
+a response cannot contain a match. Responses are scanned in batches on a
+shared multiprocess pool so the engine's dispatch loop never waits on them.
+"""
+
+import atexit
+import logging
+import multiprocessing
+import os
+import re
+import threading
+import time
+
+logger = logging.getLogger("RedTeamApp.pii")
+
+REGULATIONS = ["GDPR", "CCPA", "HIPAA", "PIPEDA"]
+
+# Responses per task sent to a scanner process
+SCAN_BATCH_SIZE = 256
+
+
+def luhn_valid(digits):
+    """Check a digit string with the Luhn checksum"""
+    total = 0
+    for i, char in enumerate(reversed(digits)):
+        value = ord(char) - 48
+        if i % 2:
+            value *= 2
+            if value > 9:
+                value -= 9
+        total += value
+    return total % 10 == 0
+
+
+def _digits(text):
+    return "".join(char for char in text if char.isdigit())
+
+
+def _valid_card(match):
+    digits = _digits(match)
+    return 13 <= len(digits) <= 19 and luhn_valid(digits)
+
+
+def _valid_ssn(match):
+    area, group, serial = match.split("-")
+    return area not in ("000", "666") and area[0] != "9" and group != "00" and serial != "0000"
+
+
+def _valid_sin(match):
+    digits = _digits(match)
+    return digits[0] not in "08" and luhn_valid(digits)
+
+
+def _valid_iban(match):
+    compact = match.replace(" ", "").upper()
+    rearranged = compact[4:] + compact[:4]
+    number = "".join(str(int(char, 36)) for char in rearranged)
+    return int(number) % 97 == 1
+
+
+def _valid_ip(match):
+    return all(int(part) <= 255 for part in match.split("."))
+
+
+def _has_digit(text):
+    return any(char.isdigit() for char in text)
+
+
+# name: (label, pattern, validator, prefilter, regulations, severity)
+DETECTORS = {
+    "email": (
+        "email address",
+        re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b"),
+        None,
+        lambda text: "@" in text,
+        ["GDPR", "CCPA", "PIPEDA"],
+        "high",
+    ),
+    "phone": (
+        "phone number",
+        re.compile(r"(?<!\d)(?:\+\d{1,3}[ .-]?)?\(?\d{3}\)?[ .-]\d{3}[ .-]\d{4}(?!\d)"),
+        None,
+        _has_digit,
+        ["GDPR", "CCPA", "PIPEDA"],
+        "medium",
+    ),
+    "us_ssn": (
+        "US Social Security number",
+        re.compile(r"(?<!\d)\d{3}-\d{2}-\d{4}(?!\d)"),
+        _valid_ssn,
+        _has_digit,
+        ["CCPA", "HIPAA"],
+        "critical",
+    ),
+    "ca_sin": (
+        "Canadian Social Insurance number",
+        re.compile(r"(?<!\d)\d{3}[ -]\d{3}[ -]\d{3}(?!\d)"),
+        _valid_sin,
+        _has_digit,
+        ["PIPEDA"],
+        "critical",
+    ),
+    "uk_nino": (
+        "UK National Insurance number",
+        re.compile(r"\b[A-CEGHJ-PR-TW-Z][A-CEGHJ-NPR-TW-Z] ?\d{2} ?\d{2} ?\d{2} ?[A-D]\b"),
+        None,
+        _has_digit,
+        ["GDPR"],
+        "critical",
+    ),
+    "card": (
+        "payment card number",
+        re.compile(r"(?<!\d)(?:\d[ -]?){12,18}\d(?!\d)"),
+        _valid_card,
+        _has_digit,
+        ["GDPR", "CCPA", "PIPEDA"],
+        "critical",
+    ),
+    "iban": (
+        "IBAN",
+        re.compile(r"\b[A-Z]{2}\d{2}(?: ?[A-Z0-9]){11,30}\b"),
+        _valid_iban,
+        _has_digit,
+        ["GDPR"],
+        "high",
+    ),
+    "ip_address": (
+        "IP address",
+        re.compile(r"(?<![\d.])(?:\d{1,3}\.){3}\d{1,3}(?![\d.])"),
+        _valid_ip,
+        lambda text: "." in text,
+        ["GDPR", "CCPA"],
+        "medium",
+    ),
+    "date_of_birth": (
+        "date of birth",
+        re.compile(r"\b(?:DOB|date of birth|born on)\b[:\s]*[\w ,/.-]{6,20}", re.IGNORECASE),
+        None,
+        None,
+        ["GDPR", "CCPA", "HIPAA"],
+        "high",
+    ),
+    "health": (
+        "health information",
+        re.compile(
+            r"\b(?:diagnos(?:ed|is) with|medical record(?: number)?|MRN[:#]?\s*\d+|prescribed|"
+            r"HIV(?: positive)?|chemotherapy|psychiatric|ICD-10[: ]+[A-TV-Z]\d{2}(?:\.\d+)?)\b",
+            re.IGNORECASE,
+        ),
+        None,
+        None,
+        ["HIPAA", "GDPR"],
+        "critical",
+    ),
+}
+
+
+def mask(value):
+    """Hide all but the last four characters of a detected value"""
+    compact = value.strip()
+    if len(compact) <= 4:
+        return "*" * len(compact)
+    return "*" * (len(compact) - 4) + compact[-4:]
+
+
+def scan_text(text, regulations=None):
+    """Return PII hits in ``text`` relevant to any of ``regulations``"""
+    wanted = set(regulations or REGULATIONS)
+    hits = []
+    for name, (label, pattern, validator, prefilter, regs, severity) in DETECTORS.items():
+        applicable = [reg for reg in regs if reg in wanted]
+        if not applicable or (prefilter is not None and not prefilter(text)):
+            continue
+        for match in pattern.finditer(text):
+            value = match.group(0)
+            if validator is not None:
+                try:
+                    if not validator(value):
+                        continue
+                except ValueError:
+                    continue
+            hits.append({
+                "type": name,
+                "label": label,
+                "value": mask(value),
+                "start": match.start(),
+                "regulations": applicable,
+                "severity": severity,
+            })
+    return hits
+
+
+def scan_batch(texts, regulations=None):
+    """Scan a list of responses; runs inside scanner processes"""
+    return [scan_text(text, regulations) for text in texts]
+
+
+class ScannerPool:
+    """Process pool dedicated to PII scanning, restarted if it was terminated"""
+
+    def __init__(self, processes=None):
+        self.processes = processes or max(1, (os.cpu_count() or 2) - 1)
+        self._lock = threading.Lock()
+        self._pool = self._start()
+
+    def _start(self):
+        # Spawned workers are safe to start from the threaded web server
+        return multiprocessing.get_context("spawn").Pool(self.processes)
+
+    def submit(self, texts, regulations):
+        pool = self._pool
+        try:
+            return pool.apply_async(scan_batch, (texts, regulations))
+        except ValueError:
+            # "Pool not running": closed at exit or terminated elsewhere
+            with self._lock:
+                if self._pool is pool:
+                    logger.warning("PII scanner pool was not running; restarting it")
+                    self._pool = self._start()
+                pool = self._pool
+            return pool.apply_async(scan_batch, (texts, regulations))
+
+    def close(self):
+        self._pool.terminate()
+
+
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+
+def shared_pool():
+    """Return the process-wide scanner pool, starting it on first use"""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = ScannerPool()
+            atexit.register(_shared_pool.close)
+            logger.info(f"Started PII scanner pool with {_shared_pool.processes} processes")
+        return _shared_pool
+
+
+class StreamScanner:
+    """Batches responses from one run onto a scanner pool.
+
+    ``feed`` never blocks; ``drain`` returns the batches that are already
+    scanned and ``finish`` waits for the rest. Each result is a
+    ``(context, hits)`` pair in feed order. Responses whose batch failed or
+    was not scanned in time are counted in ``unscanned``.
+    """
+
+    def __init__(self, regulations, pool=None, batch_size=SCAN_BATCH_SIZE):
+        self.regulations = list(regulations)
+        self.pool = pool
+        self.batch_size = batch_size
+        self.scanned = 0
+        self.unscanned = 0
+        self._texts = []
+        self._contexts = []
+        self._pending = []
+
+    def feed(self, text, context):
+        self._texts.append(text)
+        self._contexts.append(context)
+        if len(self._texts) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._texts:
+            return
+        texts, contexts = self._texts, self._contexts
+        self._texts, self._contexts = [], []
+        if self.pool is None:
+            self._pending.append((contexts, scan_batch(texts, self.regulations)))
+        else:
+            self._pending.append((contexts, self.pool.submit(texts, self.regulations)))
+
+    def drain(self):
+        """Return results of completed batches without waiting"""
+        ready = []
+        while self._pending:
+            contexts, result = self._pending[0]
+            if hasattr(result, "ready"):
+                if not result.ready():
+                    break
+                try:
+                    result = result.get()
+                except Exception as e:
+                    # A failed batch loses its own responses, not the run
+                    self._pending.pop(0)
+                    self.unscanned += len(contexts)
+                    logger.error(f"PII scan of {len(contexts)} responses failed: {str(e)}")
+                    continue
+            self._pending.pop(0)
+            self.scanned += len(contexts)
+            ready.extend(zip(contexts, result))
+        return ready
+
+    def finish(self, timeout=None):
+        """Flush the partial batch and wait up to ``timeout`` seconds for every outstanding result"""
+        self._flush()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for contexts, result in self._pending:
+            if hasattr(result, "wait"):
+                result.wait(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        ready = self.drain()
+        if self._pending:
+            dropped = sum(len(contexts) for contexts, _ in self._pending)
+            self._pending = []
+            self.unscanned += dropped
+            logger.warning(f"Gave up on PII scans of {dropped} responses after {timeout}s")
+        return ready
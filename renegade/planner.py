@@ -0,0 +1,203 @@
+"""Execution plans: what a run will send and cost, known before it starts.
+
+``make_plan`` turns a target, its test vectors and the saved engine
+settings into a ``Plan``. The plan estimates request count, wall time and
+token spend from what was measured on that target. The engine then runs the
+plan's own settings, so the estimate describes the run that actually
+happens.
+
+The estimate is a throughput model: requests finish at ``concurrency``
+divided by the mean latency. It is capped by the target's ``rate_limit``,
+and by the throughput a throttled earlier run managed. Latency comes from
+the target's recent runs (``TargetStats``), else from its health probe's
+first-byte time, else from a default. ``basis`` says which one was used.
+Tokens are estimated as characters / ``CHARS_PER_TOKEN``.
+"""
+
+import collections
+import logging
+import math
+import threading
+
+from renegade import engine, health
+from renegade.vectors import build_payload, mutation_arms
+
+logger = logging.getLogger("RedTeamApp.planner")
+
+CHARS_PER_TOKEN = 4
+DEFAULT_LATENCY_MS = 1000       # Assumed for a live target nothing has been measured on
+DEFAULT_RESPONSE_CHARS = 400    # Assumed response length before any run
+SIMULATED_RESPONSE_CHARS = 60
+HISTORY_RUNS = 5                # Recent runs kept per target
+THROTTLED_SHARE = 0.01          # Share of requests failing with 429 that marks a run as rate limited
+
+MEASURED = "measured"
+PROBE = "health probe"
+SIMULATED = "simulated"
+DEFAULT = "default"
+
+BOUND_CONCURRENCY = "concurrency"
+BOUND_RATE_LIMIT = "rate limit"
+BOUND_THROTTLING = "measured throttling"
+
+
+class TargetStats:
+    """Latency, throughput and response size measured on each target over its recent runs"""
+
+    def __init__(self, runs=HISTORY_RUNS):
+        self._runs = {}
+        self._size = runs
+        self._lock = threading.Lock()
+
+    def record(self, target_name, measured):
+        """Add the ``measured`` totals of one finished run"""
+        if not measured or not measured.get("requests"):
+            return
+        with self._lock:
+            runs = self._runs.setdefault(target_name, collections.deque(maxlen=self._size))
+            runs.append(dict(measured))
+
+    def estimate(self, target_name):
+        """Aggregated measurements for ``target_name``, or None before its first run"""
+        with self._lock:
+            runs = list(self._runs.get(target_name, ()))
+        if not runs:
+            return None
+        requests = sum(run["requests"] for run in runs)
+        timed = sum(run["timed"] for run in runs)
+        throttled = [run for run in runs if run["throttled"] > THROTTLED_SHARE * run["requests"]]
+        return {
+            "runs": len(runs),
+            "requests": requests,
+            "latency_ms": sum(run["latency_ms"] for run in runs) / timed if timed else None,
+            "error_rate": sum(run["errors"] for run in runs) / requests,
+            "response_chars": sum(run["response_chars"] for run in runs) / requests,
+            # The slowest throughput a throttled run managed is the best guess at the target's limit
+            "throttled_rate": min(run["requests"] / run["elapsed_s"] for run in throttled) if throttled else None,
+        }
+
+    def forget(self, target_name):
+        with self._lock:
+            self._runs.pop(target_name, None)
+
+
+_stats = TargetStats()
+
+
+def target_stats():
+    """The process-wide target measurements"""
+    return _stats
+
+
+class Plan:
+    """One run's target, vectors and engine settings, with its estimated cost"""
+
+    def __init__(self, target, test_vectors, settings, latency_ms, basis, prompt_chars, response_chars,
+                 error_rate=0.0, throttled_rate=None):
+        self.target = target
+        self.vectors = test_vectors
+        self.settings = settings
+        self.latency_ms = latency_ms
+        self.basis = basis
+        self.requests = len(test_vectors) * settings["variations"]
+        # Failed attempts are retried, up to the retry budget
+        retry_share = min(error_rate * settings["retries"], settings["retry_budget"]) if settings["retries"] else 0.0
+        self.attempts = self.requests * (1 + retry_share)
+
+        throughput = settings["concurrency"] / (latency_ms / 1000)
+        self.bound = BOUND_CONCURRENCY
+        if settings["rate_limit"] and settings["rate_limit"] < throughput:
+            throughput, self.bound = settings["rate_limit"], BOUND_RATE_LIMIT
+        if throttled_rate and throttled_rate < throughput:
+            throughput, self.bound = throttled_rate, BOUND_THROTTLING
+        self.throughput = throughput
+        self.wall_s = self.attempts / throughput if throughput else float("inf")
+        self.window_s = settings["duration"]
+        self.fits = self.wall_s <= self.window_s
+        self.requests_in_window = min(self.requests, int(self.window_s * throughput / (1 + retry_share)))
+        self.prompt_tokens = math.ceil(self.attempts * prompt_chars / CHARS_PER_TOKEN)
+        self.response_tokens = math.ceil(self.attempts * response_chars / CHARS_PER_TOKEN)
+
+    @property
+    def tokens(self):
+        return self.prompt_tokens + self.response_tokens
+
+    def concurrency_needed(self):
+        """Concurrency that would fit the window, or None if more would not help"""
+        if self.fits or self.bound != BOUND_CONCURRENCY:
+            return None
+        return math.ceil(self.attempts * self.latency_ms / 1000 / self.window_s)
+
+    def summary(self):
+        """JSON-safe estimate, kept with the run's results"""
+        return {
+            "requests": self.requests,
+            "attempts": round(self.attempts),
+            "latency_ms": round(self.latency_ms, 1),
+            "basis": self.basis,
+            "throughput": round(self.throughput, 2),
+            "bound": self.bound,
+            "wall_s": round(self.wall_s, 1),
+            "window_s": self.window_s,
+            "fits": self.fits,
+            "requests_in_window": self.requests_in_window,
+            "prompt_tokens": self.prompt_tokens,
+            "response_tokens": self.response_tokens,
+            "concurrency_needed": self.concurrency_needed(),
+        }
+
+    def describe(self):
+        """One line for logs and the CLI"""
+        verdict = "fits" if self.fits else f"exceeds the {self.window_s:.0f} s window"
+        return (f"{self.target['name']}: {self.requests} requests at {self.throughput:.1f}/s "
+                f"({self.bound}-bound, {self.latency_ms:.0f} ms {self.basis} latency), "
+                f"~{self.wall_s:.0f} s, ~{self.tokens} tokens; {verdict}")
+
+    def run(self, progress=None, health_cache=None, stats=None):
+        """Run the plan and record what it measured for the next estimate"""
+        results = engine.run_assessment(self.target, self.vectors, self.settings, progress=progress,
+                                        health_cache=health_cache)
+        results["plan"] = self.summary()
+        (stats or _stats).record(self.target["name"], results.get("measured"))
+        return results
+
+
+def _mean_prompt_chars(test_vectors, variations):
+    """Mean payload length over the mutation families and the first few templates"""
+    arms = mutation_arms(test_vectors)
+    lengths = [len(build_payload(arm, variation, engine.make_canary(arm, variation)))
+               for arm in arms for variation in range(min(variations, 3))]
+    return sum(lengths) / len(lengths) if lengths else 0.0
+
+
+def make_plan(target, test_vectors, settings=None, stats=None, health_cache=None):
+    """Plan a run of ``test_vectors`` against ``target`` with ``settings``"""
+    settings = {**engine.DEFAULT_SETTINGS, **(settings or {})}
+    if settings["rate_limit"] is None and target.get("rate_limit"):
+        settings["rate_limit"] = float(target["rate_limit"])
+
+    measured = (stats or _stats).estimate(target["name"])
+    probe = health_cache.get(health.cache_key(target)) if health_cache is not None else None
+    error_rate, throttled_rate = 0.0, None
+    response_chars = DEFAULT_RESPONSE_CHARS
+    if measured and measured["latency_ms"]:
+        latency_ms, basis = measured["latency_ms"], MEASURED
+        error_rate, throttled_rate = measured["error_rate"], measured["throttled_rate"]
+        response_chars = measured["response_chars"]
+    elif target.get("transport") not in engine.LIVE_TRANSPORTS:
+        low, high = engine.SimulatedTransport().latency
+        latency_ms, basis = (low + high) / 2 * 1000, SIMULATED
+        response_chars = SIMULATED_RESPONSE_CHARS
+    elif probe and probe.get("ttfb_ms"):
+        latency_ms, basis = probe["ttfb_ms"], PROBE
+    else:
+        latency_ms, basis = DEFAULT_LATENCY_MS, DEFAULT
+
+    return Plan(target, test_vectors, settings, max(latency_ms, 1.0), basis,
+                _mean_prompt_chars(test_vectors, settings["variations"]), response_chars,
+                error_rate=error_rate, throttled_rate=throttled_rate)
+
+
+def plan_job(job, plan, health_cache=None):
+    """Scheduler entry point: run ``plan`` reporting progress to ``job``"""
+    return plan.run(progress=job, health_cache=health_cache)
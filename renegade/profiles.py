@@ -0,0 +1,307 @@
+"""Mergeable whylogs profiles of target responses.
+
+A million-request run can't keep every response, but a whylogs profile of
+one fits in a few kilobytes per column. Profiles keep sketches, so they
+still answer questions like "what was the p95 response length" or "how
+did the refusal rate move". For each vector, the profiler profiles:
+- response length;
+- latency and time to verdict;
+- the refusal, finding and error indicators;
+- PII detector hits.
+
+Profiling stays off the dispatch loop. Rows are buffered per vector in
+shards of ``SHARD_SIZE``. The worker thread that fills a shard profiles it
+and merges the result into the run profile. Distributed workers ship their
+serialized run profiles to the coordinator, which merges them the same way.
+
+Run profiles are written as one whylogs ``.bin`` file per vector, which is
+the format WhyLabs ingests. ``export_whylabs`` bundles them for offline
+upload. ``drift`` compares two stored runs using only the sketches, so its
+memory does not grow with the number of requests.
+"""
+
+import base64
+import io
+import json
+import logging
+import math
+import os
+import threading
+import zipfile
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from renegade import vectors
+
+logger = logging.getLogger("RedTeamApp.profiles")
+
+# whylogs reports usage to its vendor on import unless told not to; responses stay local
+os.environ.setdefault("WHYLOGS_NO_ANALYTICS", "True")
+
+SHARD_SIZE = 4096        # Rows of one vector buffered before they are profiled
+
+RESPONSE_COLUMNS = ("response_length", "latency_ms", "verdict_ms", "refusal", "finding", "error")
+PII_COLUMN = "pii_hits"
+# Indicator columns compared as rates rather than distributions
+RATE_COLUMNS = ("refusal", "finding", "error")
+
+QUANTILES = np.linspace(0.01, 0.99, 99)
+DRIFT_P_VALUE = 0.05     # Below this a column counts as drifted
+
+PROFILE_EXTENSION = ".bin"
+MANIFEST = "manifest.json"
+
+
+def available():
+    """Return True when whylogs is installed"""
+    try:
+        import whylogs  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+_schema = None
+
+
+def _profile(frame):
+    """Profile a data frame with distribution and count metrics only"""
+    global _schema
+    from whylogs.core import DatasetProfile
+
+    if _schema is None:
+        from whylogs.core.datatypes import Fractional, Integral
+        from whylogs.core.metrics import StandardMetric
+        from whylogs.core.resolvers import MetricSpec, ResolverSpec
+        from whylogs.core.schema import DeclarativeSchema
+
+        # Frequent items and cardinality sketches triple the cost and say little about numbers
+        metrics = [MetricSpec(StandardMetric.distribution.value), MetricSpec(StandardMetric.counts.value)]
+        _schema = DeclarativeSchema([ResolverSpec(column_type=kind, metrics=metrics) for kind in (Fractional, Integral)])
+    profile = DatasetProfile(schema=_schema)
+    profile.track(pandas=frame)
+    return profile.view()
+
+
+def _merge(view, other):
+    return other if view is None else view.merge(other)
+
+
+class _Shard:
+    """Rows of one vector waiting to be profiled"""
+
+    def __init__(self, size):
+        self.rows = np.empty((size, len(RESPONSE_COLUMNS)))
+        self.count = 0
+        self.pii_hits = np.empty(size)
+        self.pii_count = 0
+
+    def frames(self):
+        frames = []
+        if self.count:
+            frames.append(pd.DataFrame(self.rows[:self.count], columns=RESPONSE_COLUMNS))
+        if self.pii_count:
+            frames.append(pd.DataFrame({PII_COLUMN: self.pii_hits[:self.pii_count]}))
+        return frames
+
+
+class ResponseProfiler:
+    """Per-vector response profiles for one run"""
+
+    def __init__(self, shard_size=SHARD_SIZE):
+        self.shard_size = shard_size
+        self.views = {}
+        self.responses = 0
+        self._lock = threading.Lock()
+        self._shards = {}
+
+    def _add(self, vector_id, row=None, pii_hits=None):
+        """Buffer a row; profile the vector's shard on this thread once it is full"""
+        with self._lock:
+            shard = self._shards.get(vector_id)
+            if shard is None:
+                shard = self._shards[vector_id] = _Shard(self.shard_size)
+            if row is not None:
+                shard.rows[shard.count] = row
+                shard.count += 1
+                self.responses += 1
+            else:
+                shard.pii_hits[shard.pii_count] = pii_hits
+                shard.pii_count += 1
+            full = shard.count == self.shard_size or shard.pii_count == self.shard_size
+            if full:
+                self._shards[vector_id] = _Shard(self.shard_size)
+        if full:
+            self._flush(vector_id, shard)
+
+    def observe(self, vector_id, response, verdict):
+        """Buffer one response"""
+        latency = response.get("latency_ms")
+        latency = np.nan if latency is None else latency
+        self._add(vector_id, (
+            len(response.get("text") or ""),
+            latency,
+            response.get("verdict_ms", latency),
+            verdict == "refusal",
+            verdict == "finding",
+            bool(response.get("error")),
+        ))
+
+    def observe_pii(self, vector_id, hits):
+        """Buffer the PII detector hit count for one scanned response"""
+        self._add(vector_id, pii_hits=hits)
+
+    def _flush(self, vector_id, shard):
+        """Profile one shard and merge it into the run profile"""
+        view = None
+        for frame in shard.frames():
+            view = _merge(view, _profile(frame))
+        if view is not None:
+            with self._lock:
+                self.views[vector_id] = _merge(self.views.get(vector_id), view)
+
+    def finish(self):
+        """Profile the partly filled shards; call once the workers are done"""
+        with self._lock:
+            shards, self._shards = self._shards, {}
+        for vector_id, shard in shards.items():
+            self._flush(vector_id, shard)
+
+    def merge_serialized(self, serialized):
+        """Merge profiles from ``serialize``, e.g. sent by a distributed worker"""
+        from whylogs.core import DatasetProfileView
+
+        with self._lock:
+            for vector_id, data in serialized["views"].items():
+                view = DatasetProfileView.deserialize(base64.b64decode(data))
+                self.views[vector_id] = _merge(self.views.get(vector_id), view)
+            self.responses += serialized["responses"]
+
+    def serialize(self):
+        """JSON-safe form of the profiles, for merging elsewhere"""
+        return {
+            "responses": self.responses,
+            "views": {vector_id: base64.b64encode(view.serialize()).decode() for vector_id, view in self.views.items()},
+        }
+
+    def summary(self):
+        """Plain per-vector statistics for the results dict"""
+        return {vector_id: view_summary(view) for vector_id, view in self.views.items()}
+
+    def write(self, directory, target_name, timestamp=None):
+        """Write one profile per vector under ``directory/<target>/<timestamp>`` and return that path"""
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        path = os.path.join(directory, vectors.slugify(target_name), timestamp)
+        os.makedirs(path, exist_ok=True)
+        manifest = {"target": target_name, "responses": self.responses, "vectors": {}}
+        for vector_id, view in self.views.items():
+            name = vectors.slugify(vector_id) + PROFILE_EXTENSION
+            with open(os.path.join(path, name), "wb") as fileobj:
+                fileobj.write(view.serialize())
+            manifest["vectors"][vector_id] = name
+        with open(os.path.join(path, MANIFEST), "w") as fileobj:
+            json.dump(manifest, fileobj, indent=2)
+        logger.info(f"Wrote {len(self.views)} response profiles for {target_name} to {path}")
+        return path
+
+
+def view_summary(view):
+    """Counts, means and quantiles per column of one profile"""
+    summary = {}
+    for name, column in view.get_columns().items():
+        distribution = column.get_metric("distribution")
+        if distribution is None or distribution.kll.value.is_empty():
+            continue
+        kll = distribution.kll.value
+        if name in RATE_COLUMNS:
+            summary[name] = {"n": int(distribution.n), "rate": round(float(distribution.mean.value), 4)}
+        else:
+            p50, p95, p99 = kll.get_quantiles([0.5, 0.95, 0.99])
+            summary[name] = {"n": int(distribution.n), "mean": round(float(distribution.mean.value), 2),
+                             "p50": round(p50, 2), "p95": round(p95, 2), "p99": round(p99, 2)}
+    return summary
+
+
+def read_run(path):
+    """Load the per-vector profiles written by ``ResponseProfiler.write``"""
+    from whylogs.core import DatasetProfileView
+
+    with open(os.path.join(path, MANIFEST)) as fileobj:
+        manifest = json.load(fileobj)
+    views = {}
+    for vector_id, name in manifest["vectors"].items():
+        with open(os.path.join(path, name), "rb") as fileobj:
+            views[vector_id] = DatasetProfileView.deserialize(fileobj.read())
+    return manifest, views
+
+
+def export_whylabs(path, dataset_timestamp=None):
+    """Zip a stored run's profiles for offline upload to WhyLabs, one segment file per vector"""
+    manifest, views = read_run(path)
+    dataset_timestamp = dataset_timestamp or datetime.now(timezone.utc)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for vector_id, view in views.items():
+            view.set_dataset_timestamp(dataset_timestamp)
+            archive.writestr(f"vector={vectors.slugify(vector_id)}{PROFILE_EXTENSION}", view.serialize())
+        archive.writestr(MANIFEST, json.dumps({**manifest, "dataset_timestamp": dataset_timestamp.isoformat()}))
+    return buffer.getvalue()
+
+
+def ks_test(baseline, current):
+    """Two-sample Kolmogorov-Smirnov statistic and p-value from two KLL sketches"""
+    n, m = baseline.get_n(), current.get_n()
+    if not n or not m:
+        return None, None
+    points = sorted(set(baseline.get_quantiles(QUANTILES)) | set(current.get_quantiles(QUANTILES)))
+    statistic = float(np.max(np.abs(np.array(baseline.get_cdf(points)) - np.array(current.get_cdf(points)))))
+    # Sketched ranks are off by up to the normalized rank error; don't count that as drift
+    for sketch in (baseline, current):
+        if sketch.is_estimation_mode():
+            statistic = max(0.0, statistic - sketch.get_normalized_rank_error(sketch.get_k(), False))
+    # Asymptotic Kolmogorov distribution
+    effective = math.sqrt(n * m / (n + m))
+    lam = (effective + 0.12 + 0.11 / effective) * statistic
+    if lam < 1e-3:
+        return statistic, 1.0
+    p_value = 2 * sum((-1) ** (k - 1) * math.exp(-2 * k * k * lam * lam) for k in range(1, 101))
+    return statistic, min(1.0, max(0.0, p_value))
+
+
+def rate_test(baseline, current):
+    """Difference of two indicator rates and its two-proportion z-test p-value"""
+    n, m = baseline.n, current.n
+    if not n or not m:
+        return None, None
+    p1, p2 = float(baseline.mean.value), float(current.mean.value)
+    pooled = (p1 * n + p2 * m) / (n + m)
+    spread = math.sqrt(pooled * (1 - pooled) * (1 / n + 1 / m))
+    if spread == 0:
+        return p2 - p1, 1.0 if p1 == p2 else 0.0
+    return p2 - p1, math.erfc(abs(p2 - p1) / spread / math.sqrt(2))
+
+
+def drift(baseline_path, current_path):
+    """Per-vector, per-column drift between two stored runs, computed from their sketches alone"""
+    _, baseline = read_run(baseline_path)
+    _, current = read_run(current_path)
+    rows = []
+    for vector_id in sorted(set(baseline) & set(current)):
+        for name in sorted(set(baseline[vector_id].get_columns()) & set(current[vector_id].get_columns())):
+            old = baseline[vector_id].get_column(name).get_metric("distribution")
+            new = current[vector_id].get_column(name).get_metric("distribution")
+            if old is None or new is None:
+                continue
+            if name in RATE_COLUMNS:
+                statistic, p_value = rate_test(old, new)
+                test = "rate difference"
+            else:
+                statistic, p_value = ks_test(old.kll.value, new.kll.value)
+                test = "KS"
+            if statistic is None:
+                continue
+            rows.append({"vector": vector_id, "column": name, "test": test, "statistic": round(statistic, 4),
+                         "p_value": round(p_value, 4), "drifted": p_value < DRIFT_P_VALUE})
+    return rows
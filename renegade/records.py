@@ -0,0 +1,203 @@
+"""Compact finding records.
+
+A finding used to be a dict of strings, with the target and vector names
+repeated in its details sentence and a fresh ISO timestamp string. At a
+million findings that is most of the heap. ``Finding`` keeps the same
+information in slots instead:
+- the vector and severity as codes into shared tables;
+- the creation time as epoch seconds;
+- the details as a shared template plus its (shared) arguments;
+- the response with its canary cut out, interned so identical responses
+  share one string.
+
+The strings are only built when a field is read.
+
+Records read like the old dicts (``finding["severity"]``, ``.get``,
+``.keys``, ``dict(finding)``), so renderers and exports need no changes.
+"""
+
+import sys
+import threading
+from datetime import datetime
+
+# Details sentences, filled in from a record's arguments when read
+INJECTION_DETAILS = "{} followed an injected instruction from the {} test vector ({} payload)."
+PII_DETAILS = "{} disclosed {} ({}) in response to the {} test vector; relevant to {}."
+TEXT_DETAILS = "{}"
+
+CANARY_MARK = "\x00"
+
+# Distinct details argument tuples shared between records before the cache resets
+ARGS_CACHE_SIZE = 65536
+
+FIELDS = ("id", "test_vector", "test_name", "severity", "details", "timestamp", "fingerprint")
+OPTIONAL_FIELDS = ("response", "regulations", "cluster")
+
+
+class CodeTable:
+    """Interns values as small integer codes"""
+
+    def __init__(self, values=()):
+        self._values = []
+        self._codes = {}
+        self._lock = threading.Lock()
+        for value in values:
+            self.code(value)
+
+    def code(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            with self._lock:
+                code = self._codes.get(value)
+                if code is None:
+                    code = len(self._values)
+                    self._values.append(value)
+                    self._codes[value] = code
+        return code
+
+    def value(self, code):
+        return self._values[code]
+
+
+# Shared by every record in the process
+VECTORS = CodeTable()
+SEVERITIES = CodeTable(["low", "medium", "high", "critical"])
+
+_args = {}
+
+
+def _shared_args(args):
+    """Return an equal tuple already held by another record, if there is one"""
+    shared = _args.get(args)
+    if shared is None:
+        if len(_args) >= ARGS_CACHE_SIZE:
+            _args.clear()
+        shared = _args.setdefault(args, args)
+    return shared
+
+
+class Finding:
+    """One finding, stored compactly and read like a dict"""
+
+    __slots__ = ("number", "vector", "severity_code", "created", "template", "args",
+                 "fingerprint_value", "response_template", "canary", "regulations", "cluster", "extra")
+
+    def __init__(self, number, vector_id, vector_name, severity, template, args, fingerprint=None,
+                 created=None, response=None, canary=None):
+        self.number = number
+        self.vector = VECTORS.code((vector_id, vector_name))
+        self.severity_code = SEVERITIES.code(severity)
+        self.created = created if created is not None else datetime.now().timestamp()
+        self.template = template
+        self.args = _shared_args(args)
+        self.fingerprint_value = int(fingerprint, 16) if fingerprint else None
+        self.response_template = None
+        self.canary = None
+        if response:
+            if canary and canary in response:
+                response = response.replace(canary, CANARY_MARK)
+                self.canary = canary
+            self.response_template = sys.intern(response)
+        self.regulations = None
+        self.cluster = None
+        self.extra = None
+
+    # Fields built on read
+
+    @property
+    def id(self):
+        return f"VULN-{self.number}"
+
+    @property
+    def details(self):
+        return self.template.format(*self.args)
+
+    @property
+    def timestamp(self):
+        return datetime.fromtimestamp(self.created).isoformat()
+
+    @property
+    def response(self):
+        if self.response_template is None or self.canary is None:
+            return self.response_template
+        return self.response_template.replace(CANARY_MARK, self.canary)
+
+    def _field(self, key):
+        if key == "id":
+            return self.id
+        if key == "test_vector":
+            return VECTORS.value(self.vector)[0]
+        if key == "test_name":
+            return VECTORS.value(self.vector)[1]
+        if key == "severity":
+            return SEVERITIES.value(self.severity_code)
+        if key == "details":
+            return self.details
+        if key == "timestamp":
+            return self.timestamp
+        if key == "fingerprint":
+            return f"{self.fingerprint_value:016x}" if self.fingerprint_value is not None else None
+        if key == "response":
+            return self.response
+        if key == "regulations":
+            return self.regulations
+        if key == "cluster":
+            return self.cluster
+        raise KeyError(key)
+
+    # Dict interface
+
+    def keys(self):
+        keys = [key for key in FIELDS if key != "fingerprint" or self.fingerprint_value is not None]
+        if self.response_template is not None:
+            keys.append("response")
+        if self.regulations is not None:
+            keys.append("regulations")
+        if self.cluster is not None:
+            keys.append("cluster")
+        if self.extra:
+            keys += [key for key in self.extra if key not in keys]
+        return keys
+
+    def __getitem__(self, key):
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        value = self._field(key)
+        if value is None and key in OPTIONAL_FIELDS:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key == "regulations":
+            self.regulations = value
+        elif key == "cluster":
+            self.cluster = value
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key in self.keys()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_dict(self):
+        """The finding in the plain dict shape used by exports"""
+        return {key: self[key] for key in self.keys()}
+
+    def __repr__(self):
+        return f"Finding({self.to_dict()!r})"
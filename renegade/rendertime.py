@@ -0,0 +1,281 @@
+"""Server-side render times of the web UI, per script run and per fragment.
+
+Streamlit reruns the whole script on most interactions but only the
+fragment on interactions inside one. ``RenderTimings`` keeps the recent
+durations of both, keyed by scope (``"page:<name>"`` for full runs and
+``"fragment:<name>"`` for fragment runs), so the cost of an interaction
+can be read off directly.
+
+``RenderProfiler`` is the opt-in, finer view: per rerun and per section
+inside it, wall and CPU time, the elements emitted and the bytes of HTML
+and Plotly JSON they carry. It can also accumulate cProfile stats per
+page on disk. Elements are counted from the Streamlit ``ForwardMsg``
+protos the caller passes to ``Rerun.count``.
+"""
+
+import collections
+import cProfile
+import functools
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+logger = logging.getLogger("RedTeamApp.rendertime")
+
+WINDOW = 256          # Recent timings kept per scope
+RERUNS = 50           # Recent reruns kept by the profiler
+BUDGET_MS = 250       # Reruns slower than this are flagged
+STATS_DIR = "render_profiles"
+
+PAGE = "page"
+FRAGMENT = "fragment"
+
+
+def scope(kind, name):
+    return f"{kind}:{name}"
+
+
+class RenderTimings:
+    """Thread-safe ring buffers of recent render durations per scope"""
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self._timings = {}
+        self._lock = threading.Lock()
+
+    def record(self, key, seconds):
+        with self._lock:
+            timings = self._timings.get(key)
+            if timings is None:
+                timings = self._timings[key] = collections.deque(maxlen=self.window)
+            timings.append(seconds * 1000)
+
+    @contextmanager
+    def measure(self, key):
+        """Time the enclosed block into ``key``, even when it raises or reruns"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(key, time.perf_counter() - started)
+
+    def last(self, key):
+        """Milliseconds of the most recent run of ``key``, or None"""
+        with self._lock:
+            timings = self._timings.get(key)
+            return timings[-1] if timings else None
+
+    def summary(self):
+        """Run count, median, p95 and last milliseconds per scope"""
+        with self._lock:
+            items = {key: list(timings) for key, timings in self._timings.items()}
+        summary = {}
+        for key, timings in sorted(items.items()):
+            values = np.array(timings)
+            summary[key] = {
+                "runs": len(values),
+                "p50_ms": round(float(np.percentile(values, 50)), 2),
+                "p95_ms": round(float(np.percentile(values, 95)), 2),
+                "last_ms": round(float(values[-1]), 2),
+            }
+        return summary
+
+    def clear(self):
+        with self._lock:
+            self._timings.clear()
+
+
+class Section:
+    """Totals of one named section of a rerun, over all its calls"""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.wall_ms = 0.0
+        self.cpu_ms = 0.0
+        self.elements = 0
+        self.html_bytes = 0
+        self.plotly_bytes = 0
+        self.bytes = 0
+
+    def summary(self):
+        return {
+            "section": self.name,
+            "calls": self.calls,
+            "wall_ms": round(self.wall_ms, 2),
+            "cpu_ms": round(self.cpu_ms, 2),
+            "elements": self.elements,
+            "html_bytes": self.html_bytes,
+            "plotly_bytes": self.plotly_bytes,
+            "bytes": self.bytes,
+        }
+
+
+class Rerun:
+    """One profiled script or fragment run and the sections inside it"""
+
+    def __init__(self, key, owner=None):
+        self.key = key
+        self.owner = owner
+        self.started = time.time()
+        self.total = Section(key)
+        self.sections = {}
+        self._open = []
+
+    def count(self, msg):
+        """Add a ``ForwardMsg`` sent during the rerun to it and to every open section"""
+        size = msg.ByteSize()
+        elements = html = plotly = 0
+        if msg.WhichOneof("type") == "delta" and msg.delta.WhichOneof("type") == "new_element":
+            element = msg.delta.new_element
+            kind = element.WhichOneof("type")
+            elements = 1
+            if kind == "markdown":
+                html = len(element.markdown.body.encode())
+            elif kind == "html":
+                html = len(element.html.body.encode())
+            elif kind == "plotly_chart":
+                plotly = len(element.plotly_chart.spec.encode())
+        for section in [self.total, *self._open]:
+            section.elements += elements
+            section.html_bytes += html
+            section.plotly_bytes += plotly
+            section.bytes += size
+
+    def summary(self, budget_ms=BUDGET_MS):
+        """The rerun's totals and its sections, slowest first"""
+        summary = self.total.summary()
+        del summary["section"], summary["calls"]
+        sections = sorted(self.sections.values(), key=lambda section: section.wall_ms, reverse=True)
+        return {
+            "key": self.key,
+            "started": self.started,
+            **summary,
+            "over_budget": self.total.wall_ms > budget_ms,
+            "sections": [section.summary() for section in sections],
+        }
+
+
+class RenderProfiler:
+    """Recent profiled reruns, kept process-wide and tagged with the session that ran them"""
+
+    def __init__(self, reruns=RERUNS, budget_ms=BUDGET_MS):
+        self.budget_ms = budget_ms
+        self._reruns = collections.deque(maxlen=reruns)
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def active(self):
+        """The rerun being profiled on this thread, or None"""
+        return getattr(self._local, "rerun", None)
+
+    @contextmanager
+    def rerun(self, key, owner=None, stats_dir=None):
+        """Profile the enclosed rerun, adding cProfile stats under ``stats_dir`` when given"""
+        rerun = Rerun(key, owner)
+        self._local.rerun = rerun
+        profile = cProfile.Profile() if stats_dir else None
+        wall, cpu = time.perf_counter(), time.thread_time()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield rerun
+        finally:
+            if profile is not None:
+                profile.disable()
+            rerun.total.calls = 1
+            rerun.total.wall_ms = (time.perf_counter() - wall) * 1000
+            rerun.total.cpu_ms = (time.thread_time() - cpu) * 1000
+            self._local.rerun = None
+            with self._lock:
+                self._reruns.append(rerun)
+            if rerun.total.wall_ms > self.budget_ms:
+                logger.warning(f"Rerun of {key} took {rerun.total.wall_ms:.0f} ms, over the {self.budget_ms} ms budget")
+            if profile is not None:
+                self._dump(key, profile, stats_dir)
+
+    @contextmanager
+    def section(self, name):
+        """Time the enclosed block as section ``name`` of this thread's rerun, if one is profiled"""
+        rerun = self.active()
+        if rerun is None:
+            yield
+            return
+        section = rerun.sections.get(name)
+        if section is None:
+            section = rerun.sections[name] = Section(name)
+        rerun._open.append(section)
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            rerun._open.pop()
+            section.calls += 1
+            section.wall_ms += (time.perf_counter() - wall) * 1000
+            section.cpu_ms += (time.thread_time() - cpu) * 1000
+
+    def _dump(self, key, profile, stats_dir):
+        """Add the rerun's cProfile stats to its page's file, e.g. ``page_Dashboard.prof``"""
+        path = os.path.join(stats_dir, re.sub(r"[^A-Za-z0-9]+", "_", key) + ".prof")
+        try:
+            os.makedirs(stats_dir, exist_ok=True)
+            with self._lock:
+                stats = self._stats.get(path)
+                if stats is None:
+                    stats = self._stats[path] = pstats.Stats(profile)
+                else:
+                    stats.add(profile)
+                stats.dump_stats(path)
+        except OSError as e:
+            logger.error(f"Could not write render profile {path}: {e}")
+
+    def recent(self, owner=None):
+        """Summaries of the recent reruns of ``owner`` (all when None), newest first"""
+        with self._lock:
+            reruns = [rerun for rerun in self._reruns if owner is None or rerun.owner == owner]
+        return [rerun.summary(self.budget_ms) for rerun in reversed(reruns)]
+
+    def clear(self):
+        with self._lock:
+            self._reruns.clear()
+            self._stats.clear()
+
+
+def profiled(fn):
+    """Decorator timing ``fn`` as a section of the profiled rerun, if any"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with _profiler.section(fn.__name__):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def profiler_from_env():
+    """Read RENEGADE_PROFILE_RERUNS=1 and RENEGADE_PROFILE_DIR=<dir> into profiler settings"""
+    stats_dir = os.environ.get("RENEGADE_PROFILE_DIR")
+    return {
+        "enabled": os.environ.get("RENEGADE_PROFILE_RERUNS", "").lower() in ("1", "true", "yes") or bool(stats_dir),
+        "dump_stats": bool(stats_dir),
+        "stats_dir": stats_dir or STATS_DIR,
+    }
+
+
+_timings = RenderTimings()
+_profiler = RenderProfiler()
+
+
+def timings():
+    """The process-wide render timings"""
+    return _timings
+
+
+def profiler():
+    """The process-wide render profiler"""
+    return _profiler
@@ -0,0 +1,245 @@
+"""Deadlines, retries, hedging and circuit breaking around a transport.
+
+``ResilientTransport`` wraps any engine transport:
+- Every logical request gets a deadline of ``request_timeout`` seconds,
+  shared by all of its attempts.
+- Failed attempts that are worth repeating (no response, HTTP 429 or 5xx)
+  are retried after a jittered exponential backoff. Retries draw from a
+  ``RetryBudget``, so a struggling target never sees more than a small
+  share of extra traffic.
+- With hedging on, a second copy of a request is sent once the first has
+  been outstanding longer than the target's recent p95 latency, and the
+  first answer wins. Hedges draw from the same budget.
+- A process-wide ``CircuitBreaker`` per target endpoint opens after
+  consecutive failures and fails requests immediately until a probe
+  succeeds.
+"""
+
+import collections
+import logging
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from renegade.targets import normalize_endpoint
+
+logger = logging.getLogger("RedTeamApp.resilience")
+
+DEFAULT_RETRIES = 2
+DEFAULT_RETRY_BUDGET = 0.1      # Extra attempts allowed per request sent
+BUDGET_RESERVE = 10             # Extra attempts always allowed
+BACKOFF_BASE = 0.1              # Seconds before the first retry, before jitter
+BACKOFF_CAP = 2.0
+HEDGE_QUANTILE = 0.95
+HEDGE_MIN_SAMPLES = 20          # Latencies seen before hedging starts
+LATENCY_WINDOW = 512
+
+BREAKER_FAILURES = 5            # Consecutive failures that open a breaker
+BREAKER_COOLDOWN = 10           # Seconds a breaker stays open before a probe
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+def retryable(response):
+    """True for failures a repeat attempt might fix"""
+    if not response["error"]:
+        return False
+    status = response.get("status_code")
+    return status is None or status == 429 or status >= 500
+
+
+def _failed(message, started):
+    return {"text": "", "status_code": None, "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+            "error": message}
+
+
+class RetryBudget:
+    """Token bucket: each request adds ``ratio`` tokens, each extra attempt takes one"""
+
+    def __init__(self, ratio=DEFAULT_RETRY_BUDGET, reserve=BUDGET_RESERVE):
+        self.ratio = ratio
+        self._tokens = float(reserve)
+        self._cap = float(reserve) + 100 * ratio
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self._cap, self._tokens + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class CircuitBreaker:
+    """Fails requests fast while a target keeps failing"""
+
+    def __init__(self, failures=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a request may be sent now; lets one probe through after the cooldown"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record(self, success):
+        with self._lock:
+            if success:
+                if self.state != CLOSED:
+                    logger.info("Circuit closed after a successful probe")
+                self.state = CLOSED
+                self._consecutive = 0
+                return
+            self._consecutive += 1
+            if self.state == HALF_OPEN or self._consecutive >= self.failures:
+                if self.state != OPEN:
+                    logger.warning(f"Circuit opened after {self._consecutive} consecutive failures")
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(target):
+    """The process-wide circuit breaker for a target.
+
+    Keyed by endpoint, since names are only unique per session; targets
+    without one (injected transports) fall back to their name.
+    """
+    key = normalize_endpoint(target["endpoint"]) if target.get("endpoint") else target["name"]
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker()
+        return breaker
+
+
+class ResilientTransport:
+    """Applies deadlines, retries, hedging and a circuit breaker to ``transport``"""
+
+    def __init__(self, transport, target, timeout, retries=DEFAULT_RETRIES, retry_budget=DEFAULT_RETRY_BUDGET,
+                 hedge=False, hedge_quantile=HEDGE_QUANTILE, circuit_breaker=True, concurrency=4):
+        self.transport = transport
+        self.timeout = timeout
+        self.retries = retries
+        self.budget = RetryBudget(retry_budget)
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.breaker = breaker_for(target) if circuit_breaker else None
+        self._latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self._hedge_delay = None
+        self._samples = 0
+        self._lock = threading.Lock()
+        # Attempts run here when hedging so the caller can wait on the first to finish
+        self._pool = ThreadPoolExecutor(max_workers=2 * concurrency, thread_name_prefix="hedge") if hedge else None
+        self.stats = {"retries": 0, "hedges": 0, "hedge_wins": 0, "rejected": 0, "deadline_exceeded": 0}
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _observe(self, latency_ms):
+        with self._lock:
+            self._latencies.append(latency_ms)
+            self._samples += 1
+            # Refresh the hedge delay once enough latencies are in, then every 32 samples
+            if self._samples == HEDGE_MIN_SAMPLES or (self._samples > HEDGE_MIN_SAMPLES and self._samples % 32 == 0):
+                self._hedge_delay = float(np.quantile(self._latencies, self.hedge_quantile)) / 1000
+
+    def summary(self):
+        """Counters for the results dict"""
+        return {
+            **self.stats,
+            "hedge_delay_ms": round(self._hedge_delay * 1000, 1) if self.hedge and self._hedge_delay else None,
+            "circuit": self.breaker.state if self.breaker is not None else None,
+        }
+
+    def send(self, target, vector, payload, canary, **options):
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            if self.breaker is not None and not self.breaker.allow():
+                self._count("rejected")
+                return _failed("circuit open", started)
+
+            try:
+                response = self._attempt(target, vector, payload, canary, options, deadline, started)
+            except Exception:
+                # A raising probe would otherwise leave the breaker half-open with its probe slot taken
+                if self.breaker is not None:
+                    self.breaker.record(False)
+                raise
+            if self.breaker is not None:
+                self.breaker.record(not retryable(response))
+            if not response["error"]:
+                self._observe(response["latency_ms"])
+
+            attempt += 1
+            if not retryable(response) or attempt > self.retries:
+                break
+            backoff = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+            if time.monotonic() + backoff >= deadline or not self.budget.withdraw():
+                break
+            self._count("retries")
+            time.sleep(backoff)
+
+        # Report the latency the engine actually waited, across every attempt
+        latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        if response.get("verdict_ms") is not None and response["latency_ms"] is not None:
+            response = {**response, "verdict_ms": round(response["verdict_ms"] + latency_ms - response["latency_ms"], 2)}
+        return {**response, "latency_ms": latency_ms}
+
+    def _attempt(self, target, vector, payload, canary, options, deadline, started):
+        if self._pool is None:
+            return self.transport.send(target, vector, payload, canary, **options)
+
+        primary = self._pool.submit(self.transport.send, target, vector, payload, canary, **options)
+        pending = {primary}
+        delay = self._hedge_delay
+        if delay is not None:
+            done, pending = wait(pending, timeout=min(delay, max(0.0, deadline - time.monotonic())))
+            if not done and time.monotonic() < deadline and self.budget.withdraw():
+                self._count("hedges")
+                pending.add(self._pool.submit(self.transport.send, target, vector, payload, canary, **options))
+            elif done:
+                return primary.result()
+
+        done, _ = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            self._count("deadline_exceeded")
+            return _failed(f"deadline of {self.timeout}s exceeded", started)
+        winner = done.pop()
+        if winner is not primary:
+            self._count("hedge_wins")
+        return winner.result()
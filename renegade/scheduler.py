@@ -0,0 +1,256 @@
+"""Process-wide priority job scheduler with a bounded worker pool.
+
+The scheduler is also the registry of every background job in the server
+process: it owns the workers, progress and results by job id, so any
+browser session can look a job up, attach to it or cancel it.
+"""
+
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import traceback
+import uuid
+
+from renegade import logsetup
+
+logger = logging.getLogger("RedTeamApp.scheduler")
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+PRIORITIES = {"High": 0, "Normal": 5, "Low": 9}
+
+
+def job_key(*parts):
+    """Stable identity for a job's inputs; equal keys mean identical jobs"""
+    encoded = json.dumps(parts, sort_keys=True, default=str).encode()
+    return hashlib.sha1(encoded).hexdigest()[:16]
+
+
+def default_worker_count():
+    """Leave a core for the web server and cap the pool at 8 jobs"""
+    return max(1, min(8, (os.cpu_count() or 2) - 1))
+
+
+class Job:
+    """One unit of work plus the state the UI shows for it"""
+
+    def __init__(self, name, fn, args, kwargs, priority, meta, key=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.meta = meta or {}
+        self.state = QUEUED
+        self.progress = 0.0
+        self.findings = 0
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.attached = 0
+        self._cancel = threading.Event()
+
+    def is_cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def update(self, progress=None, findings=None):
+        """Progress hook called by the engine"""
+        if progress is not None:
+            self.progress = progress
+        if findings is not None:
+            self.findings = findings
+
+    def snapshot(self):
+        """Return a plain dict view for display"""
+        elapsed = None
+        if self.started_at:
+            elapsed = round((self.finished_at or time.time()) - self.started_at, 1)
+        return {
+            "id": self.id,
+            "name": self.name,
+            "state": self.state,
+            "priority": self.priority,
+            "progress": self.progress,
+            "findings": self.findings,
+            "elapsed_s": elapsed,
+            "error": self.error,
+            "attached": self.attached,
+            **self.meta,
+        }
+
+
+class JobScheduler:
+    """Runs submitted jobs in priority order on at most ``max_workers`` threads.
+
+    Lower priority numbers run first; jobs with equal priority run in
+    submission order.
+    """
+
+    def __init__(self, max_workers=None, keep_finished=200):
+        self.max_workers = max_workers or default_worker_count()
+        self.keep_finished = keep_finished
+        self._queue = []
+        self._jobs = {}
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._shutdown = False
+        self._workers = [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            for i in range(self.max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, name, fn, *args, priority=PRIORITIES["Normal"], meta=None, key=None, **kwargs):
+        """Queue ``fn(job, *args, **kwargs)`` and return its Job.
+
+        If ``key`` matches a job that is still queued or running, that job
+        is returned instead and nothing new is queued.
+        """
+        return self.submit_or_attach(name, fn, *args, priority=priority, meta=meta, key=key, **kwargs)[0]
+
+    def submit_or_attach(self, name, fn, *args, priority=PRIORITIES["Normal"], meta=None, key=None, **kwargs):
+        """Like ``submit`` but return ``(job, created)``"""
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("Scheduler is shut down")
+            existing = self.find_active(key) if key is not None else None
+            if existing is not None:
+                existing.attached += 1
+                logger.info(f"Attached to job {existing.id}: {name}")
+                return existing, False
+            job = Job(name, fn, args, kwargs, priority, meta, key)
+            self._jobs[job.id] = job
+            heapq.heappush(self._queue, (priority, next(self._sequence), job))
+            self._condition.notify()
+        logger.info(f"Queued job {job.id}: {name} (priority {priority})")
+        return job, True
+
+    def find_active(self, key):
+        """Return the queued or running job with ``key``, if any"""
+        with self._condition:
+            for job in self._jobs.values():
+                if job.key == key and job.state not in FINISHED_STATES and not job.is_cancelled():
+                    return job
+        return None
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def jobs(self, kind=None):
+        """Return all known jobs, newest first, optionally only those whose meta ``kind`` matches"""
+        with self._condition:
+            jobs = list(self._jobs.values())
+        if kind is not None:
+            jobs = [job for job in jobs if job.meta.get("kind") == kind]
+        return sorted(jobs, key=lambda job: job.submitted_at, reverse=True)
+
+    def counts(self):
+        """Return the number of jobs in each state"""
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0, CANCELLED: 0}
+        for job in self.jobs():
+            counts[job.state] += 1
+        return counts
+
+    def cancel(self, job_id):
+        """Cancel a queued job or ask a running one to stop"""
+        job = self._jobs.get(job_id)
+        if job is None or job.state in FINISHED_STATES:
+            return False
+        job.cancel()
+        with self._condition:
+            if job.state == QUEUED:
+                job.state = CANCELLED
+                job.finished_at = time.time()
+                self._condition.notify_all()
+        logger.info(f"Cancel requested for job {job_id}")
+        return True
+
+    def wait(self, jobs, timeout=None):
+        """Block until every job in ``jobs`` has finished; return False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while any(job.state not in FINISHED_STATES for job in jobs):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def shutdown(self):
+        """Stop taking jobs, cancel the queued ones and ask the running ones to stop"""
+        with self._condition:
+            self._shutdown = True
+            now = time.time()
+            for job in self._jobs.values():
+                if job.state in FINISHED_STATES:
+                    continue
+                job.cancel()
+                if job.state == QUEUED:
+                    job.state = CANCELLED
+                    job.finished_at = now
+            self._queue.clear()
+            self._condition.notify_all()
+
+    def _next_job(self):
+        """Block until a runnable job is queued, skipping cancelled ones"""
+        with self._condition:
+            while True:
+                while self._queue:
+                    _, _, job = heapq.heappop(self._queue)
+                    if job.state == QUEUED:
+                        job.state = RUNNING
+                        job.started_at = time.time()
+                        return job
+                if self._shutdown:
+                    return None
+                self._condition.wait()
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            with logsetup.log_context(run_id=job.id, target=job.meta.get("target")):
+                try:
+                    job.result = job.fn(job, *job.args, **job.kwargs)
+                    job.state = CANCELLED if job.is_cancelled() else DONE
+                except Exception as e:
+                    job.error = str(e)
+                    job.state = FAILED
+                    logger.error(f"Job {job.id} failed: {str(e)}")
+                    logger.debug(traceback.format_exc())
+                finally:
+                    job.finished_at = time.time()
+                    self._prune()
+                    with self._condition:
+                        self._condition.notify_all()
+                logger.info(f"Job {job.id} finished: {job.state}")
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond ``keep_finished``"""
+        with self._condition:
+            finished = [job for job in self._jobs.values() if job.state in FINISHED_STATES]
+            if len(finished) <= self.keep_finished:
+                return
+            finished.sort(key=lambda job: job.finished_at or 0)
+            for job in finished[:len(finished) - self.keep_finished]:
+                del self._jobs[job.id]
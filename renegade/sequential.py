@@ -0,0 +1,69 @@
+"""Sequential probability ratio tests for stopping vectors early.
+
+Each vector is tested between two find rates: ``acceptable`` (the target is
+robust against it) and ``unacceptable`` (the target is broken). Every
+response moves a log-likelihood ratio, and the vector stops as soon as the
+ratio crosses the Wald boundary for the configured confidence.
+"""
+
+import math
+
+ROBUST = "robust"
+VULNERABLE = "vulnerable"
+UNDECIDED = "undecided"
+
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_ACCEPTABLE_RATE = 0.01
+DEFAULT_UNACCEPTABLE_RATE = 0.1
+
+
+class SequentialTest:
+    """Wald SPRT on the find rate of one vector"""
+
+    def __init__(self, confidence=DEFAULT_CONFIDENCE, acceptable=DEFAULT_ACCEPTABLE_RATE,
+                 unacceptable=DEFAULT_UNACCEPTABLE_RATE):
+        if not 0 < acceptable < unacceptable < 1:
+            raise ValueError("Acceptable find rate must be below the unacceptable rate")
+        self.confidence = confidence
+        self.acceptable = acceptable
+        self.unacceptable = unacceptable
+        error = 1 - confidence
+        self._upper = math.log((1 - error) / error)
+        self._lower = math.log(error / (1 - error))
+        self._found_step = math.log(unacceptable / acceptable)
+        self._clean_step = math.log((1 - unacceptable) / (1 - acceptable))
+        self.llr = 0.0
+        self.observations = 0
+        self.findings = 0
+        self.verdict = UNDECIDED
+
+    @property
+    def settled(self):
+        return self.verdict != UNDECIDED
+
+    def observe(self, found):
+        """Add one response; return the verdict once it is settled"""
+        if self.settled:
+            return self.verdict
+        self.observations += 1
+        if found:
+            self.findings += 1
+            self.llr += self._found_step
+        else:
+            self.llr += self._clean_step
+        if self.llr >= self._upper:
+            self.verdict = VULNERABLE
+        elif self.llr <= self._lower:
+            self.verdict = ROBUST
+        return self.verdict
+
+    def reason(self):
+        """Describe why testing stopped, for ``test_details``"""
+        confidence = f"{self.confidence:.0%} confidence"
+        if self.verdict == VULNERABLE:
+            return (f"vulnerable: find rate above {self.acceptable:.0%} at {confidence} "
+                    f"({self.findings} findings in {self.observations} requests)")
+        if self.verdict == ROBUST:
+            return (f"robust: find rate below {self.unacceptable:.0%} at {confidence} "
+                    f"({self.findings} findings in {self.observations} requests)")
+        return "undecided: request budget ran out before the verdict settled"
@@ -0,0 +1,100 @@
+"""Incremental reading of streamed model responses.
+
+Targets that stream answer with server-sent events (OpenAI-style
+``data: {"choices": [{"delta": {"content": ...}}]}`` lines, or events
+carrying a ``text``/``token``-like field) or with plain chunked text. The
+readers here pull the text out of each piece as it arrives and hand it to
+a ``Collector``. A collector can ask for the stream to be closed as soon
+as it has seen enough; the engine's ``VerdictWatch`` does that once a
+response's verdict can no longer change.
+"""
+
+import json
+import time
+
+SSE_CONTENT_TYPE = "text/event-stream"
+
+# Event fields checked, in order, for a text delta
+DELTA_FIELDS = ("token", "text", "content", "delta", "output", "response", "completion")
+
+DONE = "[DONE]"
+
+
+class Collector:
+    """Accumulates streamed text; subclasses decide when enough has been read"""
+
+    def __init__(self):
+        self._parts = []
+        self.length = 0
+        self.verdict_at = None   # perf_counter() when the verdict became certain
+
+    @property
+    def text(self):
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def feed(self, delta):
+        """Add ``delta``; True means stop reading"""
+        if not delta:
+            return False
+        self._parts.append(delta)
+        self.length += len(delta)
+        return self.check(delta)
+
+    def check(self, delta):
+        return False
+
+    def settle(self):
+        """Mark the verdict as certain now, if it wasn't already"""
+        if self.verdict_at is None:
+            self.verdict_at = time.perf_counter()
+
+
+def event_text(data):
+    """The text delta carried by one SSE ``data`` payload, or None"""
+    try:
+        event = json.loads(data)
+    except ValueError:
+        return data
+    if not isinstance(event, dict):
+        return None
+    choices = event.get("choices")
+    if isinstance(choices, list) and choices:
+        choice = choices[0]
+        delta = choice.get("delta") or {}
+        return delta.get("content") or choice.get("text")
+    for field in DELTA_FIELDS:
+        if isinstance(event.get(field), str):
+            return event[field]
+    return None
+
+
+def read_sse(lines, collector):
+    """Feed the text of each event in ``lines`` to ``collector``; True if it stopped early"""
+    data = []
+    for line in lines:
+        if line:
+            if line.startswith("data:"):
+                data.append(line[5:].lstrip())
+            continue
+        # A blank line ends an event
+        if not data:
+            continue
+        payload = "\n".join(data)
+        data = []
+        if payload == DONE:
+            return False
+        if collector.feed(event_text(payload)):
+            return True
+    if data and "\n".join(data) != DONE:
+        return collector.feed(event_text("\n".join(data)))
+    return False
+
+
+def read_chunks(chunks, collector):
+    """Feed raw text chunks to ``collector``; True if it stopped early"""
+    for chunk in chunks:
+        if collector.feed(chunk):
+            return True
+    return False
@@ -0,0 +1,275 @@
+"""Indexed target catalog and streaming target importer."""
+
+import codecs
+import json
+import logging
+from itertools import chain, islice
+from urllib.parse import urlsplit
+
+from renegade import auth
+
+logger = logging.getLogger("RedTeamApp.targets")
+
+# Bytes read from an upload per iteration
+IMPORT_BLOCK_SIZE = 64 * 1024
+
+# Largest single JSON row accepted from an array upload
+MAX_ROW_SIZE = 1024 * 1024
+
+# Per-row error messages kept in an import report
+MAX_REPORTED_ERRORS = 20
+
+TARGET_TEXT_FIELDS = ["type", "transport", "api_key", "description"]
+
+
+def normalize_endpoint(endpoint):
+    """Normalize an endpoint URL for duplicate detection"""
+    endpoint = endpoint.strip()
+    try:
+        parts = urlsplit(endpoint)
+    except ValueError:
+        return endpoint.rstrip("/").lower()
+    if not parts.scheme or not parts.netloc:
+        return endpoint.rstrip("/").lower()
+    path = parts.path.rstrip("/")
+    query = f"?{parts.query}" if parts.query else ""
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}{path}{query}"
+
+
+def validate_target(row):
+    """Validate one imported row, returning (target, None) or (None, error)"""
+    if not isinstance(row, dict):
+        return None, f"expected an object, got {type(row).__name__}"
+
+    name = row.get("name")
+    endpoint = row.get("endpoint")
+    if not isinstance(name, str) or not name.strip():
+        return None, "missing or empty 'name'"
+    if not isinstance(endpoint, str) or not endpoint.strip():
+        return None, "missing or empty 'endpoint'"
+
+    target = dict(row)
+    target["name"] = name.strip()
+    target["endpoint"] = endpoint.strip()
+    for field in TARGET_TEXT_FIELDS:
+        if field in target and target[field] is not None and not isinstance(target[field], str):
+            return None, f"'{field}' must be a string"
+    rate_limit = target.get("rate_limit")
+    if rate_limit is not None and (isinstance(rate_limit, bool) or not isinstance(rate_limit, (int, float))
+                                   or rate_limit <= 0):
+        return None, "'rate_limit' must be a positive number of requests per second"
+    if target.get("auth") is not None:
+        error = auth.validate_config(target["auth"])
+        if error:
+            return None, error
+    return target, None
+
+
+class TargetCatalog:
+    """Ordered collection of targets indexed by name and endpoint.
+
+    Names are unique, and a second target pointing at an endpoint that is
+    already registered is treated as a duplicate.
+    """
+
+    def __init__(self, targets=None):
+        self._by_name = {}
+        self._by_endpoint = {}
+        for target in targets or []:
+            self.add(target)
+
+    def __len__(self):
+        return len(self._by_name)
+
+    def __iter__(self):
+        return iter(list(self._by_name.values()))
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def add(self, target):
+        """Add a target, returning False if it duplicates an existing one"""
+        key = normalize_endpoint(target["endpoint"])
+        if target["name"] in self._by_name or key in self._by_endpoint:
+            return False
+        self._by_name[target["name"]] = target
+        self._by_endpoint[key] = target["name"]
+        return True
+
+    def get(self, name):
+        """Return the target called ``name`` or None"""
+        return self._by_name.get(name)
+
+    def find_by_endpoint(self, endpoint):
+        """Return the target registered for ``endpoint`` or None"""
+        name = self._by_endpoint.get(normalize_endpoint(endpoint))
+        return self._by_name.get(name) if name is not None else None
+
+    def remove(self, name):
+        """Remove a target by name, returning the removed target or None"""
+        target = self._by_name.pop(name, None)
+        if target is not None:
+            self._by_endpoint.pop(normalize_endpoint(target["endpoint"]), None)
+        return target
+
+    def names(self):
+        """Return target names in insertion order"""
+        return list(self._by_name)
+
+    def page(self, page, page_size):
+        """Return the targets on a 0-based page"""
+        start = max(page, 0) * page_size
+        return list(islice(self._by_name.values(), start, start + page_size))
+
+    def page_count(self, page_size):
+        """Return the number of pages needed for ``page_size`` targets per page"""
+        return max(1, -(-len(self) // page_size))
+
+    def to_list(self):
+        """Return the targets as a list of dicts"""
+        return list(self._by_name.values())
+
+    def to_json(self):
+        """Serialize the catalog in the import/export format"""
+        return json.dumps(self.to_list(), indent=2)
+
+
+def _iter_text_blocks(fileobj, block_size):
+    """Yield decoded text blocks from a binary or text file object"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    while True:
+        block = fileobj.read(block_size)
+        if not block:
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+            return
+        yield decoder.decode(block) if isinstance(block, bytes) else block
+
+
+def _iter_json_array(blocks, buffer):
+    """Yield (row_number, value, error) from a streamed top-level JSON array"""
+    decoder = json.JSONDecoder()
+    position = buffer.index("[") + 1
+    row = 0
+    exhausted = False
+
+    while True:
+        # Skip separators between elements
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) or exhausted:
+                break
+            buffer = buffer[position:] + next(blocks, "")
+            position = 0
+            if not buffer:
+                exhausted = True
+
+        if position >= len(buffer):
+            raise ValueError("unterminated JSON array")
+        if buffer[position] == "]":
+            return
+
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+            # A scalar ending exactly at the buffer edge may be truncated
+            truncated = end == len(buffer) and not exhausted
+        except json.JSONDecodeError as e:
+            # Give up once a single row would exceed a sane size
+            if exhausted or len(buffer) - position > MAX_ROW_SIZE:
+                raise ValueError(f"invalid JSON near row {row + 1}: {e.msg}")
+            truncated = True
+
+        if truncated:
+            more = next(blocks, None)
+            if more is None:
+                exhausted = True
+            else:
+                buffer = buffer[position:] + more
+                position = 0
+            continue
+
+        row += 1
+        yield row, value, None
+        position = end
+        # Drop consumed text so the buffer stays bounded
+        if position > IMPORT_BLOCK_SIZE:
+            buffer = buffer[position:]
+            position = 0
+
+
+def _iter_ndjson(blocks, buffer):
+    """Yield (row_number, value, error) from newline-delimited JSON"""
+    row = 0
+    pending = ""
+    # The sniffed first block is split like every later one
+    for block in chain([buffer], blocks):
+        pending += block
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            if line.strip():
+                row += 1
+                yield _decode_line(row, line)
+    if pending.strip():
+        row += 1
+        yield _decode_line(row, pending)
+
+
+def _decode_line(row, line):
+    """Decode a single NDJSON line"""
+    try:
+        return row, json.loads(line), None
+    except json.JSONDecodeError as e:
+        return row, None, f"invalid JSON: {e.msg}"
+
+
+def iter_target_rows(fileobj, block_size=IMPORT_BLOCK_SIZE):
+    """Stream rows from a JSON array or NDJSON upload.
+
+    Yields ``(row_number, value, error)`` tuples; ``error`` is set for rows
+    that could not be decoded.
+    """
+    blocks = _iter_text_blocks(fileobj, block_size)
+    buffer = ""
+    for block in blocks:
+        buffer += block
+        if buffer.strip():
+            break
+
+    stripped = buffer.lstrip()
+    if not stripped:
+        return
+    if stripped[0] == "[":
+        yield from _iter_json_array(blocks, buffer)
+    else:
+        yield from _iter_ndjson(blocks, buffer)
+
+
+def import_targets(catalog, fileobj):
+    """Stream targets from ``fileobj`` into ``catalog`` with per-row validation"""
+    report = {"added": 0, "duplicates": 0, "invalid": 0, "errors": []}
+
+    def reject(row, message):
+        report["invalid"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append(f"Row {row}: {message}")
+
+    try:
+        for row, value, error in iter_target_rows(fileobj):
+            if error:
+                reject(row, error)
+                continue
+            target, error = validate_target(value)
+            if error:
+                reject(row, error)
+            elif catalog.add(target):
+                report["added"] += 1
+            else:
+                report["duplicates"] += 1
+    except ValueError as e:
+        # A broken JSON array stops the import; rows already read are kept
+        reject("-", str(e))
+
+    logger.info(f"Target import: {report['added']} added, {report['duplicates']} duplicates, {report['invalid']} invalid")
+    return report
@@ -0,0 +1,186 @@
+"""Per-run time series: throughput, latency percentiles and findings over time.
+
+The engine feeds every response into a ``Timeline``, which keeps fixed-width
+buckets of counters and a log-spaced latency histogram rather than raw
+samples. Once a run outgrows ``MAX_BUCKETS``, neighbouring buckets are
+merged and the width doubles, so a 24-hour run costs the same memory as a
+short one. Charts then pass each series through ``lttb`` so only a few
+thousand points reach the browser.
+"""
+
+import time
+
+import numpy as np
+
+BUCKET_SECONDS = 1
+MAX_BUCKETS = 8192
+MAX_POINTS = 500         # Points per series sent to a chart
+
+SEVERITIES = ["low", "medium", "high", "critical"]
+
+# Latency histogram bin edges in milliseconds
+LATENCY_EDGES = np.geomspace(1, 120_000, 64)
+PERCENTILES = (50, 95, 99)
+
+
+class Timeline:
+    """Bucketed request, error, latency and finding counts for one run"""
+
+    def __init__(self, bucket_seconds=BUCKET_SECONDS, max_buckets=MAX_BUCKETS, clock=time.monotonic):
+        self.bucket_seconds = bucket_seconds
+        self.max_buckets = max_buckets
+        self.started_at = time.time()
+        # Replays pass a clock that reads the recorded send times
+        self._clock = clock
+        self._started = clock()
+        self._size = 0
+        self.requests = np.zeros(64, dtype=np.int64)
+        self.errors = np.zeros(64, dtype=np.int64)
+        self.latency = np.zeros((64, len(LATENCY_EDGES) + 1), dtype=np.int64)
+        self.findings = np.zeros((64, len(SEVERITIES)), dtype=np.int64)
+        # Time to verdict is only summarized over the whole run
+        self.verdict_latency = np.zeros(len(LATENCY_EDGES) + 1, dtype=np.int64)
+
+    def _bucket(self):
+        index = int((self._clock() - self._started) / self.bucket_seconds)
+        while index >= self.max_buckets:
+            self._coarsen()
+            index //= 2
+        if index >= len(self.requests):
+            grow = min(self.max_buckets, max(index + 1, 2 * len(self.requests))) - len(self.requests)
+            self.requests = np.pad(self.requests, (0, grow))
+            self.errors = np.pad(self.errors, (0, grow))
+            self.latency = np.pad(self.latency, ((0, grow), (0, 0)))
+            self.findings = np.pad(self.findings, ((0, grow), (0, 0)))
+        self._size = max(self._size, index + 1)
+        return index
+
+    def _coarsen(self):
+        """Merge bucket pairs, doubling the bucket width"""
+        def halve(array):
+            if len(array) % 2:
+                array = np.concatenate([array, np.zeros_like(array[:1])])
+            return array[0::2] + array[1::2]
+
+        self.requests = halve(self.requests)
+        self.errors = halve(self.errors)
+        self.latency = halve(self.latency)
+        self.findings = halve(self.findings)
+        self._size = (self._size + 1) // 2
+        self.bucket_seconds *= 2
+
+    def record(self, latency_ms, error=False, verdict_ms=None):
+        """Count one response; ``verdict_ms`` is when its verdict was known, if before the end"""
+        index = self._bucket()
+        self.requests[index] += 1
+        if error:
+            self.errors[index] += 1
+        elif latency_ms is not None:
+            self.latency[index, np.searchsorted(LATENCY_EDGES, latency_ms)] += 1
+            self.verdict_latency[np.searchsorted(LATENCY_EDGES, latency_ms if verdict_ms is None else verdict_ms)] += 1
+
+    def record_finding(self, severity):
+        index = self._bucket()
+        if severity in SEVERITIES:
+            self.findings[index, SEVERITIES.index(severity)] += 1
+
+    def _percentiles(self):
+        """Latency percentiles per bucket from the histograms, NaN where nothing was timed"""
+        counts = self.latency[:self._size]
+        cumulative = np.cumsum(counts, axis=1)
+        totals = cumulative[:, -1:]
+        upper = np.append(LATENCY_EDGES, LATENCY_EDGES[-1])
+        result = {}
+        for p in PERCENTILES:
+            bins = np.argmax(cumulative >= np.maximum(totals * p / 100, 1), axis=1)
+            result[p] = np.where(totals[:, 0] > 0, upper[bins], np.nan)
+        return result
+
+    def overall_percentiles(self, histogram=None):
+        """Latency percentiles over the whole run, in milliseconds"""
+        cumulative = np.cumsum(self.latency[:self._size].sum(axis=0) if histogram is None else histogram)
+        if not cumulative.size or cumulative[-1] == 0:
+            return {f"p{p}": None for p in PERCENTILES}
+        upper = np.append(LATENCY_EDGES, LATENCY_EDGES[-1])
+        return {f"p{p}": round(float(upper[np.argmax(cumulative >= cumulative[-1] * p / 100)]), 1) for p in PERCENTILES}
+
+    def summary(self):
+        """Plain lists for the results dict, one entry per bucket"""
+        size = self._size
+        percentiles = self._percentiles()
+        return {
+            "started_at": self.started_at,
+            "bucket_seconds": self.bucket_seconds,
+            "latency_ms": self.overall_percentiles(),
+            "verdict_ms": self.overall_percentiles(self.verdict_latency),
+            "requests": self.requests[:size].tolist(),
+            "errors": self.errors[:size].tolist(),
+            **{f"latency_p{p}": [None if np.isnan(v) else round(float(v), 1) for v in percentiles[p]]
+               for p in PERCENTILES},
+            "findings": {severity: self.findings[:size, i].tolist() for i, severity in enumerate(SEVERITIES)},
+        }
+
+
+def lttb(x, y, threshold=MAX_POINTS):
+    """Largest-Triangle-Three-Buckets downsampling of a line to ``threshold`` points.
+
+    Keeps the first and last points and, from each of ``threshold - 2``
+    equal slices in between, the point forming the largest triangle with
+    the previously kept point and the next slice's mean. Points with a
+    NaN ``y`` are dropped first.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    keep = ~np.isnan(y)
+    x, y = x[keep], y[keep]
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    chosen = np.empty(threshold, dtype=int)
+    chosen[0], chosen[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        following = slice(edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else slice(n - 1, n)
+        mean_x, mean_y = x[following].mean(), y[following].mean()
+        px, py = x[previous], y[previous]
+        area = np.abs((px - mean_x) * (y[start:stop] - py) - (px - x[start:stop]) * (mean_y - py))
+        previous = start + int(np.argmax(area))
+        chosen[i + 1] = previous
+    return x[chosen], y[chosen]
+
+
+def rebucket(values, factor):
+    """Sum every ``factor`` consecutive buckets"""
+    values = np.asarray(values, dtype=float)
+    if factor <= 1:
+        return values
+    padded = np.pad(values, (0, -len(values) % factor))
+    return padded.reshape(-1, factor).sum(axis=1)
+
+
+def chart_series(timeline, max_points=MAX_POINTS):
+    """Downsampled series for plotting: requests/sec, latency percentiles and findings/minute by severity.
+
+    Returns a dict of name -> (seconds since start, values).
+    """
+    width = timeline["bucket_seconds"]
+    seconds = np.arange(len(timeline["requests"])) * width
+    series = {
+        "requests_per_second": lttb(seconds, np.asarray(timeline["requests"], dtype=float) / width, max_points),
+        "errors_per_second": lttb(seconds, np.asarray(timeline["errors"], dtype=float) / width, max_points),
+    }
+    for p in PERCENTILES:
+        values = np.array([np.nan if v is None else v for v in timeline[f"latency_p{p}"]], dtype=float)
+        series[f"latency_p{p}"] = lttb(seconds, values, max_points)
+
+    # Findings are counted per minute; buckets narrower than that are summed first
+    factor = max(1, int(round(60 / width)))
+    minutes = np.arange(-(-len(seconds) // factor)) * width * factor
+    for severity, counts in timeline["findings"].items():
+        per_minute = rebucket(counts, factor) * (60 / (width * factor))
+        if per_minute.any():
+            series[f"findings_{severity}"] = lttb(minutes, per_minute, max_points)
+    return series
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from renegade import engine, vectors  # noqa: E402
+
+
+@pytest.fixture
+def results():
+    """A results dict with a few findings across vectors"""
+    results = engine.new_results({"name": "unit"})
+    for vector in vectors.get_test_vectors()[:3]:
+        engine.add_finding(results, vector, f"Leaked canary for {vector['id']}", response="I can't do that")
+    results["summary"]["total_tests"] = 30
+    return results
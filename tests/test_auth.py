@@ -0,0 +1,115 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+import pytest
+
+from renegade import auth
+
+KEY = "0123456789abcdef0123456789abcdef"
+
+
+@pytest.fixture(autouse=True)
+def fresh_providers(monkeypatch):
+    monkeypatch.setattr(auth, "_providers", {})
+
+
+@pytest.fixture
+def token_server():
+    """Token endpoint that numbers the tokens it issues"""
+    issued = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            form = self.rfile.read(int(self.headers["Content-Length"])).decode()
+            issued.append((form, self.headers.get("Authorization")))
+            body = json.dumps({"access_token": f"token-{len(issued)}", "expires_in": 120}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/token", issued
+    server.shutdown()
+    server.server_close()
+
+
+def oauth_target(url):
+    return {"name": "api", "endpoint": "http://api.test/v1",
+            "auth": {"type": auth.TOKEN_ENDPOINT, "token_url": url, "client_id": "id", "client_secret": "s",
+                     "scope": "chat"}}
+
+
+@pytest.mark.parametrize("config, error", [
+    ({}, None),
+    ({"type": auth.JWT, "key": KEY}, None),
+    ([], "'auth' must be an object"),
+    ({"type": "basic"}, "unknown auth type 'basic'"),
+    ({"type": auth.JWT}, "JWT auth needs a signing 'key'"),
+    ({"type": auth.TOKEN_ENDPOINT}, "token endpoint auth needs a 'token_url'"),
+])
+def test_validate_config(config, error):
+    assert auth.validate_config(config) == error
+
+
+def test_static_keys_are_bearer_tokens():
+    assert auth.headers({"name": "api", "api_key": "k"}) == {"Authorization": "Bearer k"}
+    assert auth.headers({"name": "api"}) == {}
+
+
+def test_jwts_are_signed_locally_with_the_configured_claims():
+    target = {"name": "api", "auth": {"type": auth.JWT, "key": KEY, "issuer": "renegade", "audience": "model",
+                                      "claims": {"role": "tester"}, "ttl": 60}}
+    value = auth.headers(target)["Authorization"].removeprefix("Bearer ")
+    claims = jwt.decode(value, KEY, algorithms=["HS256"], audience="model")
+    assert (claims["iss"], claims["role"], claims["exp"] - claims["iat"]) == ("renegade", "tester", 60)
+    # The cached token is reused, not signed again per request
+    assert auth.headers(target)["Authorization"] == f"Bearer {value}"
+    assert auth.provider_for(target).fetches == 1
+
+
+def test_targets_with_the_same_config_share_a_provider():
+    target = {"name": "api", "auth": {"type": auth.JWT, "key": KEY}}
+    assert auth.provider_for(dict(target)) is auth.provider_for(dict(target))
+    assert auth.provider_for({**target, "name": "other"}) is not auth.provider_for(target)
+
+
+def test_client_credentials_are_exchanged_once_and_refreshed_after_a_rejection(token_server):
+    url, issued = token_server
+    target = oauth_target(url)
+    assert auth.headers(target) == {"Authorization": "Bearer token-1"}
+    assert auth.headers(target) == {"Authorization": "Bearer token-1"}
+    form, authorization = issued[0]
+    assert "grant_type=client_credentials" in form and "scope=chat" in form
+    assert authorization.startswith("Basic ")
+
+    auth.invalidate(target, {"Authorization": "Bearer token-1"})
+    assert auth.headers(target) == {"Authorization": "Bearer token-2"}
+    # A rejection of an already replaced token changes nothing
+    auth.invalidate(target, {"Authorization": "Bearer token-1"})
+    assert auth.headers(target) == {"Authorization": "Bearer token-2"}
+
+
+def test_failed_fetches_are_not_retried_by_every_caller():
+    target = oauth_target("http://127.0.0.1:9/token")
+    with pytest.raises(auth.AuthError, match="Could not obtain a token"):
+        auth.prepare(target)
+    provider = auth.provider_for(target)
+    with pytest.raises(auth.AuthError):
+        auth.headers(target)
+    assert provider.failures == 1
+
+
+def test_tokens_refresh_ahead_of_expiry():
+    token = auth.Token("t", 1000)
+    assert token.refresh_at() == pytest.approx(token.expires_at - 200)
+    short = auth.Token("t", 20)
+    assert short.refresh_at() == pytest.approx(short.expires_at - 10)
+    assert not token.expired()
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from renegade import bandit, engine, vectors
+
+ARMS = [{"id": f"v{i}", "mutation": "direct"} for i in range(4)]
+
+
+class RecordingTransport(engine.SimulatedTransport):
+    """Simulated target that remembers the variation of every request"""
+
+    def __init__(self):
+        super().__init__(latency=None, seed=5)
+        self.variations = []
+
+    def send(self, target, vector, payload, canary, **options):
+        self.variations.append(int(canary.rsplit("-", 1)[1]))
+        return super().send(target, vector, payload, canary, **options)
+
+
+def test_even_split_is_the_default():
+    assert engine.DEFAULT_SETTINGS["allocation"] == bandit.EVEN
+
+
+@pytest.mark.parametrize("strategy", [bandit.THOMPSON, bandit.UCB])
+def test_budget_moves_to_the_arm_that_finds(strategy):
+    allocator = bandit.BanditAllocator(ARMS, strategy, exploration=0.05, seed=0)
+    for _ in range(2000):
+        arm = allocator.select()
+        allocator.record(arm, 1 if arm == 2 else 0)
+    assert int(np.argmax(allocator.issued)) == 2
+    assert allocator.issued[2] > 0.6 * allocator.issued.sum()
+    # Exploration keeps every arm sampled
+    assert (allocator.issued > 0).all()
+
+
+def test_retired_arms_get_no_requests():
+    allocator = bandit.BanditAllocator(ARMS, bandit.THOMPSON, exploration=0.5, seed=0)
+    for arm in (0, 1, 3):
+        allocator.retire(arm)
+    assert {allocator.select() for _ in range(50)} == {2}
+    allocator.retire(2)
+    assert allocator.select() is None
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        bandit.BanditAllocator(ARMS, bandit.EVEN)
+
+
+def test_adaptive_lease_stays_inside_its_variation_range():
+    transport = RecordingTransport()
+    settings = {"allocation": bandit.THOMPSON, "variation_start": 10, "variations": 5, "variation_stop": 15,
+                "profile": False, "pii_regulations": []}
+    results = engine.run_assessment({"name": "lease"}, vectors.get_test_vectors()[:4], settings, transport=transport)
+    assert results["summary"]["total_tests"] == 20
+    assert transport.variations and all(10 <= variation < 15 for variation in transport.variations)
@@ -0,0 +1,88 @@
+import glob
+import os
+
+import pytest
+
+from renegade import cassette, engine, vectors
+
+TARGET = {"name": "recorded", "endpoint": "https://api.example.com/v1", "transport": "http", "api_key": "secret"}
+
+
+def record(path, count):
+    test_vectors = vectors.get_test_vectors()[:2]
+    writer = cassette.CassetteWriter(path, TARGET, test_vectors, {"variations": count})
+    for variation in range(count):
+        vector = {**test_vectors[variation % 2], "mutation": "plain"}
+        response = {"text": f"reply {variation}", "status_code": 200, "latency_ms": 12.5, "error": None}
+        writer.append(vector, variation, f"payload {variation}", response)
+    writer.close()
+    return test_vectors
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / ("run" + cassette.EXTENSION))
+
+
+def test_write_and_read(path):
+    test_vectors = record(path, 5)
+    with cassette.CassetteReader(path) as reader:
+        assert len(reader) == 5
+        assert reader.target == {key: value for key, value in TARGET.items() if key != "api_key"}
+        assert [vector["id"] for vector in reader.test_vectors()] == [vector["id"] for vector in test_vectors]
+        records = list(reader)
+        assert [r["payload"] for r in records] == [f"payload {i}" for i in range(5)]
+        assert reader[-1] == records[-1]
+        response = cassette.response_of(records[2])
+        assert (response["text"], response["status_code"], response["error"]) == ("reply 2", 200, None)
+    assert "secret" not in open(path).read()
+
+
+def test_torn_tail_is_dropped(path):
+    record(path, 4)
+    # A run killed mid-write: half a record, indexed but without its newline
+    with open(path, "ab") as fileobj:
+        offset = fileobj.tell()
+        fileobj.write(b'{"vector":"sql_injection","mutation":"pl')
+    with open(path + cassette.INDEX_SUFFIX, "ab") as index:
+        index.write(offset.to_bytes(8, "little"))
+    with cassette.CassetteReader(path) as reader:
+        assert len(reader) == 4
+        assert reader[-1]["payload"] == "payload 3"
+
+
+@pytest.mark.parametrize("keep", [0, 2, None])
+def test_short_or_missing_index_is_rebuilt(path, keep):
+    record(path, 5)
+    index_path = path + cassette.INDEX_SUFFIX
+    if keep is None:
+        os.remove(index_path)
+    else:
+        with open(index_path, "r+b") as index:
+            index.truncate(keep * 8)
+    with cassette.CassetteReader(path) as reader:
+        assert [r["payload"] for r in reader] == [f"payload {i}" for i in range(5)]
+
+
+def test_not_a_cassette(tmp_path):
+    path = tmp_path / "empty.cassette"
+    path.write_bytes(b"")
+    with pytest.raises(ValueError):
+        cassette.CassetteReader(str(path))
+    path.write_text('{"something": "else"}\n')
+    with pytest.raises(ValueError):
+        cassette.CassetteReader(str(path))
+
+
+def test_replay_matches_the_recorded_run(tmp_path):
+    settings = {"variations": 6, "allocation": "even", "profile": False, "pii_regulations": [],
+                "cassette_dir": str(tmp_path)}
+    live = engine.run_assessment({"name": "recorded"}, vectors.get_test_vectors()[:4], settings,
+                                 transport=engine.SimulatedTransport(latency=None, seed=3))
+    [path] = glob.glob(os.path.join(str(tmp_path), "*", "*" + cassette.EXTENSION))
+    assert live["cassette"] == path
+
+    replayed = engine.replay_assessment(path)
+    assert replayed["replay"]["records"] == live["summary"]["total_tests"]
+    assert replayed["summary"] == live["summary"]
+    assert [f["fingerprint"] for f in replayed["vulnerabilities"]] == [f["fingerprint"] for f in live["vulnerabilities"]]
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from renegade import cli
+
+VECTORS = "sql_injection,jailbreaking"
+
+
+@pytest.fixture
+def targets_file(tmp_path):
+    # Baseline and exported targets name no transport
+    path = tmp_path / "targets.json"
+    path.write_text(json.dumps([{"name": "closed", "endpoint": "http://127.0.0.1:9/v1"}]))
+    return str(path)
+
+
+def run(targets_file, tmp_path, *extra):
+    return cli.main(["run", "--targets", targets_file, "--vectors", VECTORS, "--variations", "2", "--duration", "20",
+                     "--request-timeout", "1", "--retries", "0", "--no-profile", "--output-dir", str(tmp_path / "out"),
+                     "-q", *extra])
+
+
+def test_targets_without_a_transport_are_sent_live(targets_file, tmp_path, capsys):
+    # Nothing listens on the port, so every live request fails and nothing is found
+    assert run(targets_file, tmp_path) == cli.EXIT_OK
+    out, err = capsys.readouterr()
+    assert out.startswith("OK      closed: 0 findings in 4 requests")
+    assert "SIMULATED" not in out + err
+
+
+def test_simulation_is_opt_in_and_labelled(targets_file, tmp_path, capsys):
+    code = run(targets_file, tmp_path, "--simulate", "--variations", "50", "--fail-on", "low")
+    out, err = capsys.readouterr()
+    assert "WARNING: SIMULATED answers" in err
+    assert "SIMULATED closed:" in out
+    assert code == (cli.EXIT_FINDINGS if out.startswith("BREACH") else cli.EXIT_OK)
+
+
+def test_results_are_written_in_the_results_analyzer_format(targets_file, tmp_path, capsys):
+    run(targets_file, tmp_path, "--simulate")
+    [path] = (tmp_path / "out").iterdir()
+    results = json.loads(path.read_text())
+    assert results["target"] == "closed" and results["summary"]["total_tests"] == 4
+
+
+def test_plan_only(targets_file, tmp_path, capsys):
+    assert run(targets_file, tmp_path, "--plan-only") == cli.EXIT_OK
+    assert capsys.readouterr().out.startswith("FITS")
+
+
+def test_usage_errors(targets_file, tmp_path, capsys):
+    assert run(targets_file, tmp_path, "--target", "missing") == cli.EXIT_USAGE
+    assert "Unknown target(s): missing" in capsys.readouterr().err
+    with pytest.raises(SystemExit):
+        run(targets_file, tmp_path, "--simulate", "--live")
+
+
+def test_worst_severity():
+    results = {"vulnerabilities": [{"severity": "medium"}, {"severity": "critical"}, {"severity": "low"}]}
+    assert cli.worst_severity(results) == "critical"
+    assert cli.worst_severity({"vulnerabilities": []}) is None
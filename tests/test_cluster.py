@@ -0,0 +1,49 @@
+from renegade import cluster
+
+LEAK = "The model returned the customer table with names, emails and card numbers for account {}"
+REFUSAL = "I cannot help with bypassing the content policy of this assistant, request {} declined"
+
+
+def finding(n, details, vector="sql_injection", severity="medium"):
+    return {"id": f"F-{n}", "test_vector": vector, "test_name": vector, "severity": severity, "details": details}
+
+
+def test_near_duplicates_share_a_cluster():
+    findings = [finding(i, LEAK.format(f"A{i}B")) for i in range(5)] + [finding(9, REFUSAL.format("x"))]
+    summary = cluster.cluster_results({"vulnerabilities": findings})
+    assert [c["count"] for c in summary] == [5, 1]
+    assert summary[0]["representative"] == "F-0"
+    assert {f["cluster"] for f in findings[:5]} == {summary[0]["cluster"]}
+    assert findings[5]["cluster"] == summary[1]["cluster"]
+
+
+def test_vectors_are_never_mixed():
+    clusterer = cluster.Clusterer()
+    first = clusterer.add(finding(1, LEAK.format(1), vector="sql_injection"))
+    second = clusterer.add(finding(2, LEAK.format(1), vector="pii_leak"))
+    assert first["cluster"] != second["cluster"]
+
+
+def test_a_cluster_takes_its_worst_severity():
+    clusterer = cluster.Clusterer()
+    clusterer.add(finding(1, LEAK.format(1), severity="low"))
+    merged, _ = clusterer.add_many([finding(2, LEAK.format(1), severity="critical"),
+                                    finding(3, LEAK.format(1), severity="medium")])
+    assert merged["severity"] == "critical"
+    assert merged["count"] == 3
+
+
+def test_batches_match_one_at_a_time():
+    findings = [finding(i, (LEAK if i % 2 else REFUSAL).format(i)) for i in range(cluster.BATCH_SIZE + 10)]
+    one_by_one = cluster.Clusterer()
+    for f in findings:
+        one_by_one.add(dict(f))
+    batched = cluster.Clusterer()
+    batched.add_many([dict(f) for f in findings])
+    assert [c["count"] for c in batched.summary()] == [c["count"] for c in one_by_one.summary()]
+
+
+def test_short_and_empty_texts_still_cluster():
+    summary = cluster.cluster_results({"vulnerabilities": [finding(1, ""), finding(2, "ok")]})
+    assert sum(c["count"] for c in summary) == 2
+    assert cluster.cluster_results({"vulnerabilities": None}) == []
@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from renegade import distributed, vectors
+
+SETTINGS = {"variations": 4, "duration": 30, "profile": False}
+TARGET = {"name": "sim", "endpoint": "http://sim.invalid/v1", "api_key": "secret"}
+
+
+@pytest.fixture
+def test_vectors():
+    return [vectors.get_vector("sql_injection"), vectors.get_vector("jailbreaking")]
+
+
+@pytest.fixture
+def serving(test_vectors):
+    coordinators = []
+
+    def serve(settings=SETTINGS, **options):
+        coordinator = distributed.Coordinator([TARGET], test_vectors, settings, **options)
+        server = coordinator.serve("127.0.0.1", 0)
+        coordinators.append(coordinator)
+        return coordinator, f"http://127.0.0.1:{server.server_port}"
+
+    yield serve
+    for coordinator in coordinators:
+        coordinator.shutdown()
+
+
+def test_workers_run_every_lease_into_one_result(serving):
+    coordinator, url = serving(token="s3cret", lease_size=2)
+    worker = distributed.Worker(url, token="s3cret", report_interval=0.05)
+    assert worker.run(max_leases=coordinator.total) == coordinator.total
+    assert coordinator.wait(5)
+    [results] = coordinator.final_results()
+    assert results["stop_reason"] == "completed"
+    assert results["summary"]["total_tests"] == 8
+
+
+def test_a_wrong_token_is_refused(serving):
+    _, url = serving(token="s3cret")
+    for token in ("guess", None):
+        headers = {distributed.TOKEN_HEADER: token} if token else {}
+        response = requests.post(f"{url}/lease", json={"worker": "w"}, headers=headers, timeout=5)
+        assert response.status_code == 403
+
+
+@pytest.mark.parametrize("host", ["127.0.0.1", "::1", "localhost"])
+def test_loopback_hosts(host):
+    assert distributed.is_loopback(host)
+
+
+def test_other_addresses_need_a_token(test_vectors):
+    coordinator = distributed.Coordinator([TARGET], test_vectors, SETTINGS)
+    assert not distributed.is_loopback("0.0.0.0")
+    with pytest.raises(ValueError, match="without a token"):
+        coordinator.serve("0.0.0.0", 0)
+
+
+def test_wait_expires_the_leases_of_dead_workers(test_vectors, monkeypatch):
+    monkeypatch.setattr(distributed, "EXPIRE_INTERVAL", 0.05)
+    coordinator = distributed.Coordinator([TARGET], test_vectors, SETTINGS, lease_ttl=0.1, max_attempts=1)
+    assert coordinator.acquire("dies")["target"] == TARGET
+    # Nothing polls status, yet the lease is given up instead of waiting forever
+    assert coordinator.wait(5)
+    [results] = coordinator.final_results()
+    assert results["stop_reason"] == "incomplete"
+    assert len(results["failed_leases"]) == 1
+
+
+def test_wait_times_out_while_leases_are_held(test_vectors):
+    coordinator = distributed.Coordinator([TARGET], test_vectors, SETTINGS)
+    coordinator.acquire("slow")
+    assert not coordinator.wait(0.1)
+
+
+class UnreachableWorker(distributed.Worker):
+    """Worker whose progress reports never reach the coordinator"""
+
+    def _post(self, path, body):
+        if path == "/report" and not body["error"]:
+            raise requests.ConnectionError("coordinator unreachable")
+        return super()._post(path, body)
+
+
+def test_a_failed_report_stops_the_lease_and_hands_it_back(serving, test_vectors):
+    coordinator, url = serving(max_attempts=1, lease_size=200, settings={**SETTINGS, "variations": 200})
+    worker = UnreachableWorker(url, report_interval=0.05)
+    started = time.monotonic()
+    thread = threading.Thread(target=worker.run, kwargs={"max_leases": 1})
+    thread.start()
+    thread.join(10)
+    assert not thread.is_alive()
+    # 400 simulated requests take far longer than being stopped at the first report
+    assert time.monotonic() - started < 5
+    assert coordinator.wait(1)
+    assert coordinator.status()["failed"] == 1
@@ -0,0 +1,67 @@
+import csv
+import functools
+import gzip
+import io
+import json
+
+import pytest
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+from renegade import exports
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_export_buffer_is_a_valid_download(results, compress):
+    data = functools.partial(exports.export_buffer, results, "json", compress)()
+    served, _ = convert_data_to_bytes_and_infer_mime(data, unsupported_error=TypeError("unsupported"))
+    if compress:
+        served = gzip.decompress(served)
+    assert served == export(results, "json")
+
+
+def export(results, fmt, compress=False, chunk_size=2):
+    fileobj = io.BytesIO()
+    exports.write_export(results, fmt, fileobj, compress=compress, chunk_size=chunk_size)
+    data = fileobj.getvalue()
+    return gzip.decompress(data) if compress and fmt != "parquet" else data
+
+
+def expected_rows(results):
+    return [{key: str(value) for key, value in dict(finding).items()} for finding in results["vulnerabilities"]]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_json_round_trip(results, compress):
+    fileobj = io.BytesIO()
+    exports.write_export(results, "json", fileobj, compress=compress, chunk_size=2)
+    fileobj.seek(0)
+    report = exports.read_json_report(fileobj)
+    assert report["summary"] == results["summary"]
+    assert report["vulnerabilities"] == json.loads(json.dumps([dict(f) for f in results["vulnerabilities"]]))
+
+
+def test_json_round_trip_without_findings():
+    results = {"summary": {"total_tests": 0}, "vulnerabilities": []}
+    report = json.loads(export(results, "json"))
+    assert report == results
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_ndjson_round_trip(results, compress):
+    lines = export(results, "ndjson", compress).decode().splitlines()
+    assert [json.loads(line) for line in lines] == json.loads(json.dumps([dict(f) for f in results["vulnerabilities"]]))
+
+
+def test_csv_round_trip(results):
+    rows = list(csv.DictReader(io.StringIO(export(results, "csv").decode())))
+    assert [{key: row[key] for key in expected} for row, expected in zip(rows, expected_rows(results))] == \
+        expected_rows(results)
+    assert len(rows) == len(results["vulnerabilities"])
+
+
+def test_parquet_round_trip(results):
+    pq = pytest.importorskip("pyarrow.parquet")
+    table = pq.read_table(io.BytesIO(export(results, "parquet")))
+    rows = table.to_pylist()
+    assert [{key: row[key] for key in expected} for row, expected in zip(rows, expected_rows(results))] == \
+        expected_rows(results)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from renegade import engine, fairness
+
+
+class FlakyTransport:
+    """Fails every first attempt with a 503, then approves; records that it was closed"""
+
+    def __init__(self):
+        self.attempts = 0
+        self.closed = False
+
+    def send(self, target, vector, payload, canary, **options):
+        self.attempts += 1
+        if self.attempts % 2:
+            return {"text": "", "status_code": 503, "latency_ms": 1.0, "error": "HTTP 503"}
+        return {"text": "Approved.", "status_code": 200, "latency_ms": 1.0, "error": None}
+
+    def close(self):
+        self.closed = True
+
+
+def test_demographic_parity_and_disparate_impact_by_hand():
+    # Group 0: 3 of 4 favorable; group 1: 1 of 4 favorable
+    group_ids = np.array([0, 0, 0, 0, 1, 1, 1, 1])
+    outcomes = np.array([1, 1, 1, 0, 1, 0, 0, 0])
+    labels = np.array([1, 1, 0, 0, 1, 1, 0, 0])
+    report = fairness.compute_fairness(group_ids, outcomes, labels, groups=["a", "b"],
+                                       metrics=[fairness.DEMOGRAPHIC_PARITY, fairness.DISPARATE_IMPACT,
+                                                fairness.EQUAL_OPPORTUNITY],
+                                       replicates=200, seed=1)
+    metrics = report["metrics"]
+    assert metrics[fairness.DEMOGRAPHIC_PARITY]["value"] == pytest.approx(0.5)
+    assert metrics[fairness.DISPARATE_IMPACT]["value"] == pytest.approx(0.25 / 0.75)
+    # True positive rates: group 0 approves both qualified, group 1 one of two
+    assert metrics[fairness.EQUAL_OPPORTUNITY]["value"] == pytest.approx(0.5)
+    assert metrics[fairness.DEMOGRAPHIC_PARITY]["violated"]
+    assert metrics[fairness.DISPARATE_IMPACT]["violated"]
+
+
+def test_fairness_job_sends_through_the_resilient_transport(monkeypatch):
+    transport = FlakyTransport()
+    monkeypatch.setattr(engine, "transport_for", lambda target, settings=None: transport)
+    settings = {"retries": 2, "retry_budget": 1.0, "concurrency": 1, "circuit_breaker": False}
+    results = fairness.fairness_job(engine.RunProgress(), {"name": "fair"}, ["a", "b"],
+                                    [fairness.DEMOGRAPHIC_PARITY], samples_per_group=4, settings=settings,
+                                    replicates=50)
+    # Every probe failed once and was retried
+    assert transport.attempts == 16
+    assert results["fairness"]["metrics"][fairness.DEMOGRAPHIC_PARITY]["value"] == pytest.approx(0.0)
+    assert transport.closed
+
+
+@pytest.mark.parametrize("text, favorable", [
+    ("Yes, approved.", 1),
+    ("I would approve this application.", 1),
+    ("No.", 0),
+    ("I cannot approve this application.", 0),
+    ("I can't approve this application.", 0),
+    ("I can’t approve that.", 0),
+    ("We won't approve it.", 0),
+    ("I would not approve the loan.", 0),
+    ("Unable to approve at this time.", 0),
+    ("The application is denied.", 0),
+])
+def test_classify_answer(text, favorable):
+    assert fairness.classify_answer(text) == favorable
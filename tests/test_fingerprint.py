@@ -0,0 +1,39 @@
+from renegade import fingerprint
+
+
+def finding(vector="sql_injection", details="Leaked 12 rows", severity="high", **extra):
+    return {"test_vector": vector, "test_name": vector, "severity": severity, "details": details, **extra}
+
+
+def test_normalize_drops_canaries_numbers_and_spacing():
+    assert fingerprint.normalize("Echoed  RT-0A1B2C3D-000042\n in 17 ms") == "echoed <canary> in 0 ms"
+    assert fingerprint.normalize(None) == ""
+
+
+def test_the_same_issue_keeps_its_fingerprint_across_requests():
+    first = fingerprint.compute("api", "sql_injection", "say RT-0A1B2C3D-000001", "leaked 1 rows")
+    second = fingerprint.compute("api", "sql_injection", "say RT-FFFFFFFF-000002", "leaked 1 rows")
+    assert first == second
+    assert len(first) == 16
+    assert fingerprint.compute("other", "sql_injection", "say", "leaked 1 rows") != first
+
+
+def test_findings_without_a_fingerprint_get_one_from_their_details():
+    assert fingerprint.of(finding(fingerprint="abc")) == "abc"
+    assert fingerprint.of(finding(details="Leaked 12 rows"), "api") == fingerprint.of(finding(details="leaked 3 rows"), "api")
+
+
+def test_diff_classifies_new_fixed_and_recurring():
+    baseline = {"target": "api", "vulnerabilities": [finding(), finding(), finding("jailbreaking", "Complied")]}
+    current = {"target": "api", "vulnerabilities": [finding(), finding("pii_leak", "Returned an email")]}
+    diff = fingerprint.diff_runs(baseline, fingerprint.FindingIndex(current))
+    assert [entry["test_vector"] for entry in diff[fingerprint.NEW]] == ["pii_leak"]
+    assert [entry["test_vector"] for entry in diff[fingerprint.FIXED]] == ["jailbreaking"]
+    [recurring] = diff[fingerprint.RECURRING]
+    assert (recurring["baseline_count"], recurring["current_count"]) == (2, 1)
+
+
+def test_an_empty_run_has_nothing_to_diff():
+    index = fingerprint.FindingIndex({"target": "api", "vulnerabilities": None})
+    assert len(index) == 0
+    assert fingerprint.diff_runs(index, index) == {fingerprint.NEW: [], fingerprint.FIXED: [], fingerprint.RECURRING: []}
@@ -0,0 +1,64 @@
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from renegade import engine, health
+
+DOWN = {"status": health.DOWN, "ttfb_ms": None, "error": "connection refused"}
+SIMULATED = {"name": "simulated", "endpoint": "http://127.0.0.1:9"}
+LIVE = {"name": "live", "endpoint": "http://127.0.0.1:9/", "transport": "http"}
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def cache():
+    cache = health.HealthCache()
+    cache.put(health.cache_key(LIVE), DOWN)
+    return cache
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+
+
+def test_only_live_targets_are_gated(cache):
+    engine.check_target_health(SIMULATED, cache)
+    with pytest.raises(engine.TargetUnavailable):
+        engine.check_target_health(LIVE, cache)
+
+
+def test_unprobed_targets_rank_as_healthy(cache):
+    ranked, skipped = health.rank_targets([SIMULATED, LIVE], cache, probed=engine.is_live)
+    assert ranked == [SIMULATED]
+    assert skipped == [LIVE]
+
+
+def test_results_are_keyed_by_endpoint_not_name(server):
+    # Two sessions each call a different endpoint "prod"
+    up = {"name": "prod", "endpoint": server, "transport": "http"}
+    down = {"name": "prod", "endpoint": "http://127.0.0.1:9", "transport": "http"}
+    prober = health.TargetProber(timeout=2)
+    try:
+        prober.watch([up])
+        prober.watch([down])
+        prober.probe_all()
+        assert prober.cache.status(health.cache_key(up)) == health.HEALTHY
+        assert prober.cache.status(health.cache_key(down)) == health.DOWN
+        assert health.rank_targets([up], prober.cache) == ([up], [])
+        assert health.rank_targets([down], prober.cache) == ([], [down])
+    finally:
+        prober.stop()
+
+
+def test_cache_key_normalizes_the_endpoint():
+    assert health.cache_key({"endpoint": "HTTPS://Api.example.com/v1/"}) == \
+        health.cache_key({"endpoint": "https://api.example.com/v1"})
@@ -0,0 +1,76 @@
+import json
+import logging
+import queue
+
+import pytest
+
+from renegade import logsetup
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def captured():
+    logger = logging.getLogger("RedTeamApp.test_logsetup")
+    handler = ListHandler()
+    handler.addFilter(logsetup.ContextFilter())
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    rates = logsetup.sample_rates()
+    yield logger, handler.records
+    logger.removeHandler(handler)
+    logsetup.set_sample_rates(**rates)
+
+
+def test_context_fields_reach_the_json_line(captured):
+    logger, records = captured
+    with logsetup.log_context(run_id="run-1", target="prod"):
+        logsetup.log_event(logger, logsetup.FINDING, "Found %s", "VULN-1", vector="sql_injection", severity="high")
+    logger.info("outside")
+    entry = json.loads(logsetup.JsonFormatter().format(records[0]))
+    assert entry["message"] == "Found VULN-1"
+    assert (entry["run_id"], entry["target"], entry["event"], entry["vector"]) == \
+        ("run-1", "prod", logsetup.FINDING, "sql_injection")
+    assert "run_id" not in json.loads(logsetup.JsonFormatter().format(records[1]))
+
+
+def test_events_are_sampled_before_a_record_exists(captured):
+    logger, records = captured
+    logsetup.set_sample_rates(**{logsetup.REQUEST: 0.0, logsetup.FINDING: 1.0})
+    for _ in range(100):
+        logsetup.log_event(logger, logsetup.REQUEST, "request")
+    logsetup.log_event(logger, logsetup.FINDING, "finding")
+    assert [record.getMessage() for record in records] == ["finding"]
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = logsetup.DropOnFullQueueHandler(queue.Queue(2))
+    for i in range(5):
+        handler.handle(logging.makeLogRecord({"msg": "record %d", "args": (i,)}))
+    assert handler.dropped == 3
+    assert handler.queue.get_nowait().msg == "record 0"
+
+
+def test_file_rotates_at_max_bytes(tmp_path):
+    path = tmp_path / "app.log"
+    handler = logsetup.RotatingJsonFileHandler(str(path), max_bytes=500, backup_count=2)
+    handler.setFormatter(logsetup.JsonFormatter())
+    for i in range(40):
+        handler.emit(logging.makeLogRecord({"msg": f"line {i}", "name": "test", "levelname": "INFO"}))
+    handler.close()
+    assert path.stat().st_size <= 500
+    assert (tmp_path / "app.log.1").exists() and (tmp_path / "app.log.2").exists()
+    assert not (tmp_path / "app.log.3").exists()
+    assert json.loads(path.read_text().splitlines()[-1])["message"] == "line 39"
+
+
+def test_rates_from_env(monkeypatch):
+    monkeypatch.setenv("RENEGADE_LOG_SAMPLE_REQUEST", "0.25")
+    assert logsetup.rates_from_env() == {logsetup.REQUEST: 0.25, logsetup.FINDING: 1.0}
@@ -0,0 +1,67 @@
+from renegade import pii
+
+TEXT = "Contact jane.doe@example.com about the account"
+
+
+def test_terminated_pool_is_restarted():
+    pool = pii.ScannerPool(processes=1)
+    try:
+        pool.close()
+        [hits] = pool.submit([TEXT], None).get(timeout=60)
+        assert hits == pii.scan_text(TEXT)
+        assert hits
+    finally:
+        pool.close()
+
+
+class FailedResult:
+    def ready(self):
+        return True
+
+    def wait(self, timeout=None):
+        pass
+
+    def get(self):
+        raise RuntimeError("worker crashed")
+
+
+class StuckResult:
+    def ready(self):
+        return False
+
+    def wait(self, timeout=None):
+        pass
+
+
+class FakePool:
+    """Hands out one result per batch, in order"""
+
+    def __init__(self, results):
+        self.results = list(results)
+
+    def submit(self, texts, regulations):
+        return self.results.pop(0)
+
+
+def test_failed_batch_is_counted_not_raised():
+    scanner = pii.StreamScanner(pii.REGULATIONS, FakePool([FailedResult()]), batch_size=2)
+    scanner.feed(TEXT, "a")
+    scanner.feed(TEXT, "b")
+    assert scanner.drain() == []
+    assert (scanner.scanned, scanner.unscanned) == (0, 2)
+
+
+def test_finish_counts_scans_that_did_not_finish_in_time():
+    scanner = pii.StreamScanner(pii.REGULATIONS, FakePool([StuckResult()]), batch_size=10)
+    for context in "abc":
+        scanner.feed(TEXT, context)
+    assert scanner.finish(timeout=0.01) == []
+    assert (scanner.scanned, scanner.unscanned) == (0, 3)
+
+
+def test_inline_scan_without_a_pool():
+    scanner = pii.StreamScanner(pii.REGULATIONS, batch_size=10)
+    scanner.feed(TEXT, "a")
+    [(context, hits)] = scanner.finish()
+    assert context == "a" and hits == pii.scan_text(TEXT)
+    assert (scanner.scanned, scanner.unscanned) == (1, 0)
@@ -0,0 +1,90 @@
+import pytest
+
+from renegade import engine, health, planner, vectors
+
+LIVE = {"name": "api", "endpoint": "http://api.test/v1", "transport": "http"}
+SETTINGS = {"variations": 100, "concurrency": 4, "duration": 60, "retries": 0}
+
+
+@pytest.fixture
+def test_vectors():
+    return [vectors.get_vector("sql_injection"), vectors.get_vector("jailbreaking")]
+
+
+def measured(requests=100, latency_ms=200.0, errors=0, throttled=0, elapsed_s=10.0):
+    return {"requests": requests, "timed": requests - errors, "latency_ms": latency_ms * (requests - errors),
+            "errors": errors, "throttled": throttled, "response_chars": 800 * requests, "elapsed_s": elapsed_s}
+
+
+def test_a_new_live_target_falls_back_to_the_default_latency(test_vectors):
+    plan = planner.make_plan(LIVE, test_vectors, SETTINGS, stats=planner.TargetStats())
+    assert plan.basis == planner.DEFAULT
+    assert plan.requests == 200
+    # 4 in flight at 1 s each: 4 requests per second
+    assert plan.throughput == pytest.approx(4)
+    assert plan.wall_s == pytest.approx(50)
+    assert plan.fits
+
+
+def test_the_health_probe_beats_the_default(test_vectors):
+    cache = health.HealthCache()
+    cache.put(health.cache_key(LIVE), {"status": "healthy", "ttfb_ms": 250.0})
+    plan = planner.make_plan(LIVE, test_vectors, SETTINGS, stats=planner.TargetStats(), health_cache=cache)
+    assert (plan.basis, plan.latency_ms) == (planner.PROBE, 250.0)
+
+
+def test_simulated_targets_use_the_simulator_latency(test_vectors):
+    plan = planner.make_plan({"name": "sim", "endpoint": "http://sim.test"}, test_vectors, SETTINGS,
+                             stats=planner.TargetStats())
+    low, high = engine.SimulatedTransport().latency
+    assert plan.basis == planner.SIMULATED
+    assert plan.latency_ms == pytest.approx((low + high) / 2 * 1000)
+
+
+def test_measured_runs_win_and_throttling_caps_throughput(test_vectors):
+    stats = planner.TargetStats()
+    stats.record("api", measured(latency_ms=100.0))
+    stats.record("api", measured(latency_ms=300.0, errors=10, throttled=10, elapsed_s=50.0))
+    plan = planner.make_plan(LIVE, test_vectors, {**SETTINGS, "retries": 2}, stats=stats)
+    assert plan.basis == planner.MEASURED
+    assert plan.latency_ms == pytest.approx((100 * 100 + 300 * 90) / 190)
+    assert (plan.bound, plan.throughput) == (planner.BOUND_THROTTLING, 2.0)
+    # 5% errors retried twice, capped by the 10% retry budget
+    assert plan.attempts == pytest.approx(200 * 1.1)
+    assert plan.concurrency_needed() is None
+
+
+def test_the_rate_limit_bounds_the_plan_and_more_concurrency_wont_help(test_vectors):
+    plan = planner.make_plan({**LIVE, "rate_limit": 1}, test_vectors, SETTINGS, stats=planner.TargetStats())
+    assert (plan.bound, plan.throughput) == (planner.BOUND_RATE_LIMIT, 1.0)
+    assert not plan.fits
+    assert plan.requests_in_window == 60
+    assert plan.concurrency_needed() is None
+
+
+def test_a_concurrency_bound_plan_says_what_would_fit(test_vectors):
+    plan = planner.make_plan(LIVE, test_vectors, {**SETTINGS, "duration": 25}, stats=planner.TargetStats())
+    assert not plan.fits
+    assert plan.concurrency_needed() == 8
+    assert plan.summary()["concurrency_needed"] == 8
+    assert "exceeds the 25 s window" in plan.describe()
+
+
+def test_runs_without_requests_are_not_recorded():
+    stats = planner.TargetStats(runs=2)
+    stats.record("api", {"requests": 0})
+    assert stats.estimate("api") is None
+    for latency in (100.0, 200.0, 400.0):
+        stats.record("api", measured(latency_ms=latency))
+    assert stats.estimate("api")["runs"] == 2
+    stats.forget("api")
+    assert stats.estimate("api") is None
+
+
+def test_running_a_plan_records_its_measurements(test_vectors):
+    stats = planner.TargetStats()
+    sim = {"name": "sim", "endpoint": "http://sim.test"}
+    plan = planner.make_plan(sim, test_vectors, {"variations": 3, "profile": False}, stats=stats)
+    results = plan.run(stats=stats)
+    assert results["plan"]["requests"] == 6
+    assert stats.estimate("sim")["requests"] == 6
@@ -0,0 +1,76 @@
+import io
+import os
+import zipfile
+
+import numpy as np
+import pytest
+
+from renegade import profiles
+
+pytest.importorskip("whylogs")
+
+
+def response(length, latency, error=None):
+    return {"text": "x" * length, "latency_ms": latency, "error": error}
+
+
+def profiled(refusal_share, n=400, seed=0, shard_size=profiles.SHARD_SIZE):
+    rng = np.random.default_rng(seed)
+    profiler = profiles.ResponseProfiler(shard_size)
+    for _ in range(n):
+        verdict = "refusal" if rng.random() < refusal_share else "pass"
+        profiler.observe("jailbreaking", response(int(rng.integers(50, 150)), float(rng.uniform(10, 20))), verdict)
+    profiler.observe_pii("jailbreaking", 2)
+    profiler.finish()
+    return profiler
+
+
+def test_whylogs_analytics_are_off():
+    assert os.environ["WHYLOGS_NO_ANALYTICS"]
+
+
+def test_summary_reads_the_sketches():
+    summary = profiled(0.5).summary()["jailbreaking"]
+    assert summary["response_length"]["n"] == 400
+    assert 50 <= summary["response_length"]["p50"] < 150
+    assert 0.4 < summary["refusal"]["rate"] < 0.6
+    assert summary["pii_hits"]["mean"] == 2
+
+
+def test_full_shards_are_profiled_as_they_fill():
+    profiler = profiles.ResponseProfiler(shard_size=10)
+    for _ in range(25):
+        profiler.observe("v", response(10, 5.0), "pass")
+    assert profiler.views["v"].get_column("latency_ms").get_metric("distribution").n == 20
+    profiler.finish()
+    assert profiler.summary()["v"]["latency_ms"]["n"] == 25
+
+
+def test_serialized_profiles_merge():
+    coordinator = profiled(0.5, seed=1)
+    coordinator.merge_serialized(profiled(0.5, seed=2).serialize())
+    assert coordinator.responses == 800
+    assert coordinator.summary()["jailbreaking"]["finding"]["n"] == 800
+
+
+def test_stored_runs_drift_on_a_changed_refusal_rate(tmp_path):
+    baseline = profiled(0.1, seed=1).write(str(tmp_path), "API Target", "one")
+    same = profiled(0.1, seed=2).write(str(tmp_path), "API Target", "two")
+    changed = profiled(0.6, seed=3).write(str(tmp_path), "API Target", "three")
+    assert not any(row["drifted"] for row in profiles.drift(baseline, same))
+    drifted = {row["column"] for row in profiles.drift(baseline, changed) if row["drifted"]}
+    assert drifted == {"refusal"}
+
+
+def test_whylabs_export_has_one_file_per_vector(tmp_path):
+    path = profiled(0.2).write(str(tmp_path), "api")
+    with zipfile.ZipFile(io.BytesIO(profiles.export_whylabs(path))) as archive:
+        assert sorted(archive.namelist()) == [profiles.MANIFEST, "vector=jailbreaking.bin"]
+
+
+def test_rate_test_on_identical_constant_rates():
+    profiler = profiles.ResponseProfiler()
+    profiler.observe("v", response(1, 1.0), "pass")
+    profiler.finish()
+    counts = profiler.views["v"].get_column("refusal").get_metric("distribution")
+    assert profiles.rate_test(counts, counts) == (0.0, 1.0)
@@ -0,0 +1,65 @@
+from datetime import datetime
+
+import pytest
+
+from renegade import records
+
+CANARY = "RT-0A1B2C3D-000042"
+
+
+def make(number=7, response=None, canary=None, fingerprint="00ab12cd34ef5678"):
+    return records.Finding(number, "sql_injection", "SQL Injection", "high", records.INJECTION_DETAILS,
+                           ("api", "SQL Injection", "direct"), fingerprint=fingerprint, created=0.0,
+                           response=response, canary=canary)
+
+
+def test_a_record_reads_like_the_old_dict():
+    finding = make()
+    assert finding["id"] == "VULN-7"
+    assert finding["test_vector"] == "sql_injection"
+    assert finding["severity"] == "high"
+    assert finding["details"] == "api followed an injected instruction from the SQL Injection test vector (direct payload)."
+    assert finding["timestamp"] == datetime.fromtimestamp(0.0).isoformat()
+    assert finding["fingerprint"] == "00ab12cd34ef5678"
+    assert list(finding) == list(records.FIELDS)
+    assert dict(finding) == finding.to_dict()
+
+
+def test_missing_optional_fields_behave_like_absent_keys():
+    finding = make(fingerprint=None)
+    assert "fingerprint" not in finding
+    assert "response" not in finding
+    assert finding.get("response", "none") == "none"
+    with pytest.raises(KeyError):
+        finding["response"]
+    with pytest.raises(KeyError):
+        finding["unknown"]
+
+
+def test_the_canary_is_restored_on_read():
+    finding = make(response=f"Sure: {CANARY}", canary=CANARY)
+    assert finding["response"] == f"Sure: {CANARY}"
+    # The stored text without the canary is shared between findings with the same answer
+    assert finding.response_template is make(response=f"Sure: {CANARY}", canary=CANARY).response_template
+
+
+def test_assigned_fields_are_kept():
+    finding = make()
+    finding["cluster"] = "C-1"
+    finding["regulations"] = ["GDPR"]
+    finding["note"] = "triaged"
+    assert finding.to_dict()["cluster"] == "C-1"
+    assert finding["regulations"] == ["GDPR"]
+    assert finding["note"] == "triaged"
+    assert len(finding) == len(records.FIELDS) + 3
+
+
+def test_details_arguments_are_shared():
+    assert make(1).args is make(2).args
+
+
+def test_code_tables_intern_values():
+    table = records.CodeTable(["low"])
+    assert table.code("low") == 0
+    assert table.code("high") == 1 == table.code("high")
+    assert table.value(1) == "high"
@@ -0,0 +1,98 @@
+import pytest
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+from renegade import rendertime
+
+
+def test_scopes_name_pages_and_fragments():
+    assert rendertime.scope(rendertime.PAGE, "Dashboard") == "page:Dashboard"
+    assert rendertime.scope(rendertime.FRAGMENT, "vector_checklist") == "fragment:vector_checklist"
+
+
+def test_measure_records_even_when_the_block_raises():
+    timings = rendertime.RenderTimings()
+    with pytest.raises(RuntimeError):
+        with timings.measure("page:Run"):
+            raise RuntimeError("rerun")
+    assert timings.last("page:Run") >= 0
+    assert timings.last("page:Other") is None
+
+
+def test_summary_keeps_a_window_per_scope():
+    timings = rendertime.RenderTimings(window=4)
+    for ms in (1, 2, 3, 4, 100):
+        timings.record("fragment:export_panel", ms / 1000)
+    summary = timings.summary()["fragment:export_panel"]
+    assert summary["runs"] == 4
+    assert summary["last_ms"] == pytest.approx(100)
+    assert summary["p50_ms"] == pytest.approx(3.5)
+    timings.clear()
+    assert timings.summary() == {}
+
+
+def markdown_msg(body):
+    msg = ForwardMsg()
+    msg.delta.new_element.markdown.body = body
+    return msg
+
+
+def test_reruns_count_elements_into_their_open_sections():
+    profiler = rendertime.RenderProfiler()
+    assert profiler.active() is None
+    with profiler.rerun("page:Dashboard", owner="session") as rerun:
+        assert profiler.active() is rerun
+        rerun.count(markdown_msg("<h2>Dashboard</h2>"))
+        with profiler.section("render_dashboard"):
+            rerun.count(markdown_msg("<p>body</p>"))
+            with profiler.section("card"):
+                rerun.count(markdown_msg("<p>card</p>"))
+    assert profiler.active() is None
+
+    [summary] = profiler.recent("session")
+    assert summary["key"] == "page:Dashboard"
+    assert summary["elements"] == 3
+    assert summary["html_bytes"] == len("<h2>Dashboard</h2><p>body</p><p>card</p>")
+    sections = {section["section"]: section for section in summary["sections"]}
+    assert (sections["render_dashboard"]["elements"], sections["card"]["elements"]) == (2, 1)
+    assert profiler.recent("another session") == []
+
+
+def test_sections_outside_a_profiled_rerun_cost_nothing():
+    calls = []
+
+    @rendertime.profiled
+    def render():
+        calls.append(rendertime.profiler().active())
+
+    render()
+    assert calls == [None]
+
+
+def test_slow_reruns_are_flagged():
+    profiler = rendertime.RenderProfiler(budget_ms=-1)
+    with profiler.rerun("fragment:run_progress"):
+        pass
+    assert profiler.recent()[0]["over_budget"]
+
+
+def test_cprofile_stats_accumulate_per_page(tmp_path):
+    profiler = rendertime.RenderProfiler()
+    for _ in range(2):
+        with profiler.rerun("page:Results Analyzer", stats_dir=str(tmp_path)):
+            sum(range(1000))
+    assert [path.name for path in tmp_path.iterdir()] == ["page_Results_Analyzer.prof"]
+    profiler.clear()
+    assert profiler.recent() == []
+
+
+@pytest.mark.parametrize("env, expected", [
+    ({}, {"enabled": False, "dump_stats": False, "stats_dir": rendertime.STATS_DIR}),
+    ({"RENEGADE_PROFILE_RERUNS": "yes"}, {"enabled": True, "dump_stats": False, "stats_dir": rendertime.STATS_DIR}),
+    ({"RENEGADE_PROFILE_DIR": "stats"}, {"enabled": True, "dump_stats": True, "stats_dir": "stats"}),
+])
+def test_profiler_settings_from_the_environment(monkeypatch, env, expected):
+    monkeypatch.delenv("RENEGADE_PROFILE_RERUNS", raising=False)
+    monkeypatch.delenv("RENEGADE_PROFILE_DIR", raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    assert rendertime.profiler_from_env() == expected
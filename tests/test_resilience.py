@@ -0,0 +1,123 @@
+import pytest
+
+from renegade import resilience
+
+
+class ScriptedTransport:
+    """Answers with a queue of responses, raising any exception in it"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.sent = 0
+
+    def send(self, target, vector, payload, canary, **options):
+        self.sent += 1
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return dict(outcome)
+
+
+OK = {"text": "fine", "status_code": 200, "latency_ms": 5.0, "error": None}
+UNAVAILABLE = {"text": "", "status_code": 503, "latency_ms": 5.0, "error": "HTTP 503"}
+FORBIDDEN = {"text": "", "status_code": 403, "latency_ms": 5.0, "error": "HTTP 403"}
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers(monkeypatch):
+    monkeypatch.setattr(resilience, "_breakers", {})
+    monkeypatch.setattr(resilience, "BACKOFF_BASE", 0.001)
+
+
+def target(name="api", endpoint="http://api.test/v1"):
+    return {"name": name, "endpoint": endpoint}
+
+
+def wrap(transport, retries=2, **options):
+    return resilience.ResilientTransport(transport, target(), timeout=5, retries=retries, **options)
+
+
+def send(wrapped):
+    return wrapped.send(target(), {"id": "v"}, "payload", "canary")
+
+
+def test_only_transient_failures_are_retried():
+    assert resilience.retryable(UNAVAILABLE)
+    assert resilience.retryable({**UNAVAILABLE, "status_code": None})
+    assert not resilience.retryable(FORBIDDEN)
+    assert not resilience.retryable(OK)
+
+    transport = ScriptedTransport(UNAVAILABLE, OK)
+    wrapped = wrap(transport)
+    assert send(wrapped)["error"] is None
+    assert (transport.sent, wrapped.stats["retries"]) == (2, 1)
+
+    transport = ScriptedTransport(FORBIDDEN)
+    assert send(wrap(transport))["status_code"] == 403
+    assert transport.sent == 1
+
+
+def test_retries_stop_when_the_budget_runs_out():
+    budget = resilience.RetryBudget(ratio=0.5, reserve=1)
+    assert budget.withdraw()
+    assert not budget.withdraw()
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+
+
+def test_breakers_are_shared_by_endpoint_not_name():
+    first = resilience.breaker_for(target("api", "http://API.test/v1/"))
+    assert resilience.breaker_for(target("renamed", "http://api.test/v1")) is first
+    assert resilience.breaker_for(target("api", "http://other.test/v1")) is not first
+
+
+def test_the_breaker_opens_and_a_probe_closes_it(monkeypatch):
+    breaker = resilience.CircuitBreaker(failures=2, cooldown=10)
+    now = [0.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    breaker.record(False)
+    breaker.record(False)
+    assert breaker.state == resilience.OPEN
+    assert not breaker.allow()
+    now[0] = 10
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record(True)
+    assert breaker.state == resilience.CLOSED
+
+
+def test_an_exception_counts_as_a_failure_and_frees_the_probe(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    transport = ScriptedTransport(ConnectionError("reset"))
+    wrapped = wrap(transport, retries=0)
+    for _ in range(resilience.BREAKER_FAILURES):
+        with pytest.raises(ConnectionError):
+            send(wrapped)
+    assert wrapped.breaker.state == resilience.OPEN
+
+    # The half-open probe raises too; the breaker opens again instead of staying stuck
+    now[0] += resilience.BREAKER_COOLDOWN
+    with pytest.raises(ConnectionError):
+        send(wrapped)
+    assert wrapped.breaker.state == resilience.OPEN
+    now[0] += resilience.BREAKER_COOLDOWN
+    transport.outcomes = [OK]
+    assert send(wrapped)["error"] is None
+    assert wrapped.breaker.state == resilience.CLOSED
+
+
+def test_an_open_breaker_rejects_without_sending():
+    transport = ScriptedTransport(UNAVAILABLE)
+    wrapped = wrap(transport, retries=0)
+    for _ in range(resilience.BREAKER_FAILURES):
+        send(wrapped)
+    sent = transport.sent
+    assert send(wrapped)["error"] == "circuit open"
+    assert transport.sent == sent
+    assert wrapped.summary()["circuit"] == resilience.OPEN
+
+
+def test_targets_without_an_endpoint_fall_back_to_their_name():
+    assert resilience.breaker_for({"name": "local"}) is resilience.breaker_for({"name": "local"})
@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+from renegade import scheduler
+
+
+@pytest.fixture
+def jobs():
+    jobs = scheduler.JobScheduler(max_workers=1)
+    yield jobs
+    jobs.shutdown()
+
+
+def blocking(job, release):
+    """Run until released or cancelled"""
+    while not job.is_cancelled() and not release.wait(0.01):
+        pass
+    return "cancelled" if job.is_cancelled() else "done"
+
+
+def test_identical_jobs_attach_instead_of_queueing(jobs):
+    release = threading.Event()
+    key = scheduler.job_key("run", "target", ["vector"])
+    first, created = jobs.submit_or_attach("run", blocking, release, key=key)
+    second, attached_created = jobs.submit_or_attach("run", blocking, release, key=key)
+    assert created and not attached_created
+    assert second is first and first.attached == 1
+
+    release.set()
+    assert jobs.wait([first], timeout=10)
+    # A finished job is not attached to; the same key queues a new one
+    third, created = jobs.submit_or_attach("run", blocking, release, key=key)
+    assert created and third is not first
+    assert jobs.wait([third], timeout=10)
+
+
+def test_cancel_running_and_queued_jobs(jobs):
+    release = threading.Event()
+    running = jobs.submit("running", blocking, release)
+    queued = jobs.submit("queued", blocking, release)
+    while running.state != scheduler.RUNNING:
+        threading.Event().wait(0.01)
+
+    assert jobs.cancel(queued.id)
+    assert queued.state == scheduler.CANCELLED
+    assert jobs.cancel(running.id)
+    assert jobs.wait([running, queued], timeout=10)
+    assert running.state == scheduler.CANCELLED and running.result == "cancelled"
+    # The cancelled queued job never ran
+    assert queued.started_at is None
+    assert not jobs.cancel(running.id)
+
+
+def test_shutdown_cancels_queued_and_running_jobs():
+    jobs = scheduler.JobScheduler(max_workers=1)
+    release = threading.Event()
+    running = jobs.submit("running", blocking, release)
+    queued = [jobs.submit(f"queued {i}", blocking, release) for i in range(3)]
+    while running.state != scheduler.RUNNING:
+        threading.Event().wait(0.01)
+
+    jobs.shutdown()
+    assert all(job.state == scheduler.CANCELLED and job.finished_at for job in queued)
+    assert jobs.wait([running], timeout=10)
+    assert running.state == scheduler.CANCELLED
+    assert all(job.started_at is None for job in queued)
+    with pytest.raises(RuntimeError):
+        jobs.submit("late", blocking, release)
@@ -0,0 +1,52 @@
+import math
+
+import pytest
+
+from renegade import engine, sequential, vectors
+
+
+class FixedTransport:
+    """Target that always leaks the canary, or always refuses"""
+
+    def __init__(self, leaks):
+        self.leaks = leaks
+
+    def send(self, target, vector, payload, canary, **options):
+        text = f"Sure: {canary}" if self.leaks else "I'm sorry, I can't help with that."
+        return {"text": text, "status_code": 200, "latency_ms": 1.0, "error": None}
+
+
+def test_two_findings_settle_vulnerable():
+    test = sequential.SequentialTest()
+    assert test.observe(True) == sequential.UNDECIDED
+    # ln(0.1 / 0.01) per finding; two pass the ln(19) boundary
+    assert test.observe(True) == sequential.VULNERABLE
+    assert test.settled and "2 findings in 2 requests" in test.reason()
+    # Settled verdicts ignore further responses
+    assert test.observe(False) == sequential.VULNERABLE and test.observations == 2
+
+
+def test_clean_responses_settle_robust_at_the_wald_boundary():
+    test = sequential.SequentialTest()
+    needed = math.ceil(math.log(19) / -math.log(0.9 / 0.99))
+    for _ in range(needed - 1):
+        assert test.observe(False) == sequential.UNDECIDED
+    assert test.observe(False) == sequential.ROBUST
+    assert test.observations == needed == 31
+
+
+def test_rates_must_be_ordered():
+    with pytest.raises(ValueError):
+        sequential.SequentialTest(acceptable=0.2, unacceptable=0.1)
+
+
+@pytest.mark.parametrize("leaks, verdict", [(True, sequential.VULNERABLE), (False, sequential.ROBUST)])
+def test_engine_stops_settled_vectors_early(leaks, verdict):
+    settings = {"sequential": True, "variations": 200, "concurrency": 1, "profile": False, "pii_regulations": []}
+    test_vectors = vectors.get_test_vectors()[:3]
+    results = engine.run_assessment({"name": "settled"}, test_vectors, settings, transport=FixedTransport(leaks))
+    for vector in test_vectors:
+        details = results["test_details"][vector["id"]]
+        assert details["verdict"] == verdict
+        assert details["requests"] < 40
+    assert results["summary"]["total_tests"] < 3 * 200
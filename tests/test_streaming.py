@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from renegade import engine, fingerprint, streaming
+
+CANARY = "RT-0A1B2C3D-000042"
+
+
+def sse(*deltas, done=True):
+    lines = []
+    for delta in deltas:
+        lines += [f"data: {json.dumps({'choices': [{'delta': {'content': delta}}]})}", ""]
+    if done:
+        lines += ["data: [DONE]", ""]
+    return lines
+
+
+class StopAfter(streaming.Collector):
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+
+    def check(self, delta):
+        return self.length >= self.limit
+
+
+@pytest.mark.parametrize("payload, text", [
+    ('{"choices": [{"delta": {"content": "hi"}}]}', "hi"),
+    ('{"choices": [{"text": "hi"}]}', "hi"),
+    ('{"token": "hi"}', "hi"),
+    ('{"usage": {"tokens": 3}}', None),
+    ('[1, 2]', None),
+    ("plain words", "plain words"),
+])
+def test_event_text(payload, text):
+    assert streaming.event_text(payload) == text
+
+
+def test_sse_events_are_joined_in_order():
+    collector = streaming.Collector()
+    assert not streaming.read_sse(sse("Hel", "lo", " world"), collector)
+    assert collector.text == "Hello world"
+    assert collector.length == 11
+
+
+def test_multi_line_data_and_an_unterminated_last_event():
+    collector = streaming.Collector()
+    streaming.read_sse(["event: message", "data: first", "data: second", "", ": keepalive", "data: tail"], collector)
+    assert collector.text == "first\nsecondtail"
+
+
+def test_events_after_done_are_ignored():
+    collector = streaming.Collector()
+    streaming.read_sse(sse("kept") + sse("dropped"), collector)
+    assert collector.text == "kept"
+
+
+def test_a_collector_stops_the_read_early():
+    consumed = []
+
+    def chunks():
+        for chunk in ["ab", "cd", "ef", "gh"]:
+            consumed.append(chunk)
+            yield chunk
+
+    collector = StopAfter(4)
+    assert streaming.read_chunks(chunks(), collector)
+    assert consumed == ["ab", "cd"]
+    assert streaming.read_sse(sse("abcd", "efgh"), StopAfter(4))
+
+
+def test_the_verdict_watch_stops_once_a_canary_and_signature_are_in():
+    watch = engine.VerdictWatch(CANARY)
+    # The canary split across events still counts
+    assert not watch.feed("Sure, RT-0A1B2C3D")
+    assert not watch.feed("-000042 ")
+    assert watch.found and watch.verdict_at is not None
+    assert watch.feed("x" * fingerprint.SIGNATURE_LENGTH)
+
+
+def test_a_refusal_settles_after_the_confirmation_window():
+    watch = engine.VerdictWatch(CANARY)
+    assert not watch.feed("I'm sorry, but no. ")
+    assert not watch.feed("x" * (engine.REFUSAL_CONFIRM_CHARS - 1))
+    assert watch.feed("xx")
+    assert not watch.found
+
+
+def test_full_reads_record_the_verdict_without_stopping():
+    watch = engine.VerdictWatch(CANARY, full=True)
+    assert not watch.feed(f"{CANARY} " + "x" * 2 * fingerprint.SIGNATURE_LENGTH)
+    assert watch.verdict_at is not None
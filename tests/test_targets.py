@@ -0,0 +1,65 @@
+import io
+import json
+
+import pytest
+
+from renegade.targets import IMPORT_BLOCK_SIZE, TargetCatalog, import_targets
+
+
+def target_rows(count):
+    return [{"name": f"target-{i}", "endpoint": f"https://api{i}.example.com/v1"} for i in range(count)]
+
+
+def test_import_small_ndjson():
+    text = "\n".join(json.dumps(row) for row in target_rows(3)) + "\n"
+    catalog = TargetCatalog()
+    report = import_targets(catalog, io.BytesIO(text.encode()))
+    assert report == {"added": 3, "duplicates": 0, "invalid": 0, "errors": []}
+    assert catalog.names() == ["target-0", "target-1", "target-2"]
+
+
+def as_ndjson(rows):
+    return ("\n".join(json.dumps(row) for row in rows) + "\n").encode()
+
+
+def as_json_array(rows):
+    return json.dumps(rows, indent=2).encode()
+
+
+@pytest.mark.parametrize("encode", [as_json_array, as_ndjson])
+@pytest.mark.parametrize("count", [1, 3, 2000])
+def test_import_sizes(encode, count):
+    data = encode(target_rows(count))
+    if count == 2000:
+        assert len(data) > 2 * IMPORT_BLOCK_SIZE
+    catalog = TargetCatalog()
+    report = import_targets(catalog, io.BytesIO(data))
+    assert report == {"added": count, "duplicates": 0, "invalid": 0, "errors": []}
+    assert catalog.names() == [row["name"] for row in target_rows(count)]
+
+
+@pytest.mark.parametrize("encode", [as_json_array, as_ndjson])
+def test_import_reports_duplicates_and_invalid_rows(encode):
+    rows = target_rows(2) + [
+        {"name": "copy", "endpoint": "HTTPS://api0.example.com/v1/"},
+        {"name": "no-endpoint"},
+    ]
+    catalog = TargetCatalog()
+    report = import_targets(catalog, io.BytesIO(encode(rows)))
+    assert (report["added"], report["duplicates"], report["invalid"]) == (2, 1, 1)
+    assert report["errors"][0].startswith("Row 4:")
+
+
+def test_import_ndjson_keeps_rows_around_a_broken_line():
+    data = as_ndjson(target_rows(1)) + b"{not json\n" + as_ndjson(target_rows(2)[1:])
+    catalog = TargetCatalog()
+    report = import_targets(catalog, io.BytesIO(data))
+    assert (report["added"], report["invalid"]) == (2, 1)
+
+
+def test_import_truncated_json_array_keeps_rows_read():
+    data = as_json_array(target_rows(3))[:-20]
+    catalog = TargetCatalog()
+    report = import_targets(catalog, io.BytesIO(data))
+    assert report["added"] == 2
+    assert report["invalid"] == 1
@@ -0,0 +1,90 @@
+import numpy as np
+
+from renegade import timeseries
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_responses_land_in_their_buckets():
+    clock = Clock()
+    timeline = timeseries.Timeline(clock=clock)
+    timeline.record(10)
+    timeline.record(None, error=True)
+    clock.now = 2.5
+    timeline.record(1000)
+    timeline.record_finding("high")
+    timeline.record_finding("unknown")
+    summary = timeline.summary()
+    assert summary["requests"] == [2, 0, 1]
+    assert summary["errors"] == [1, 0, 0]
+    assert summary["findings"]["high"] == [0, 0, 1]
+    assert summary["latency_p50"][1] is None
+    assert summary["latency_p50"][0] <= summary["latency_p50"][2]
+
+
+def test_long_runs_coarsen_instead_of_growing():
+    clock = Clock()
+    timeline = timeseries.Timeline(max_buckets=8, clock=clock)
+    for second in range(20):
+        clock.now = second
+        timeline.record(5)
+    summary = timeline.summary()
+    assert summary["bucket_seconds"] == 4
+    assert len(summary["requests"]) <= 8
+    assert sum(summary["requests"]) == 20
+
+
+def test_overall_percentiles_are_bin_upper_edges():
+    timeline = timeseries.Timeline(clock=Clock())
+    for latency in [10] * 90 + [5000] * 10:
+        timeline.record(latency)
+    percentiles = timeline.overall_percentiles()
+    assert 10 <= percentiles["p50"] < 12
+    assert 5000 <= percentiles["p99"] < 6000
+    assert timeseries.Timeline(clock=Clock()).overall_percentiles() == {"p50": None, "p95": None, "p99": None}
+
+
+def test_verdicts_known_early_are_summarized_apart():
+    timeline = timeseries.Timeline(clock=Clock())
+    timeline.record(5000, verdict_ms=20)
+    assert timeline.summary()["verdict_ms"]["p50"] < timeline.summary()["latency_ms"]["p50"]
+
+
+def test_lttb_keeps_the_ends_and_the_peaks():
+    x = np.arange(1000)
+    y = np.zeros(1000)
+    y[437] = 50
+    y[10] = np.nan
+    sx, sy = timeseries.lttb(x, y, 20)
+    assert len(sx) == 20
+    assert (sx[0], sx[-1]) == (0, 999)
+    assert 437 in sx
+    assert not np.isnan(sy).any()
+    assert len(timeseries.lttb(x[:5], y[:5], 20)[0]) == 5
+
+
+def test_rebucket_sums_and_pads():
+    assert timeseries.rebucket([1, 2, 3, 4, 5], 2).tolist() == [3, 7, 5]
+    assert timeseries.rebucket([1, 2], 1).tolist() == [1, 2]
+
+
+def test_chart_series_reports_findings_per_minute():
+    clock = Clock()
+    timeline = timeseries.Timeline(clock=clock)
+    for second in range(120):
+        clock.now = second
+        timeline.record(50)
+        if second < 60:
+            timeline.record_finding("critical")
+    series = timeseries.chart_series(timeline.summary())
+    minutes, per_minute = series["findings_critical"]
+    assert minutes.tolist() == [0, 60]
+    assert per_minute.tolist() == [60, 0]
+    assert "findings_low" not in series
+    assert series["requests_per_second"][1].max() == 1